@@ -0,0 +1,282 @@
+"""Benchmarks of launch and publish hot paths of the addon.
+
+Each scenario runs on fresh copy of synthetic workfile (copy is not
+measured) with empty caches, queries to server are answered by in-memory
+`LocalDatabase`. Duration is median of `--repeat` runs, peak memory is
+measured by `tracemalloc` in separate run so it doesn't slow down timed
+runs.
+
+Needs OpenPype environment, e.g.:
+    openpype_console run benchmarks/run_benchmarks.py --nodes 1000 10000
+"""
+import os
+import sys
+import json
+import time
+import types
+import shutil
+import tempfile
+import argparse
+import statistics
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), "client"))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from openpype.lib.applications import LaunchTypes  # noqa: E402
+
+from ayon_wrap.api import (  # noqa: E402
+    WrapHost,
+    WrapWorkfile,
+    read_node_metadata,
+    get_entity_cache
+)
+from ayon_wrap.dev.local_database import (  # noqa: E402
+    LocalDatabase,
+    patch_lib_functions
+)
+from ayon_wrap.hooks.pre_replace_placeholders import (  # noqa: E402
+    ReplacePlaceholders
+)
+from ayon_wrap.plugins.load.load_file import FileLoader  # noqa: E402
+from ayon_wrap.plugins.publish.extract_wrap import (  # noqa: E402
+    ExtractCompute
+)
+
+from workfile_generator import (  # noqa: E402
+    PROJECT_NAME,
+    generate_workfile
+)
+
+CURRENT_ASSET = "asset0"
+
+
+def _create_hook(workfile_path, project_settings=None):
+    """Returns placeholder hook with minimal launch context."""
+    launch_context = types.SimpleNamespace(
+        data={
+            "project_name": PROJECT_NAME,
+            "asset_name": CURRENT_ASSET,
+            "task_name": "modeling",
+            "last_workfile_path": workfile_path,
+            "project_settings": project_settings or {}
+        },
+        env={},
+        app_group=types.SimpleNamespace(name="wrap"),
+        app_name="wrap/benchmark",
+        host_name="wrap",
+        launch_type=LaunchTypes.local
+    )
+    return ReplacePlaceholders(launch_context)
+
+
+def _create_loader():
+    # loader context is used only to get path of loaded file by 'load'
+    return FileLoader.__new__(FileLoader)
+
+
+def _get_containers(workfile_path):
+    containers = read_node_metadata(workfile_path)
+    for container in containers:
+        container["namespace"] = workfile_path
+    return containers
+
+
+def _get_other_version(database, container):
+    """Returns representation of other version than loaded one."""
+    loaded = database.get_representations(
+        PROJECT_NAME, representation_ids=[container["representation"]])[0]
+    version = 1 if loaded["context"]["version"] != 1 else 2
+    asset_name = loaded["context"]["asset"]
+    for repre in database.get_representations(PROJECT_NAME):
+        context = repre["context"]
+        if (
+            context["asset"] == asset_name
+            and context["version"] == version
+            and not repre["parent"].endswith("_hero")
+        ):
+            return repre
+
+
+# Scenarios, each gets path of workfile copy and database and returns
+#   function to be measured. Workfile is template with placeholders or
+#   'filled' workfile with resolved placeholders and containers.
+def parse_full(workfile_path, database):
+    return lambda: WrapWorkfile.open(workfile_path)
+
+
+def parse_partial(workfile_path, database):
+    return lambda: WrapWorkfile.open(workfile_path, partial=True)
+
+
+def fill_placeholders(workfile_path, database):
+    hook = _create_hook(workfile_path)
+    return lambda: hook._fill_placeholders(workfile_path)
+
+
+def fill_placeholders_concurrent(workfile_path, database):
+    hook = _create_hook(workfile_path, {
+        "wrap": {"placeholder_resolution": {"concurrent": True}}
+    })
+    return lambda: hook._fill_placeholders(workfile_path)
+
+
+def get_containers(workfile_path, database):
+    return lambda: WrapHost(workfile_path).get_containers()
+
+
+def loader_update(workfile_path, database):
+    container = _get_containers(workfile_path)[0]
+    representation = _get_other_version(database, container)
+    loader = _create_loader()
+    return lambda: loader.update(container, representation)
+
+
+def loader_update_all(workfile_path, database):
+    items = [
+        (container, _get_other_version(database, container))
+        for container in _get_containers(workfile_path)
+    ]
+    loader = _create_loader()
+    return lambda: loader.update_containers(items)
+
+
+def loader_remove(workfile_path, database):
+    container = _get_containers(workfile_path)[0]
+    loader = _create_loader()
+    return lambda: loader.remove(container)
+
+
+def update_timeline(workfile_path, database):
+    plugin = ExtractCompute()
+    return lambda: plugin._update_timeline(workfile_path, 1, 50)
+
+
+# name -> (scenario, uses filled workfile)
+SCENARIOS = {
+    "parse_full": (parse_full, False),
+    "parse_partial": (parse_partial, False),
+    "fill_placeholders": (fill_placeholders, False),
+    "fill_placeholders_concurrent": (fill_placeholders_concurrent, False),
+    # launch of already filled workfile, snapshots of containers are reused
+    "relaunch_placeholders": (fill_placeholders, True),
+    "get_containers": (get_containers, True),
+    "loader_update": (loader_update, True),
+    "loader_update_all": (loader_update_all, True),
+    "loader_remove": (loader_remove, True),
+    "update_timeline": (update_timeline, True),
+}
+
+
+def _run_once(scenario, source_path, run_path, database, trace_memory):
+    shutil.copyfile(source_path, run_path)
+    WrapWorkfile.clear_cache()
+    get_entity_cache().clear()
+    func = scenario(run_path, database)
+    if trace_memory:
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def run_benchmarks(node_counts, placeholder_ratio, param_size, asset_count,
+                   repeat, scenario_names, work_dir):
+    """Runs scenarios for each of `node_counts`.
+
+    Returns:
+        (list[dict]) result of each scenario and node count
+    """
+    results = []
+    for node_count in node_counts:
+        template_path = os.path.join(work_dir, f"template_{node_count}.wrap")
+        filled_path = os.path.join(work_dir, f"filled_{node_count}.wrap")
+        run_path = os.path.join(work_dir, f"run_{node_count}.wrap")
+        entities = generate_workfile(template_path, node_count,
+                                     placeholder_ratio, param_size,
+                                     asset_count)
+        database = LocalDatabase(entities)
+
+        with patch_lib_functions(database.get_functions()):
+            shutil.copyfile(template_path, filled_path)
+            _create_hook(filled_path)._fill_placeholders(filled_path)
+
+            for name in scenario_names:
+                scenario, use_filled = SCENARIOS[name]
+                source_path = filled_path if use_filled else template_path
+                durations = [
+                    _run_once(scenario, source_path, run_path, database,
+                              False)
+                    for _ in range(repeat)
+                ]
+                peak = _run_once(scenario, source_path, run_path, database,
+                                 True)
+                results.append({
+                    "scenario": name,
+                    "nodes": node_count,
+                    "placeholder_ratio": placeholder_ratio,
+                    "param_size": param_size,
+                    "file_size": os.path.getsize(source_path),
+                    "ms": round(statistics.median(durations) * 1000, 3),
+                    "min_ms": round(min(durations) * 1000, 3),
+                    "peak_memory": peak
+                })
+                print(_format_result(results[-1]), flush=True)
+    WrapWorkfile.clear_cache()
+    return results
+
+
+def _format_result(result):
+    return (
+        f"{result['scenario']:<28} {result['nodes']:>8} nodes "
+        f"{result['file_size'] / 1024 ** 2:>9.1f} MB "
+        f"{result['ms']:>10.1f} ms (min {result['min_ms']:.1f}) "
+        f"{result['peak_memory'] / 1024 ** 2:>9.1f} MB peak"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of workfile hot paths of Wrap addon.")
+    parser.add_argument("--nodes", type=int, nargs="+",
+                        default=[100, 1000, 10000])
+    parser.add_argument("--placeholder-ratio", type=float, default=0.5)
+    parser.add_argument("--param-size", type=int, default=100,
+                        help="Floats embedded in each node")
+    parser.add_argument("--assets", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scenario", dest="scenarios", action="append",
+                        choices=sorted(SCENARIOS),
+                        help="Run only these scenarios")
+    parser.add_argument("--work-dir",
+                        help="Directory for generated workfiles (temporary "
+                             "directory by default)")
+    parser.add_argument("--output", help="Write results to JSON file")
+    args = parser.parse_args()
+
+    os.environ["AVALON_PROJECT"] = PROJECT_NAME
+    os.environ["AVALON_ASSET"] = CURRENT_ASSET
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="wrap_benchmark_")
+    try:
+        results = run_benchmarks(
+            args.nodes, args.placeholder_ratio, args.param_size,
+            args.assets, args.repeat, args.scenarios or list(SCENARIOS),
+            work_dir
+        )
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Generator of synthetic Wrap workfiles and entities they load.
+
+Workfile contains load nodes with placeholders, save nodes with output
+paths and other nodes, each with embedded parameter of given size (like
+geometry stored in workfile). Entities for all placeholders are generated
+in format of `LocalDatabase` of the addon.
+
+Can be used alone to generate workfile for manual profiling:
+    python workfile_generator.py out.wrap --nodes 5000 --param-size 1000
+"""
+import os
+import json
+import random
+import argparse
+
+PROJECT_NAME = "benchmark"
+PRODUCT_NAME = "modelMain"
+REPRESENTATION_NAME = "abc"
+VERSION_COUNT = 3
+# ratio of save nodes among nodes without placeholder
+SAVE_NODE_RATIO = 0.1
+
+
+def generate_entities(asset_count, publish_root="/publish"):
+    """Returns entities of `asset_count` assets, each with all versions.
+
+    Returns:
+        (dict) entity type -> list of documents
+    """
+    entities = {
+        "assets": [],
+        "subsets": [],
+        "versions": [],
+        "hero_versions": [],
+        "representations": []
+    }
+
+    def add_representation(version_id, asset_name, version_label, version):
+        path = (f"{publish_root}/{asset_name}/{PRODUCT_NAME}/"
+                f"{version_label}/{PRODUCT_NAME}.{REPRESENTATION_NAME}")
+        entities["representations"].append({
+            "_id": f"{version_id}_repre",
+            "type": "representation",
+            "name": REPRESENTATION_NAME,
+            "parent": version_id,
+            "context": {
+                "asset": asset_name,
+                "subset": PRODUCT_NAME,
+                "version": version,
+                "ext": REPRESENTATION_NAME,
+                "representation": REPRESENTATION_NAME
+            },
+            "data": {"path": path}
+        })
+
+    for asset_idx in range(asset_count):
+        asset_name = f"asset{asset_idx}"
+        asset_id = f"{asset_name}_id"
+        subset_id = f"{asset_name}_{PRODUCT_NAME}_id"
+        entities["assets"].append({
+            "_id": asset_id, "type": "asset", "name": asset_name, "data": {}
+        })
+        entities["subsets"].append({
+            "_id": subset_id, "type": "subset", "name": PRODUCT_NAME,
+            "parent": asset_id
+        })
+        for version in range(1, VERSION_COUNT + 1):
+            version_id = f"{subset_id}_v{version:03}"
+            entities["versions"].append({
+                "_id": version_id, "type": "version", "name": version,
+                "parent": subset_id
+            })
+            add_representation(version_id, asset_name, f"v{version:03}",
+                               version)
+        hero_id = f"{subset_id}_hero"
+        entities["hero_versions"].append({
+            "_id": hero_id, "type": "hero_version", "parent": subset_id,
+            "version_id": f"{subset_id}_v{VERSION_COUNT:03}"
+        })
+        add_representation(hero_id, asset_name, "hero", VERSION_COUNT)
+    return entities
+
+
+def generate_workfile(path, node_count=1000, placeholder_ratio=0.5,
+                      param_size=100, asset_count=10, seed=0):
+    """Writes synthetic workfile to `path`.
+
+    Args:
+        path (str)
+        node_count (int): number of nodes
+        placeholder_ratio (float): ratio of load nodes with placeholder
+        param_size (int): number of floats embedded in each node
+        asset_count (int): placeholders point to this many assets, first is
+            current asset
+        seed (int): seed of random values, same arguments give same file
+    Returns:
+        (dict) entities loaded by placeholders, see `generate_entities`
+    """
+    rnd = random.Random(seed)
+    versions = ["{latest}", "{hero}"] + [
+        str(version) for version in range(1, VERSION_COUNT + 1)]
+    placeholder_count = int(node_count * placeholder_ratio)
+
+    nodes = {}
+    for idx in range(node_count):
+        params = {
+            "geometry": {
+                "value": [round(rnd.random(), 6) for _ in range(param_size)]
+            }
+        }
+        if idx < placeholder_count:
+            asset_idx = rnd.randrange(asset_count)
+            asset_name = "{currentAsset}" if asset_idx == 0 else (
+                f"asset{asset_idx}")
+            params["fileName"] = {"value": ".".join((
+                "AYON", asset_name, PRODUCT_NAME, rnd.choice(versions),
+                REPRESENTATION_NAME
+            ))}
+            node_type = "LoadGeom"
+        elif rnd.random() < SAVE_NODE_RATIO:
+            params["fileName"] = {"value": f"out/node{idx}_v001_####.obj"}
+            node_type = "SaveGeom"
+        else:
+            node_type = "Transform"
+        nodes[f"Node{idx}"] = {
+            "nodeId": idx,
+            "nodeType": node_type,
+            "params": params
+        }
+
+    content = {
+        "nodes": nodes,
+        "timeline": {"min": 0, "max": 100, "current": 0},
+        "metadata": {}
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as fp:
+        json.dump(content, fp, indent=4)
+    return generate_entities(asset_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("path", help="Output workfile")
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--placeholder-ratio", type=float, default=0.5)
+    parser.add_argument("--param-size", type=int, default=100)
+    parser.add_argument("--assets", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--entities",
+                        help="Write entities for LocalDatabase to JSON file")
+    args = parser.parse_args()
+
+    entities = generate_workfile(args.path, args.nodes,
+                                 args.placeholder_ratio, args.param_size,
+                                 args.assets, args.seed)
+    if args.entities:
+        with open(args.entities, "w") as fp:
+            json.dump(entities, fp, indent=4)
+
+
+if __name__ == "__main__":
+    main()
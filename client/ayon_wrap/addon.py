@@ -11,6 +11,11 @@ class WrapAddon(AYONAddon, IHostAddon, IPluginPaths):
     name = "wrap"
     host_name = "wrap"
 
+    def cli(self, click_group):
+        from .cli import cli_main
+
+        click_group.add_command(cli_main)
+
     def get_workfile_extensions(self):
         return [".wrap"]
 
@@ -9,13 +9,48 @@ from .pipeline import (
     WrapHost,
     containerise
 )
-from .lib import fill_placeholder, get_token_and_values
+from .workfile import WrapWorkfile
+from .workfile_io import (
+    read_workfile_values,
+    read_node_metadata
+)
+from .placeholder_grammar import (
+    PlaceholderTokens,
+    PlaceholderSyntaxError,
+    parse_placeholder,
+    find_placeholders
+)
+from .lib import (
+    get_load_placeholder,
+    get_load_placeholders,
+    fill_placeholder,
+    resolve_placeholders,
+    resolve_placeholders_concurrently,
+    get_token_and_values,
+    EntityCache,
+    get_entity_cache
+)
 
 
 __all__ = [
     "WrapHost",
     "containerise",
 
+    "WrapWorkfile",
+    "read_workfile_values",
+    "read_node_metadata",
+
+    "PlaceholderTokens",
+    "PlaceholderSyntaxError",
+    "parse_placeholder",
+    "find_placeholders",
+
+    "get_load_placeholder",
+    "get_load_placeholders",
     "fill_placeholder",
-    "get_token_and_values"
+    "resolve_placeholders",
+    "resolve_placeholders_concurrently",
+    "get_token_and_values",
+    "EntityCache",
+    "get_entity_cache"
 ]
@@ -0,0 +1,208 @@
+"""Optional long-lived companion process of Wrap launches.
+
+Wrap is launched through `launch_logic.py` which needs fresh interpreter,
+Qt application and installed host just to show scene inventory. With
+companion enabled, first launch keeps its process running after inventory
+is closed and listens on local socket. Following launches of the same
+project start Wrap directly and only ask the companion to show inventory
+of the launched workfile.
+
+Communication uses `multiprocessing.connection` (Unix socket or named pipe)
+authenticated by key readable only by current user. Messages are dicts:
+    {"command": "ping"} -> {"status": "ok", "project_name": str}
+    {"command": "open", "workfile_path": str, "env": dict}
+        -> {"status": "ok"} or {"status": "rejected", "message": str}
+"""
+import os
+import sys
+import time
+import getpass
+import logging
+import secrets
+import threading
+from multiprocessing.connection import Listener, Client
+
+from .executables import get_cache_dir
+from .file_io import atomic_write
+
+log = logging.getLogger(__name__)
+
+# seconds without requests and open windows after which companion exits
+IDLE_TIMEOUT = float(os.getenv("AYON_WRAP_COMPANION_IDLE_TIMEOUT", 8 * 3600))
+# seconds to wait for reply of companion
+REPLY_TIMEOUT = 5
+# seconds to wait for companion to show scene inventory
+OPEN_TIMEOUT = 20
+# environment variables defining context of launch, copied into companion
+CONTEXT_ENV_PREFIXES = ("AVALON_",)
+
+
+def get_project_name(env=None):
+    return (env or os.environ).get("AVALON_PROJECT")
+
+
+def get_companion_address():
+    """Returns address of companion socket unique for current user."""
+    name = f"ayon_wrap_companion_{getpass.getuser()}"
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{name}"
+    return os.path.join(get_cache_dir(), f"{name}.sock")
+
+
+def _get_authkey(create=False):
+    key_path = os.path.join(
+        get_cache_dir(), f"ayon_wrap_companion_{getpass.getuser()}.key")
+    if create:
+        os.makedirs(os.path.dirname(key_path), exist_ok=True)
+        authkey = secrets.token_bytes(32)
+        with atomic_write(key_path, durable=False, mode=0o600) as fp:
+            fp.write(authkey)
+        return authkey
+
+    try:
+        with open(key_path, "rb") as fp:
+            return fp.read()
+    except OSError:
+        return None
+
+
+def send_request(message, timeout=REPLY_TIMEOUT):
+    """Sends `message` to running companion.
+
+    Returns:
+        (dict) reply of companion or None if companion isn't running or
+            didn't answer in time
+    """
+    authkey = _get_authkey()
+    if not authkey:
+        return None
+    try:
+        with Client(get_companion_address(), authkey=authkey) as conn:
+            conn.send(message)
+            if not conn.poll(timeout):
+                log.warning("Wrap companion didn't answer in time")
+                return None
+            return conn.recv()
+    except (OSError, EOFError, ValueError) as exc:
+        log.debug(f"Wrap companion not available: {exc}")
+    except Exception:
+        # e.g. AuthenticationError for key of previous companion
+        log.debug("Wrap companion not available", exc_info=True)
+    return None
+
+
+def ping(project_name):
+    """Returns True if companion of `project_name` is running."""
+    reply = send_request({"command": "ping"})
+    return bool(
+        reply
+        and reply.get("status") == "ok"
+        and reply.get("project_name") == project_name
+    )
+
+
+def request_open(workfile_path, env):
+    """Asks companion to show scene inventory of launched workfile.
+
+    Waits until companion switched its context and showed inventory.
+
+    Returns:
+        (bool) True if companion opened workfile, False if it isn't
+            running or failed and normal launch should be used
+    """
+    reply = send_request({
+        "command": "open",
+        "workfile_path": workfile_path,
+        "env": dict(env)
+    }, timeout=OPEN_TIMEOUT + REPLY_TIMEOUT)
+    if not reply:
+        return False
+    if reply.get("status") != "ok":
+        log.warning(f"Wrap companion rejected request: {reply}")
+        return False
+    return True
+
+
+class CompanionServer(object):
+    """Listens for requests of following launches.
+
+    Args:
+        on_open (callable): called with workfile path and environment of
+            accepted 'open' request, called from listener thread, request
+            is rejected if it raises
+    """
+    def __init__(self, on_open):
+        self.on_open = on_open
+        self.last_request = time.monotonic()
+        self._listener = None
+
+    @property
+    def idle_time(self):
+        return time.monotonic() - self.last_request
+
+    def start(self):
+        """Starts listening in background thread.
+
+        Returns:
+            (bool) False if other companion is already running
+        """
+        if send_request({"command": "ping"}) is not None:
+            return False
+
+        address = get_companion_address()
+        if sys.platform != "win32" and os.path.exists(address):
+            # left by companion which didn't exit cleanly
+            os.unlink(address)
+        try:
+            self._listener = Listener(address,
+                                      authkey=_get_authkey(create=True))
+        except OSError:
+            log.warning("Cannot start Wrap companion", exc_info=True)
+            return False
+
+        thread = threading.Thread(target=self._serve, daemon=True)
+        thread.start()
+        log.debug(f"Wrap companion listening on {address}")
+        return True
+
+    def close(self):
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            listener.close()
+
+    def _serve(self):
+        while self._listener is not None:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                # closed listener or client with wrong key
+                continue
+            with conn:
+                try:
+                    if not conn.poll(REPLY_TIMEOUT):
+                        continue
+                    conn.send(self._process(conn.recv()))
+                except (OSError, EOFError):
+                    log.debug("Wrap companion request failed",
+                              exc_info=True)
+
+    def _process(self, message):
+        self.last_request = time.monotonic()
+        command = message.get("command")
+        if command == "ping":
+            return {"status": "ok", "project_name": get_project_name()}
+
+        if command != "open":
+            return {"status": "rejected",
+                    "message": f"Unknown command '{command}'"}
+
+        env = message.get("env") or {}
+        if get_project_name(env) != get_project_name():
+            return {"status": "rejected",
+                    "message": "Companion runs for different project"}
+        try:
+            self.on_open(message["workfile_path"], env)
+        except Exception as exc:
+            log.warning("Wrap companion cannot open workfile", exc_info=True)
+            return {"status": "rejected", "message": str(exc)}
+        return {"status": "ok"}
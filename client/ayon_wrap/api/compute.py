@@ -0,0 +1,318 @@
+"""Computing of Wrap workfiles by WrapCmd during publishing."""
+import os
+import time
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .lib import (
+    get_frame_chunks,
+    get_frame_ranges,
+    has_frame_pattern,
+    FRAME_PATTERN
+)
+from . import telemetry
+from .wrapcmd import WrapCmdSupervisor
+
+
+log = logging.getLogger(__name__)
+
+
+def get_wrap_cmd_path(wrap_executable_path):
+    """Returns path to command line variant of Wrap executable."""
+    return wrap_executable_path.replace("Wrap.", "WrapCmd.")
+
+
+def get_output_file_path(workfile_path, file_path):
+    """Returns absolute path of output node file, relative to workfile."""
+    if os.path.isabs(file_path):
+        return file_path
+    return os.path.join(os.path.dirname(workfile_path), file_path)
+
+
+def get_expected_output_files(file_path, frame_start, frame_end):
+    """Returns file names which compute of `file_path` should produce.
+
+    Args:
+        file_path (str): output file path of node, might contain frame
+            pattern ('mesh_####.obj')
+        frame_start (int)
+        frame_end (int)
+    Returns:
+        (dict) file name -> frame (None for single file output)
+    """
+    file_name = os.path.basename(file_path)
+    match = FRAME_PATTERN.search(file_name)
+    if not match:
+        return {file_name: None}
+
+    padding = len(match.group(0))
+    prefix = file_name[:match.start()]
+    suffix = file_name[match.end():]
+    return {
+        f"{prefix}{str(frame).zfill(padding)}{suffix}": frame
+        for frame in range(frame_start, frame_end + 1)
+    }
+
+
+def get_compute_start_times(output_file_paths):
+    """Returns current time of storages of output directories.
+
+    Time is modification time of marker file created in each output
+    directory, clock of file server might differ from local clock. Local
+    time is used if marker cannot be created.
+
+    Args:
+        output_file_paths (list[str]): absolute paths of outputs
+    Returns:
+        (dict) output directory -> timestamp, outputs modified before
+            were not produced by following compute
+    """
+    start_times = {}
+    for file_path in output_file_paths:
+        output_dir = os.path.dirname(file_path)
+        if output_dir in start_times:
+            continue
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            fd, marker_path = tempfile.mkstemp(prefix=".wrap_compute_",
+                                               dir=output_dir)
+            try:
+                start_times[output_dir] = os.fstat(fd).st_mtime
+            finally:
+                os.close(fd)
+                os.remove(marker_path)
+        except OSError:
+            log.warning(f"Cannot create marker in {output_dir}, local "
+                        "time is used", exc_info=True)
+            start_times[output_dir] = time.time()
+    return start_times
+
+
+class OutputManifest(object):
+    """Output files of single output node found after compute.
+
+    Attributes:
+        staging_dir (str)
+        files (list[str]): expected files which exist, ordered by frame
+        missing (list[str]): expected files which don't exist or are older
+            than compute
+        extra (list[str]): other files matching output pattern, e.g. frames
+            out of range left from previous computes
+    """
+    def __init__(self, staging_dir, files, missing, extra):
+        self.staging_dir = staging_dir
+        self.files = files
+        self.missing = missing
+        self.extra = extra
+
+
+@telemetry.traced()
+def collect_output_files(file_path, frame_start, frame_end,
+                         computed_after=None, reused_files=None):
+    """Checks which expected outputs of `file_path` exist.
+
+    Output directory is scanned only once and only entries with same prefix
+    and suffix as output file pattern (or same name for single file output)
+    are considered.
+
+    Args:
+        file_path (str): absolute output file path of node
+        frame_start (int)
+        frame_end (int)
+        computed_after (float): timestamp of compute start in output
+            directory from `get_compute_start_times`, older files weren't
+            produced by the compute and are considered missing
+        reused_files (collection[str]): absolute paths of outputs reused
+            from previous compute, accepted regardless of their age
+    Returns:
+        (OutputManifest)
+    """
+    staging_dir = os.path.dirname(file_path)
+    expected = get_expected_output_files(file_path, frame_start, frame_end)
+
+    file_name = os.path.basename(file_path)
+    match = FRAME_PATTERN.search(file_name)
+    prefix = suffix = None
+    if match:
+        prefix = file_name[:match.start()]
+        suffix = file_name[match.end():]
+
+    reused_files = reused_files or ()
+    existing = set()
+    extra = []
+    if os.path.isdir(staging_dir):
+        with os.scandir(staging_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if match is None:
+                    # single file output
+                    if name != file_name:
+                        continue
+                elif (
+                    not name.startswith(prefix)
+                    or not name.endswith(suffix)
+                    or len(name) < len(prefix) + len(suffix)
+                ):
+                    continue
+                if not entry.is_file():
+                    continue
+                if name not in expected:
+                    extra.append(name)
+                elif (
+                    computed_after is None
+                    or entry.path in reused_files
+                    # tolerance for coarse timestamps of network storages
+                    or entry.stat().st_mtime >= computed_after - 2
+                ):
+                    existing.add(name)
+
+    files = []
+    missing = []
+    for name in sorted(expected, key=lambda item: expected[item] or 0):
+        if name in existing:
+            files.append(name)
+        else:
+            missing.append(name)
+    return OutputManifest(staging_dir, files, missing, sorted(extra))
+
+
+def can_compute_in_chunks(output_file_paths):
+    """Chunks could be used only if all outputs are written per frame."""
+    return bool(output_file_paths) and all(
+        has_frame_pattern(file_path) for file_path in output_file_paths
+    )
+
+
+def call_compute(wrap_cmd_path, workfile_path, frame_start, frame_end,
+                 logger=None, supervisor=None):
+    """Trigger compute on workfile
+
+    Args:
+        supervisor (WrapCmdSupervisor): watches output, timeouts and
+            cancellation of the process, default one is used if not provided
+    Returns:
+        (int) exit code of WrapCmd, non zero if it was killed
+    """
+    logger = logger or log
+    supervisor = supervisor or WrapCmdSupervisor(logger)
+    subprocess_args = [wrap_cmd_path, "compute", workfile_path,
+                       "-s", str(frame_start),
+                       "-e", str(frame_end)]
+    result = supervisor.run(subprocess_args,
+                            cwd=os.path.dirname(workfile_path))
+    if result.stop_reason:
+        logger.warning(f"Compute of {frame_start}-{frame_end} stopped, "
+                       f"reason: {result.stop_reason}")
+        return result.exit_code or 1
+    return result.exit_code
+
+
+def call_chunked_compute(wrap_cmd_path, workfile_path,
+                         frame_start, frame_end,
+                         chunk_size, max_workers, max_retries,
+                         logger=None, supervisor=None):
+    """Computes frame range in chunks by multiple WrapCmd processes.
+
+    Each failed chunk is retried up to `max_retries` times, outputs of
+    all chunks are written per frame into same staging directory.
+
+    Raises:
+        (RuntimeError) if any chunk fails after all retries
+    """
+    logger = logger or log
+    chunks = get_frame_chunks(frame_start, frame_end, chunk_size)
+    logger.debug(f"Computing {len(chunks)} chunks by "
+                 f"{max_workers} processes")
+
+    def compute_chunk(chunk):
+        chunk_start, chunk_end = chunk
+        for attempt in range(max_retries + 1):
+            exit_code = call_compute(wrap_cmd_path, workfile_path,
+                                     chunk_start, chunk_end, logger,
+                                     supervisor)
+            if exit_code == 0:
+                return True
+            if supervisor and supervisor.is_cancelled:
+                return False
+            logger.warning(f"Chunk {chunk_start}-{chunk_end} failed "
+                           f"with exit code {exit_code} "
+                           f"(attempt {attempt + 1})")
+        return False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            telemetry.in_current_span(compute_chunk), chunks))
+
+    failed_chunks = [
+        f"{chunk_start}-{chunk_end}"
+        for (chunk_start, chunk_end), success in zip(chunks, results)
+        if not success
+    ]
+    if failed_chunks:
+        raise RuntimeError(f"Cannot compute {workfile_path}, failed "
+                           f"frames: {', '.join(failed_chunks)}")
+
+
+@telemetry.traced()
+def compute_workfile(wrap_cmd_path, workfile_path, frame_start, frame_end,
+                     output_file_paths, chunk_settings=None, logger=None,
+                     supervisor=None, compute_cache=None):
+    """Computes all output nodes of workfile for frame range.
+
+    Args:
+        wrap_cmd_path (str): path to WrapCmd executable
+        workfile_path (str)
+        frame_start (int)
+        frame_end (int)
+        output_file_paths (list[str]): absolute paths of outputs written
+            by compute, decides if compute could be split into chunks
+        chunk_settings (dict): 'chunk_size', 'max_workers' and
+            'max_retries' of chunked compute, whole range is computed at
+            once if not provided
+        logger (logging.Logger)
+        supervisor (WrapCmdSupervisor): watches timeouts and cancellation
+            of all WrapCmd processes
+        compute_cache (ComputeCache): frames with unchanged outputs are
+            skipped if provided, used only for outputs written per frame
+    Returns:
+        (list[str]) absolute paths of outputs reused from previous compute
+    Raises:
+        (RuntimeError) if compute fails
+    """
+    logger = logger or log
+    per_frame = can_compute_in_chunks(output_file_paths)
+    frame_ranges = [(frame_start, frame_end)]
+    reused_files = []
+    if compute_cache is not None and per_frame:
+        reusable = compute_cache.get_reusable_files(
+            output_file_paths, frame_start, frame_end)
+        frame_ranges = get_frame_ranges(
+            frame
+            for frame in range(frame_start, frame_end + 1)
+            if frame not in reusable
+        )
+        for file_paths in reusable.values():
+            reused_files.extend(file_paths)
+        if reusable:
+            logger.info(f"Reusing {len(reusable)} unchanged frames, "
+                        f"computing {frame_ranges}")
+
+    for range_start, range_end in frame_ranges:
+        if chunk_settings and per_frame:
+            call_chunked_compute(wrap_cmd_path, workfile_path,
+                                 range_start, range_end,
+                                 chunk_settings["chunk_size"],
+                                 chunk_settings["max_workers"],
+                                 chunk_settings["max_retries"],
+                                 logger, supervisor)
+            continue
+
+        exit_code = call_compute(wrap_cmd_path, workfile_path,
+                                 range_start, range_end, logger, supervisor)
+        if exit_code != 0:
+            raise RuntimeError(f"Cannot compute {workfile_path}")
+
+    if compute_cache is not None and per_frame and frame_ranges:
+        compute_cache.store(output_file_paths, frame_ranges)
+    return reused_files
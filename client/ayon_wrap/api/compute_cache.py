@@ -0,0 +1,206 @@
+"""Content addressed cache of computed frames.
+
+Each computed output frame is recorded with key derived from the workfile
+graph, representations loaded into the workfile, other input files of the
+graph, WrapCmd executable and the frame. Frame whose key didn't change since
+its last compute and whose output file wasn't touched since is not sent to
+WrapCmd again.
+
+Records are stored in index file next to outputs, so they are shared by all
+publishes writing into same directory.
+"""
+import os
+import json
+import hashlib
+import collections
+
+from openpype.pipeline import AVALON_CONTAINER_ID
+
+from . import json_backend
+from .file_io import atomic_write, file_lock
+from .compute import get_expected_output_files, get_output_file_path
+from .lib import FRAME_PATTERN, PLACEHOLDER_PREFIX
+from .workfile_io import hash_workfile
+
+INDEX_FILE_NAME = ".ayon_compute_cache.json"
+# top level keys of workfile which don't affect computed outputs
+IGNORED_WORKFILE_KEYS = {"timeline", "metadata"}
+# nodes whose files are written by compute, other files are inputs
+OUTPUT_NODE_TYPES = {"SaveGeom"}
+
+
+def get_graph_hash(workfile, executable_path=None):
+    """Returns hash of workfile content affecting computed outputs.
+
+    Saved workfile is hashed in streaming pass without whitespace, so
+    formatting of the workfile doesn't matter. Timeline and metadata are
+    ignored, loaded representations are hashed by their ids. Modification
+    times and sizes of other input files (file names of nodes which are not
+    outputs) and of `executable_path` are hashed too.
+
+    Args:
+        workfile (WrapWorkfile): partial workfile is enough
+        executable_path (str): WrapCmd computing the workfile
+    Returns:
+        (str)
+    """
+    representations = sorted(
+        (str(item.get("nodeId")), str(item.get("representation")))
+        for item in workfile.get_node_metadata()
+        if item.get("id") == AVALON_CONTAINER_ID
+    )
+    input_paths = set()
+    for node in workfile.nodes.values():
+        file_name = ((node.get("params") or {}).get("fileName") or {}).get(
+            "value")
+        if (
+            not file_name
+            or not isinstance(file_name, str)
+            or node.get("nodeType") in OUTPUT_NODE_TYPES
+            or file_name.startswith(PLACEHOLDER_PREFIX)
+        ):
+            continue
+        input_paths.add(get_output_file_path(workfile.path, file_name))
+    inputs = [
+        (input_path, _get_input_stats(input_path))
+        for input_path in sorted(input_paths)
+    ]
+    executable = None
+    if executable_path:
+        executable = (executable_path, _get_stat(executable_path))
+
+    hasher = hashlib.sha256()
+    hash_workfile(workfile.path, hasher, IGNORED_WORKFILE_KEYS)
+    # always encoded by `json`, hash must not depend on installed backend
+    hasher.update(json.dumps(
+        [representations, inputs, executable]).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _get_input_stats(path):
+    """Returns stat of input file, of all files of sequence with pattern."""
+    file_name = os.path.basename(path)
+    match = FRAME_PATTERN.search(file_name)
+    if not match:
+        return _get_stat(path)
+
+    prefix = file_name[:match.start()]
+    suffix = file_name[match.end():]
+    stats = []
+    try:
+        with os.scandir(os.path.dirname(path)) as entries:
+            for entry in entries:
+                name = entry.name
+                if (
+                    not name.startswith(prefix)
+                    or not name.endswith(suffix)
+                    or len(name) <= len(prefix) + len(suffix)
+                ):
+                    continue
+                stat = _get_stat(entry.path)
+                if stat is not None:
+                    stats.append([name] + stat)
+    except OSError:
+        return None
+    return sorted(stats)
+
+
+class ComputeCache(object):
+    """Decides which frames of workfile need compute.
+
+    Args:
+        workfile (WrapWorkfile): saved workfile with final content (after
+            all placeholders are filled)
+        executable_path (str): WrapCmd computing the workfile
+    """
+    def __init__(self, workfile, executable_path=None):
+        self.graph_hash = get_graph_hash(workfile, executable_path)
+
+    def get_frame_key(self, frame):
+        return hashlib.sha256(
+            f"{self.graph_hash}:{frame}".encode("utf-8")).hexdigest()
+
+    def get_reusable_files(self, output_file_paths, frame_start, frame_end):
+        """Returns outputs per frame which could be reused.
+
+        Frame is reusable only if outputs of all `output_file_paths` are
+        recorded with current key and weren't modified since.
+
+        Args:
+            output_file_paths (list[str]): absolute paths with frame pattern
+            frame_start (int)
+            frame_end (int)
+        Returns:
+            (dict) frame -> list of absolute output paths
+        """
+        frames = set(range(frame_start, frame_end + 1))
+        files_by_frame = collections.defaultdict(list)
+        for file_path in output_file_paths:
+            staging_dir = os.path.dirname(file_path)
+            index = _read_index(staging_dir)
+            expected = get_expected_output_files(file_path,
+                                                 frame_start, frame_end)
+            for file_name, frame in expected.items():
+                if frame not in frames:
+                    continue
+                record = index.get(file_name)
+                output_path = os.path.join(staging_dir, file_name)
+                if (
+                    record
+                    and record["key"] == self.get_frame_key(frame)
+                    and record["stat"] == _get_stat(output_path)
+                ):
+                    files_by_frame[frame].append(output_path)
+                else:
+                    frames.discard(frame)
+
+        return {
+            frame: files_by_frame[frame]
+            for frame in sorted(frames)
+        }
+
+    def store(self, output_file_paths, frame_ranges):
+        """Records outputs of successfully computed `frame_ranges`."""
+        for file_path in output_file_paths:
+            staging_dir = os.path.dirname(file_path)
+            records = {}
+            for frame_start, frame_end in frame_ranges:
+                expected = get_expected_output_files(file_path,
+                                                     frame_start, frame_end)
+                for file_name, frame in expected.items():
+                    stat = _get_stat(os.path.join(staging_dir, file_name))
+                    if stat is None:
+                        continue
+                    records[file_name] = {
+                        "key": self.get_frame_key(frame),
+                        "stat": stat
+                    }
+            if records:
+                _update_index(staging_dir, records)
+
+
+def _get_stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _read_index(staging_dir):
+    index_path = os.path.join(staging_dir, INDEX_FILE_NAME)
+    try:
+        with open(index_path, "rb") as fp:
+            return json_backend.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_index(staging_dir, records):
+    index_path = os.path.join(staging_dir, INDEX_FILE_NAME)
+    # index is shared by all publishes writing to the directory
+    with file_lock(index_path):
+        index = _read_index(staging_dir)
+        index.update(records)
+        with atomic_write(index_path, durable=False) as fp:
+            json_backend.dump(index, fp)
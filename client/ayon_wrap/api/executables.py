@@ -0,0 +1,239 @@
+"""Discovery of installed application executables with persistent cache.
+
+Checking all executables of all variants might take seconds when they are
+on network mounts. Resolved executable is stored on disk, keyed by hash of
+configured executables, and reused until its modification time changes or
+executable of a preferred variant is installed.
+Existence of candidates is checked in parallel, path which doesn't respond
+in time is considered missing.
+"""
+import os
+import sys
+import json
+import getpass
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+import collections
+
+try:
+    import appdirs
+except ImportError:
+    appdirs = None
+
+from openpype.lib import find_executable as find_executable_in_path
+
+from . import json_backend
+from .file_io import atomic_write
+
+log = logging.getLogger(__name__)
+
+# seconds to wait for existence check of executables
+EXECUTABLE_CHECK_TIMEOUT = float(
+    os.getenv("AYON_WRAP_EXECUTABLE_CHECK_TIMEOUT", 2))
+CACHE_FILE_NAME = "executables.json"
+
+_cache_lock = threading.Lock()
+# cache file content loaded in this process
+_memory_cache = {}
+
+
+def get_cache_dir():
+    """Returns directory for persistent caches of the addon.
+
+    Directory is specific for current user, directory shared by users
+    would be writable only by the user who created it.
+    """
+    cache_dir = os.getenv("AYON_WRAP_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    if appdirs is not None:
+        return appdirs.user_cache_dir("ayon_wrap", "ynput")
+    return os.path.join(tempfile.gettempdir(),
+                        f"ayon_wrap_{getpass.getuser()}")
+
+
+def get_executable_candidates(app_group):
+    """Returns configured executable paths of all variants.
+
+    Args:
+        app_group (ApplicationGroup)
+    Returns:
+        (OrderedDict) variant key -> list of paths, sorted by variant key
+    """
+    candidates = collections.OrderedDict()
+    for variant_key, variant in sorted(app_group.variants.items()):
+        candidates[variant_key] = [
+            executable.executable_path
+            for executable in variant.executables
+        ]
+    return candidates
+
+
+def get_candidates_hash(candidates):
+    """Returns key of cached executable for configured `candidates`."""
+    data = json.dumps([sys.platform, list(candidates.items())])
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def resolve_paths(paths, timeout=EXECUTABLE_CHECK_TIMEOUT):
+    """Resolves executable `paths` in parallel.
+
+    Paths are resolved as by `ApplicationExecutable.exists`, executable
+    could be found on PATH or without extension (PATHEXT).
+
+    Checks run in daemon threads, check hanging on unavailable network
+    mount doesn't block exit of the process.
+
+    Args:
+        paths (list[str])
+        timeout (float): paths not resolved in time are considered missing
+    Returns:
+        (dict) path -> (resolved path, mtime in nanoseconds) or None if
+            executable doesn't exist
+    """
+    paths = list(dict.fromkeys(paths))
+    results = {}
+    threads = []
+    for path in paths:
+        thread = threading.Thread(target=_resolve_path, args=(path, results),
+                                  name="WrapExecutableCheck", daemon=True)
+        thread.start()
+        threads.append((path, thread))
+
+    deadline = time.monotonic() + timeout
+    for path, thread in threads:
+        thread.join(max(0, deadline - time.monotonic()))
+        if thread.is_alive():
+            log.warning(f"Existence check of {path} timed out")
+    return {path: results.get(path) for path in paths}
+
+
+def _resolve_path(path, results):
+    if not path:
+        return
+    # same resolution as `ApplicationExecutable.exists`
+    resolved_path = find_executable_in_path(path)
+    if resolved_path is None:
+        resolved_path = path
+    try:
+        mtime = os.stat(resolved_path).st_mtime_ns
+    except OSError:
+        return
+    results[path] = (resolved_path, mtime)
+
+
+def resolve_executable(candidates):
+    """Finds latest variant with existing executable.
+
+    Args:
+        candidates (OrderedDict): variant key -> paths, sorted by variant
+    Returns:
+        (tuple) (variant key, executable path, resolved path, mtime) or None
+    """
+    resolved = resolve_paths(
+        [path for paths in candidates.values() for path in paths])
+    found = None
+    for variant_key, paths in candidates.items():
+        for path in paths:
+            if resolved[path] is not None:
+                found = (variant_key, path) + resolved[path]
+                break
+    return found
+
+
+def get_preferred_paths(candidates, variant_key, executable_path):
+    """Returns candidates preferred over `executable_path` if they exist.
+
+    Executables of later variants and executables listed before
+    `executable_path` in its variant.
+
+    Args:
+        candidates (OrderedDict): variant key -> paths, sorted by variant
+        variant_key (str): variant of `executable_path`
+        executable_path (str)
+    Returns:
+        (list[str])
+    """
+    preferred = []
+    later_variant = False
+    for key, paths in candidates.items():
+        if later_variant:
+            preferred.extend(paths)
+        elif key == variant_key:
+            later_variant = True
+            if executable_path in paths:
+                paths = paths[:paths.index(executable_path)]
+            preferred.extend(paths)
+    return preferred
+
+
+def find_executable(app_group):
+    """Returns latest variant with existing executable, uses cache.
+
+    Args:
+        app_group (ApplicationGroup)
+    Returns:
+        (tuple) (variant key, executable path) or None
+    """
+    candidates = get_executable_candidates(app_group)
+    key = get_candidates_hash(candidates)
+    cache_path = os.path.join(get_cache_dir(), CACHE_FILE_NAME)
+
+    with _cache_lock:
+        cache = _memory_cache.get(cache_path)
+        if cache is None:
+            cache = _read_cache(cache_path)
+            _memory_cache[cache_path] = cache
+        cached = cache.get(key)
+
+    if cached and cached.get("resolved_path"):
+        path = cached["executable_path"]
+        preferred_paths = get_preferred_paths(
+            candidates, cached["variant_key"], path)
+        resolved = resolve_paths([path] + preferred_paths)
+        if (
+            resolved[path] == (cached["resolved_path"], cached["mtime"])
+            and all(resolved[preferred] is None
+                    for preferred in preferred_paths)
+        ):
+            return cached["variant_key"], path
+        log.debug(f"Cached executable {path} changed or preferred "
+                  "executable was installed, resolving again")
+
+    found = resolve_executable(candidates)
+    with _cache_lock:
+        if found is None:
+            cache.pop(key, None)
+        else:
+            variant_key, path, resolved_path, mtime = found
+            cache[key] = {
+                "variant_key": variant_key,
+                "executable_path": path,
+                "resolved_path": resolved_path,
+                "mtime": mtime
+            }
+        _write_cache(cache_path, cache)
+
+    if found is None:
+        return None
+    return found[0], found[1]
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, "rb") as fp:
+            return json_backend.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache_path, cache):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with atomic_write(cache_path, durable=False) as fp:
+            json_backend.dump(cache, fp)
+    except OSError:
+        log.warning(f"Cannot write cache {cache_path}", exc_info=True)
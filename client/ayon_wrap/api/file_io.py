@@ -0,0 +1,208 @@
+"""Crash safe writes of files shared by multiple processes.
+
+`atomic_write` writes content to temporary file in the same directory,
+flushes it to disk and renames it over the target, so readers see either
+old or complete new file even if writer crashes (also on network storage,
+where rename is atomic as well).
+
+`file_lock` is advisory exclusive lock of sidecar '<path>.lock' file,
+held by writers doing read-modify-write of shared file. Other processes
+of the addon wait for it, Wrap itself doesn't respect it. Lock file exists
+only while the lock is held, it is removed on release. Writer which locked
+lock file already removed by previous holder locks it again, so two
+writers never hold lock of different files.
+"""
+import os
+import sys
+import stat
+import time
+import secrets
+import threading
+import contextlib
+
+from . import telemetry
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+# counter of bytes written by `atomic_write`
+BYTES_WRITTEN_COUNTER = "wrap.io.bytes_written"
+# seconds to wait for lock held by other writer
+LOCK_TIMEOUT = float(os.getenv("AYON_WRAP_LOCK_TIMEOUT", 30))
+_LOCK_POLL_INTERVAL = 0.1
+
+# lock path -> _LockState, locks are reentrant in thread which holds them
+_lock_states = {}
+_lock_states_guard = threading.Lock()
+
+
+@contextlib.contextmanager
+def atomic_write(path, durable=True, mode=0o666):
+    """Yields binary file object, its content replaces `path` on success.
+
+    Nothing is changed if the block raises.
+
+    Args:
+        path (str): target file
+        durable (bool): flush data and rename to disk before returning,
+            can be disabled for caches which may be lost
+        mode (int): permissions of newly created file (masked by umask),
+            replaced file keeps its permissions
+    """
+    path = os.path.abspath(path)
+    tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    try:
+        if sys.platform != "win32":
+            _copy_mode(path, fd)
+        with os.fdopen(fd, "wb") as fp:
+            yield fp
+            telemetry.add_counter(BYTES_WRITTEN_COUNTER, fp.tell())
+            if durable:
+                fp.flush()
+                os.fsync(fp.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    if durable:
+        _fsync_directory(os.path.dirname(path))
+
+
+def _copy_mode(path, fd):
+    try:
+        os.fchmod(fd, stat.S_IMODE(os.stat(path).st_mode))
+    except OSError:
+        # new file or permissions cannot be changed
+        pass
+
+
+def _fsync_directory(directory):
+    """Makes rename in `directory` persistent (not possible on Windows)."""
+    if sys.platform == "win32":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        # not supported by some file systems
+        pass
+    finally:
+        os.close(fd)
+
+
+class _LockState(object):
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fp = None
+
+
+@contextlib.contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT):
+    """Holds advisory exclusive lock of `path` for other writers.
+
+    Args:
+        path (str): locked file, doesn't need to exist
+        timeout (float): seconds to wait for the lock
+    Raises:
+        (TimeoutError) if lock is held by other writer for `timeout`
+    """
+    lock_path = f"{os.path.abspath(path)}.lock"
+    with _lock_states_guard:
+        state = _lock_states.setdefault(lock_path, _LockState())
+
+    deadline = time.monotonic() + timeout
+    if not state.thread_lock.acquire(timeout=timeout):
+        raise TimeoutError(f"File '{path}' is locked by other writer.")
+    try:
+        if state.depth == 0:
+            state.fp = _acquire_file_lock(lock_path, path, deadline)
+        state.depth += 1
+        try:
+            yield
+        finally:
+            state.depth -= 1
+            if state.depth == 0:
+                _release_file_lock(state.fp, lock_path)
+                state.fp = None
+    finally:
+        state.thread_lock.release()
+
+
+def _acquire_file_lock(lock_path, path, deadline):
+    while True:
+        fp = open(lock_path, "a+b")
+        try:
+            locked = _lock(fp)
+            if locked:
+                if _is_file_at_path(fp, lock_path):
+                    return fp
+                # removed by previous holder, lock file created again
+                _unlock(fp)
+        except BaseException:
+            fp.close()
+            raise
+        fp.close()
+        if locked:
+            continue
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"File '{path}' is locked by other writer.")
+        time.sleep(_LOCK_POLL_INTERVAL)
+
+
+def _release_file_lock(fp, lock_path):
+    try:
+        if sys.platform != "win32":
+            # removed while locked, so no writer locks it afterwards
+            _remove_lock_file(lock_path)
+        _unlock(fp)
+    finally:
+        fp.close()
+    if sys.platform == "win32":
+        # open files cannot be removed, fails if other writer opened it
+        _remove_lock_file(lock_path)
+
+
+def _lock(fp):
+    """Returns True if lock of `fp` was acquired, doesn't wait."""
+    try:
+        if sys.platform == "win32":
+            fp.seek(0)
+            msvcrt.locking(fp.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fp.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fp):
+    if sys.platform == "win32":
+        fp.seek(0)
+        msvcrt.locking(fp.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fp.fileno(), fcntl.LOCK_UN)
+
+
+def _is_file_at_path(fp, path):
+    """Checks if opened `fp` is still the file at `path`."""
+    try:
+        path_stat = os.stat(path)
+    except OSError:
+        return False
+    fp_stat = os.fstat(fp.fileno())
+    return (
+        (fp_stat.st_dev, fp_stat.st_ino)
+        == (path_stat.st_dev, path_stat.st_ino)
+    )
+
+
+def _remove_lock_file(lock_path):
+    try:
+        os.remove(lock_path)
+    except OSError:
+        pass
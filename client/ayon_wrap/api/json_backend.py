@@ -0,0 +1,60 @@
+"""JSON encoding and decoding of all files read and written by the addon.
+
+`orjson` is used if it is installed, standard library `json` otherwise.
+Content `orjson` doesn't support (NaN literals, integers over 64 bits) is
+processed by `json` instead.
+
+Encoded documents are always bytes in UTF-8.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND_NAME = "orjson" if orjson is not None else "json"
+
+
+def loads(data):
+    """Decodes JSON document from `data` (bytes or str)."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # non standard content accepted by `json`, or invalid document
+            #   which is reported by `json` as well
+            pass
+    return json.loads(data)
+
+
+def load(fp):
+    """Decodes JSON document from file object opened for reading."""
+    return loads(fp.read())
+
+
+def dumps(value, indent=None):
+    """Encodes `value` to JSON document.
+
+    Args:
+        value (Any): json serializable value
+        indent (int): indent nested values by this many spaces, compact
+            output without any whitespace if None
+    Returns:
+        (bytes)
+    """
+    # orjson supports only indentation by 2 spaces
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_INDENT_2 if indent else 0
+        try:
+            return orjson.dumps(value, option=option)
+        except TypeError:
+            pass
+    if indent is None:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+    return json.dumps(value, indent=indent).encode("utf-8")
+
+
+def dump(value, fp, indent=None):
+    """Encodes `value` to file object opened for writing of bytes."""
+    fp.write(dumps(value, indent))
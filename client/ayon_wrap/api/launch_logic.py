@@ -1,23 +1,59 @@
 import os
 import sys
+import time
 import logging
 import traceback
+import contextlib
 
-from openpype.pipeline import install_host
-from openpype.tools.utils import host_tools, get_openpype_qt_app
-from openpype.lib import run_detached_process
-
-from ayon_wrap.api import WrapHost
+# heavy modules (openpype, Qt) are imported only when needed, so fast start
+# could launch Wrap before they are loaded
 
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
+# Wrap is launched before scene inventory if set to "1"
+FAST_START_ENV = "AYON_WRAP_FAST_START"
+# process keeps running as companion of following launches if set to "1"
+COMPANION_ENV = "AYON_WRAP_COMPANION"
+
 
 def safe_excepthook(*args):
     traceback.print_exception(*args)
 
 
+def is_fast_start_enabled():
+    return os.getenv(FAST_START_ENV) == "1"
+
+
+def is_companion_enabled():
+    return os.getenv(COMPANION_ENV) == "1"
+
+
+class StartupTimer(object):
+    """Collects durations of startup steps for logging."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = []
+
+    @contextlib.contextmanager
+    def measure(self, label):
+        step_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations.append((label, time.perf_counter() - step_started))
+
+    def mark(self, label):
+        """Records time elapsed from start of the launch."""
+        self.durations.append((label, time.perf_counter() - self.started))
+
+    def log_durations(self):
+        log.debug("Startup timings: {}".format(", ".join(
+            f"{label} {duration:.3f}s" for label, duration in self.durations
+        )))
+
+
 def main(subprocess_args):
     """Main entrypoint to Wrap launching, called from pre hook."""
     log.debug("launch_main")
@@ -25,16 +61,157 @@ def main(subprocess_args):
 
     subprocess_args.pop(0)  # remove launch_logic
 
-    host = WrapHost(subprocess_args[-1])
-    install_host(host)
+    timer = StartupTimer()
+    if is_companion_enabled():
+        companion_start(subprocess_args, timer)
+    elif is_fast_start_enabled():
+        fast_start(subprocess_args, timer)
+    else:
+        default_start(subprocess_args, timer)
 
-    os.environ["OPENPYPE_LOG_NO_COLORS"] = "False"
-    app = get_openpype_qt_app()
 
-    host_tools.show_tool_by_name("sceneinventory")
+def default_start(subprocess_args, timer):
+    """Shows scene inventory, Wrap is launched after it is closed."""
+    with timer.measure("imports"):
+        from openpype.lib import run_detached_process
 
+    app, _ = _show_scene_inventory(subprocess_args, timer)
     app.exec_()
     run_detached_process(subprocess_args)
+    timer.mark("wrap started")
+    timer.log_durations()
+
+
+def fast_start(subprocess_args, timer):
+    """Launches Wrap first, scene inventory is loaded when it is running.
+
+    Only module needed to start Wrap is imported before the launch, host
+    and Qt tools are imported afterwards while Wrap is starting up.
+    """
+    with timer.measure("imports"):
+        from openpype.lib import run_detached_process
+
+    run_detached_process(subprocess_args)
+    timer.mark("wrap started")
+
+    app, _ = _show_scene_inventory(subprocess_args, timer)
+    timer.log_durations()
+    app.exec_()
+
+
+def companion_start(subprocess_args, timer):
+    """Launches Wrap and keeps running as companion of following launches.
+
+    Wrap is launched first as in fast start. After scene inventory is
+    closed process keeps running and shows inventory for workfiles of
+    following launches (see `companion.py`). If other companion is already
+    running, this process only behaves as fast start.
+    """
+    with timer.measure("imports"):
+        from openpype.lib import run_detached_process
+
+    run_detached_process(subprocess_args)
+    timer.mark("wrap started")
+
+    # imports whole `ayon_wrap.api`, only after Wrap is started
+    from ayon_wrap.api import companion
+
+    app, host = _show_scene_inventory(subprocess_args, timer)
+    timer.log_durations()
+
+    from concurrent.futures import Future, TimeoutError as FutureTimeout
+    from qtpy import QtCore, QtWidgets
+    from openpype.pipeline import legacy_io
+    from openpype.tools.utils import host_tools
+
+    class RequestBridge(QtCore.QObject):
+        """Passes requests from listener thread to Qt main thread."""
+        open_requested = QtCore.Signal(str, object, object)
+
+    def on_open(workfile_path, env, future):
+        if not future.set_running_or_notify_cancel():
+            # request timed out before main thread got to it
+            return
+        log.debug(f"Companion opening {workfile_path}")
+        try:
+            context_env = {
+                key: value
+                for key, value in env.items()
+                if key.startswith(companion.CONTEXT_ENV_PREFIXES)
+            }
+            os.environ.update(context_env)
+            # session is used by 'get_current_context' and loaders
+            legacy_io.Session.update(context_env)
+            host.set_workfile_path(workfile_path)
+            host_tools.show_tool_by_name("sceneinventory")
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(None)
+
+    def request_open(workfile_path, env):
+        """Waits for result of request handled in main thread."""
+        future = Future()
+        bridge.open_requested.emit(workfile_path, env, future)
+        try:
+            future.result(companion.OPEN_TIMEOUT)
+        except FutureTimeout:
+            future.cancel()
+            raise RuntimeError("Companion didn't open workfile in time")
+
+    bridge = RequestBridge()
+    bridge.open_requested.connect(on_open)
+    server = companion.CompanionServer(request_open)
+    if not server.start():
+        app.exec_()
+        return
+
+    def check_idle():
+        has_visible_window = any(
+            widget.isVisible()
+            for widget in QtWidgets.QApplication.topLevelWidgets()
+        )
+        if (
+            not has_visible_window
+            and server.idle_time > companion.IDLE_TIMEOUT
+        ):
+            log.debug("Companion idle, exiting")
+            app.quit()
+
+    idle_timer = QtCore.QTimer()
+    idle_timer.timeout.connect(check_idle)
+    idle_timer.start(60 * 1000)
+
+    app.setQuitOnLastWindowClosed(False)
+    try:
+        app.exec_()
+    finally:
+        server.close()
+
+
+def _show_scene_inventory(subprocess_args, timer):
+    """Installs host and shows scene inventory.
+
+    Returns:
+        (QApplication, WrapHost) application to be executed by caller and
+            installed host
+    """
+    with timer.measure("tools imports"):
+        from openpype.pipeline import install_host
+        from openpype.tools.utils import host_tools, get_openpype_qt_app
+
+        from ayon_wrap.api import WrapHost
+
+    with timer.measure("host install"):
+        host = WrapHost(subprocess_args[-1])
+        install_host(host)
+
+    os.environ["OPENPYPE_LOG_NO_COLORS"] = "False"
+    with timer.measure("inventory"):
+        app = get_openpype_qt_app()
+        host_tools.show_tool_by_name("sceneinventory")
+    timer.mark("inventory shown")
+    return app, host
 
 
 if __name__ == "__main__":
@@ -1,7 +1,19 @@
+import os
+import re
+import time
+import threading
+import functools
+import contextlib
 import collections
+from concurrent.futures import ThreadPoolExecutor
 
 from openpype.lib import ApplicationLaunchFailed
+from openpype.pipeline import AVALON_CONTAINER_ID
 from openpype.client import (
+    get_assets,
+    get_subsets,
+    get_versions,
+    get_hero_versions,
     get_subset_by_name,
     get_last_versions,
     get_version_by_name,
@@ -12,10 +24,282 @@ from openpype.client import (
 from openpype.pipeline import Anatomy
 from openpype.pipeline.load import get_representation_path_with_anatomy
 
-# expected pattern of placeholder value
+from . import telemetry
+from .executables import find_executable
+from .placeholder_grammar import (
+    GRAMMAR_VERSION_KEY,
+    PLACEHOLDER_PREFIX,
+    PlaceholderSyntaxError,
+    parse_placeholder,
+    upgrade_placeholder
+)
+
+# expected pattern of placeholder value (without options of
+#   `placeholder_grammar`)
 PLACEHOLDER_VALUE_PATTERN = "AYON.asset_name.product_name.version.ext"
+# frame number in output file name of Wrap node, eg. 'mesh_####.obj'
+FRAME_PATTERN = re.compile(r"#+")
+
+# entity cache configuration, could be overridden by environment variables
+ENTITY_CACHE_TTL = float(os.getenv("AYON_WRAP_ENTITY_CACHE_TTL", 120))
+ENTITY_CACHE_SIZE = int(os.getenv("AYON_WRAP_ENTITY_CACHE_SIZE", 1000))
+# counter of queries to server
+DB_CALLS_COUNTER = "wrap.db.calls"
+# versions of placeholder which depend on publishes of product
+DYNAMIC_VERSIONS = ("{latest}", "{hero}")
+# threads of `resolve_placeholders_concurrently`
+RESOLVE_MAX_WORKERS = 4
+
+# limits queries of all threads while `resolve_placeholders_concurrently` runs
+_query_rate_limiter = None
+
+
+class RateLimiter(object):
+    """Limits number of calls per second, shared by threads.
+
+    Calls are spread evenly, `acquire` blocks until next call is allowed.
+
+    Args:
+        rate (float): calls per second
+    """
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _server_query(func):
+    """Wraps query function, counts its calls and applies rate limit."""
+    func = telemetry.counted(DB_CALLS_COUNTER, func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        rate_limiter = _query_rate_limiter
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        return func(*args, **kwargs)
+    return wrapper
+
+
+get_assets = _server_query(get_assets)
+get_subsets = _server_query(get_subsets)
+get_versions = _server_query(get_versions)
+get_hero_versions = _server_query(get_hero_versions)
+get_subset_by_name = _server_query(get_subset_by_name)
+get_last_versions = _server_query(get_last_versions)
+get_version_by_name = _server_query(get_version_by_name)
+get_representations = _server_query(get_representations)
+get_hero_version_by_subset_id = _server_query(get_hero_version_by_subset_id)
+get_asset_by_name = _server_query(get_asset_by_name)
+
+
+class _EntityTypeCache(object):
+    """LRU cache for single entity type with expiration of items.
+
+    Args:
+        max_size (int): maximum of stored items, least recently used items
+            are evicted first
+        ttl (float): seconds after which item is considered obsolete, items
+            never expire if 0
+    """
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is not None:
+            stored, value = item
+            if not self.ttl or time.monotonic() - stored < self.ttl:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return value
+            self._items.pop(key)
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self._items[key] = (time.monotonic(), value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    def discard(self, predicate):
+        """Removes items whose key matches `predicate`."""
+        for key in [key for key in self._items if predicate(key)]:
+            self._items.pop(key)
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._items)
+        }
+
+
+class EntityCache(object):
+    """Memoizes entities queried while resolving placeholders.
+
+    Keeps separate LRU cache for each entity type. One `Anatomy` object is
+    kept per project.
+
+    Keys of entity types:
+        asset: (project_name, asset_name)
+        product: (project_name, asset_id, product_name)
+        version: (project_name, product_id, version) where version is
+            '{latest}', '{hero}' or integer
+        representation: (project_name, version_id, representation_name)
+        anatomy: project_name
 
+    Versions of '{latest}' and '{hero}' change with publishes, they should
+    be valid only during one launch (or other single resolution), use
+    `clear_dynamic_versions` at its start and end.
 
+    Args:
+        max_size (int): maximum of stored items per entity type
+        ttl (float): seconds after which stored entity is queried again
+    """
+    entity_types = ("asset", "product", "version", "representation",
+                    "anatomy")
+
+    def __init__(self, max_size=None, ttl=None):
+        if max_size is None:
+            max_size = ENTITY_CACHE_SIZE
+        if ttl is None:
+            ttl = ENTITY_CACHE_TTL
+        self._lock = threading.Lock()
+        self._caches = {
+            entity_type: _EntityTypeCache(max_size, ttl)
+            for entity_type in self.entity_types
+        }
+
+    def get(self, entity_type, key):
+        """Returns cached entity or None if not cached or expired."""
+        with self._lock:
+            return self._caches[entity_type].get(key)
+
+    def set(self, entity_type, key, entity):
+        with self._lock:
+            self._caches[entity_type].set(key, entity)
+
+    @telemetry.traced()
+    def get_anatomy(self, project_name):
+        anatomy = self.get("anatomy", project_name)
+        if anatomy is None:
+            anatomy = Anatomy(project_name)
+            self.set("anatomy", project_name, anatomy)
+        return anatomy
+
+    def clear(self, entity_type=None):
+        with self._lock:
+            for cache_type, cache in self._caches.items():
+                if entity_type is None or cache_type == entity_type:
+                    cache.clear()
+
+    def clear_dynamic_versions(self, project_name=None, product_ids=None):
+        """Removes cached '{latest}' and '{hero}' versions.
+
+        Args:
+            project_name (str): remove only versions of the project
+            product_ids (Iterable[str]): remove only versions of these
+                products of `project_name`
+        """
+        if product_ids is not None:
+            product_ids = {str(product_id) for product_id in product_ids}
+
+        def is_dynamic(key):
+            key_project_name, product_id, version = key
+            return (
+                version in DYNAMIC_VERSIONS
+                and project_name in (None, key_project_name)
+                and (product_ids is None or str(product_id) in product_ids)
+            )
+
+        with self._lock:
+            self._caches["version"].discard(is_dynamic)
+
+    def get_stats(self):
+        """Returns hit and miss counters and size for each entity type."""
+        with self._lock:
+            return {
+                entity_type: cache.get_stats()
+                for entity_type, cache in self._caches.items()
+            }
+
+
+_entity_cache = None
+
+
+def get_entity_cache():
+    """Returns entity cache shared by whole process."""
+    global _entity_cache
+    if _entity_cache is None:
+        _entity_cache = EntityCache()
+    return _entity_cache
+
+
+def get_load_placeholder(node, container):
+    """Checks if node contains placeholder for loaded items.
+
+    It might be directly in file path of the node (for fresh template), or
+    resolved and saved in `container`. Node file path has precedence as it
+    could be changed by artist, metadata might contain obsolete value.
+
+    Args:
+        node (dict): dictionary of node from Wrap file
+        container (dict): container metadata for resolved and saved loaded
+            container of the node (optional)
+    Returns:
+        (str): placeholder in format `AYON.{currentAsset}.renderMain...` or
+            None, placeholder of container is in current grammar version
+    """
+    if not node.get("params"):
+        return None
+    file_path_doc = node["params"].get("fileName")
+    if not file_path_doc:
+        return None
+
+    if file_path_doc["value"].startswith(PLACEHOLDER_PREFIX):
+        return file_path_doc["value"]
+    if container and container["id"] == AVALON_CONTAINER_ID:
+        # containers without version were written by grammar version 1
+        return upgrade_placeholder(container["original_value"],
+                                   container.get(GRAMMAR_VERSION_KEY, 1))
+    return None
+
+
+def get_load_placeholders(workfile):
+    """Returns load placeholders of all nodes of workfile.
+
+    Args:
+        workfile (WrapWorkfile)
+    Returns:
+        (list) of (node_name, node, placeholder)
+    """
+    load_placeholders = []
+    for node_name, node in workfile.get_placeholder_nodes():
+        placeholder = get_load_placeholder(
+            node, workfile.get_container(node["nodeId"]))
+        if placeholder:
+            load_placeholders.append((node_name, node, placeholder))
+    return load_placeholders
+
+
+@telemetry.traced()
 def fill_placeholder(placeholder, workfile_path, context):
     """Replaces placeholder with actual path to representation
 
@@ -31,99 +315,518 @@ def fill_placeholder(placeholder, workfile_path, context):
         product, version etc.)
 
     """
-    token_and_values = get_token_and_values(placeholder)
+    tokens = _parse_placeholder(placeholder)
 
     project_name = context["project_name"]
 
-    asset_name = token_and_values["asset_name"]
-    asset = _get_asset(project_name, asset_name, context)
+    asset = _get_asset(project_name, tokens.asset_name, context)
     asset_id = asset["_id"]
 
-    product_name = token_and_values["product_name"]
+    product_name = tokens.product_name
     product_id = _get_product_id(project_name,
                                  asset_id,
                                  product_name,
                                  asset["name"])
 
-    version_val = token_and_values["version"]
     version_id = _get_version(project_name, product_name, product_id,
-                              version_val, workfile_path)
+                              tokens.version, workfile_path)
 
-    ext = token_and_values["ext"]
     repre, repre_path = _get_repre_and_path(project_name,
                                             product_name,
-                                            ext, version_id)
+                                            tokens.representation,
+                                            version_id)
+    _validate_repre(repre, tokens)
 
     return repre, repre_path
 
 
+@telemetry.traced()
+def resolve_placeholders(placeholders, workfile_path, context):
+    """Resolves multiple placeholders at once with bulk queries.
+
+    Works in two phases. All placeholders are parsed first, then assets,
+    products, versions and representations are queried with single query
+    per entity type for all of them. Number of queries doesn't depend on
+    number of placeholders, only on number of distinct entity types.
+
+    Args:
+        placeholders (Iterable[str]): in format PLACEHOLDER_VALUE_PATTERN,
+            duplicates are resolved only once
+        workfile_path (str): absolute path to opened workfile
+        context (dict): contains context data from launch context
+    Returns:
+        (dict) placeholder -> (dict, str) resolved representation and path
+            to its file which should be used instead of placeholder
+    Raises
+        (ApplicationLaunchFailed) if any path cannot be resolved (cannot find
+        product, version etc.)
+    """
+    tokens_by_placeholder = {
+        placeholder: _parse_placeholder(placeholder)
+        for placeholder in placeholders
+    }
+    if not tokens_by_placeholder:
+        return {}
+
+    project_name = context["project_name"]
+
+    asset_names_by_placeholder = {
+        placeholder: _get_asset_name(tokens.asset_name, context)
+        for placeholder, tokens in tokens_by_placeholder.items()
+    }
+    assets_by_name = _get_assets_by_name(
+        project_name, set(asset_names_by_placeholder.values()), context)
+
+    product_names_by_asset_id = collections.defaultdict(set)
+    for placeholder, tokens in tokens_by_placeholder.items():
+        asset = assets_by_name[asset_names_by_placeholder[placeholder]]
+        product_names_by_asset_id[asset["_id"]].add(tokens.product_name)
+    product_ids = _get_product_ids(project_name, product_names_by_asset_id,
+                                   assets_by_name)
+
+    version_requests = {}
+    for placeholder, tokens in tokens_by_placeholder.items():
+        asset = assets_by_name[asset_names_by_placeholder[placeholder]]
+        product_name = tokens.product_name
+        product_id = product_ids[(asset["_id"], product_name)]
+        version_requests[placeholder] = (
+            product_id,
+            product_name,
+            _parse_version_value(tokens.version, workfile_path)
+        )
+    version_ids = _get_version_ids(project_name,
+                                   set(version_requests.values()))
+
+    repre_requests = {}
+    for placeholder, tokens in tokens_by_placeholder.items():
+        version_id = version_ids[version_requests[placeholder]]
+        _, product_name, _ = version_requests[placeholder]
+        repre_requests[placeholder] = (version_id, tokens.representation,
+                                       product_name)
+    repres = _get_repres(project_name, set(repre_requests.values()))
+
+    anatomy = get_entity_cache().get_anatomy(project_name)
+    resolved = {}
+    for placeholder, repre_request in repre_requests.items():
+        repre = repres[repre_request]
+        _validate_repre(repre, tokens_by_placeholder[placeholder])
+        resolved[placeholder] = (
+            repre,
+            get_representation_path_with_anatomy(repre, anatomy)
+        )
+    return resolved
+
+
+@contextlib.contextmanager
+def _limit_query_rate(max_queries_per_second):
+    global _query_rate_limiter
+    if not max_queries_per_second:
+        yield
+        return
+    orig_rate_limiter = _query_rate_limiter
+    _query_rate_limiter = RateLimiter(max_queries_per_second)
+    try:
+        yield
+    finally:
+        _query_rate_limiter = orig_rate_limiter
+
+
+@telemetry.traced()
+def resolve_placeholders_concurrently(placeholders, workfile_path, context,
+                                      max_workers=RESOLVE_MAX_WORKERS,
+                                      max_queries_per_second=None):
+    """Resolves placeholders in parallel, each one by `fill_placeholder`.
+
+    Alternative to bulk queries of `resolve_placeholders`, placeholders are
+    resolved independently in pool of `max_workers` threads. Entities are
+    shared through entity cache, but placeholders of same product resolved
+    at the same time might query it twice.
+
+    Args:
+        placeholders (Iterable[str]): in format PLACEHOLDER_VALUE_PATTERN,
+            duplicates are resolved only once
+        workfile_path (str): absolute path to opened workfile
+        context (dict): contains context data from launch context
+        max_workers (int): number of threads
+        max_queries_per_second (float): limit of queries to server of all
+            threads, no limit if 0 or None
+    Returns:
+        (collections.OrderedDict) placeholder -> (dict, str) resolved
+            representation and path, in order of `placeholders`
+    Raises
+        (ApplicationLaunchFailed) with errors of all placeholders which
+        cannot be resolved, in order of `placeholders`
+    """
+    placeholders = list(dict.fromkeys(placeholders))
+    parent_span = telemetry.get_current_span()
+
+    def resolve(placeholder):
+        with telemetry.span("resolve_placeholder", parent=parent_span,
+                            placeholder=placeholder):
+            return fill_placeholder(placeholder, workfile_path, context)
+
+    with _limit_query_rate(max_queries_per_second):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(resolve, placeholder)
+                for placeholder in placeholders
+            ]
+
+    resolved = collections.OrderedDict()
+    errors = []
+    for placeholder, future in zip(placeholders, futures):
+        try:
+            resolved[placeholder] = future.result()
+        except ApplicationLaunchFailed as exc:
+            errors.append(f"{placeholder}: {str(exc).strip()}")
+    if errors:
+        raise ApplicationLaunchFailed(
+            f"Cannot resolve {len(errors)} of {len(placeholders)} "
+            "placeholders:\n" + "\n".join(errors))
+    return resolved
+
+
 def get_token_and_values(placeholder):
-    return dict(zip(PLACEHOLDER_VALUE_PATTERN.split("."),
-                    placeholder.split(".")))
+    """Returns tokens of placeholder as dictionary.
+
+    Kept for compatibility, 'ext' is name of representation. Use
+    `parse_placeholder` for options of placeholder.
+
+    Raises
+        (ApplicationLaunchFailed) if placeholder doesn't match grammar
+    """
+    tokens = _parse_placeholder(placeholder)
+    return {
+        "asset_name": tokens.asset_name,
+        "product_name": tokens.product_name,
+        "version": tokens.version,
+        "ext": tokens.representation
+    }
+
+
+def _parse_placeholder(placeholder):
+    try:
+        return parse_placeholder(placeholder)
+    except PlaceholderSyntaxError as exc:
+        raise ApplicationLaunchFailed(str(exc))
+
 
+def _validate_repre(repre, tokens):
+    """Checks options of placeholder which are not part of query."""
+    context = repre.get("context") or {}
+    if tokens.ext is not None and context.get("ext") != tokens.ext:
+        raise ApplicationLaunchFailed(
+            f"Representation '{tokens.representation}' of product "
+            f"'{tokens.product_name}' has extension '{context.get('ext')}', "
+            f"'{tokens.ext}' is required.")
 
+    if tokens.task is not None:
+        task = context.get("task")
+        if isinstance(task, dict):
+            task = task.get("name")
+        if task != tokens.task:
+            raise ApplicationLaunchFailed(
+                f"Representation '{tokens.representation}' of product "
+                f"'{tokens.product_name}' was published from task "
+                f"'{task}', '{tokens.task}' is required.")
+
+
+@telemetry.traced()
 def _get_repre_and_path(project_name, product_name, ext, version_id):
-    repres = get_representations(project_name, version_ids=[version_id],
-                                 representation_names=[ext])
-    if not repres:
-        raise ApplicationLaunchFailed(f"Cannot find representations with "
-                                      f"'{ext}' for product '{product_name}'.\n"  # noqa
-                                      f"Cannot import them.")
-    repre = list(repres)[0]
+    cache = get_entity_cache()
+    cache_key = (project_name, version_id, ext)
+    repre = cache.get("representation", cache_key)
+    if repre is None:
+        repres = list(get_representations(project_name,
+                                          version_ids=[version_id],
+                                          representation_names=[ext]))
+        if not repres:
+            raise ApplicationLaunchFailed(f"Cannot find representations with "
+                                          f"'{ext}' for product '{product_name}'.\n"  # noqa
+                                          f"Cannot import them.")
+        repre = repres[0]
+        cache.set("representation", cache_key, repre)
 
-    return repre, get_representation_path_with_anatomy(repre,
-                                                       Anatomy(project_name))
+    anatomy = cache.get_anatomy(project_name)
+    return repre, get_representation_path_with_anatomy(repre, anatomy)
 
 
+@telemetry.traced()
 def _get_version(project_name, product_name, product_id,
                  version_val, workfile_path):
-    if version_val == "{latest}":
-        versions = get_last_versions(project_name, [product_id])
-        version_doc = versions[product_id]
-    elif version_val == "{hero}":
-        version_doc = get_hero_version_by_subset_id(project_name,
-                                                    product_id)
-    else:
-        try:
-            version_int = int(version_val)
-        except:
-            raise ApplicationLaunchFailed(
-                f"Couldn't convert value '{version_val}' to "
-                f"integer. Please fix it in '{workfile_path}'")
-        version_doc = get_version_by_name(project_name, version_int,
-                                          product_id)
-    if not version_doc:
-        raise ApplicationLaunchFailed(f"Didn't find version "
-                                      f"for product '{product_name}.\n")
+    version = _parse_version_value(version_val, workfile_path)
+    cache = get_entity_cache()
+    cache_key = (project_name, product_id, version)
+    version_doc = cache.get("version", cache_key)
+    if version_doc is None:
+        if version == "{latest}":
+            versions = get_last_versions(project_name, [product_id])
+            version_doc = versions.get(product_id)
+        elif version == "{hero}":
+            version_doc = get_hero_version_by_subset_id(project_name,
+                                                        product_id)
+        else:
+            version_doc = get_version_by_name(project_name, version,
+                                              product_id)
+        if not version_doc:
+            raise ApplicationLaunchFailed(f"Didn't find version "
+                                          f"for product '{product_name}.\n")
+        cache.set("version", cache_key, version_doc)
     version_id = version_doc["_id"]
     return version_id
 
 
+@telemetry.traced()
 def _get_asset(project_name, asset_name, context):
     if asset_name == "{currentAsset}":
         if context.get("asset_doc"):
             return context["asset_doc"]
         asset_name = context["asset_name"]
 
-    asset = get_asset_by_name(project_name, asset_name)
-    if not asset:
-        raise ApplicationLaunchFailed(f"Couldn't find '{asset_name}' in "
-                                      f"'{project_name}'")
+    cache = get_entity_cache()
+    cache_key = (project_name, asset_name)
+    asset = cache.get("asset", cache_key)
+    if asset is None:
+        asset = get_asset_by_name(project_name, asset_name)
+        if not asset:
+            raise ApplicationLaunchFailed(f"Couldn't find '{asset_name}' in "
+                                          f"'{project_name}'")
+        cache.set("asset", cache_key, asset)
 
     return asset
 
 
+@telemetry.traced()
 def _get_product_id(project_name, asset_id, product_name, asset_name):
-    product = get_subset_by_name(
-        project_name, product_name, asset_id, fields=["_id"]
-    )
-    if not product:
-        raise ApplicationLaunchFailed(f"Couldn't find '{product_name}' for "
-                                      f"'{asset_name}'")
+    cache = get_entity_cache()
+    cache_key = (project_name, asset_id, product_name)
+    product = cache.get("product", cache_key)
+    if product is None:
+        product = get_subset_by_name(
+            project_name, product_name, asset_id, fields=["_id"]
+        )
+        if not product:
+            raise ApplicationLaunchFailed(f"Couldn't find '{product_name}' "
+                                          f"for '{asset_name}'")
+        cache.set("product", cache_key, product)
     product_id = product["_id"]
     return product_id
 
 
+def _get_asset_name(asset_name, context):
+    if asset_name == "{currentAsset}":
+        if context.get("asset_doc"):
+            return context["asset_doc"]["name"]
+        return context["asset_name"]
+    return asset_name
+
+
+@telemetry.traced()
+def _get_assets_by_name(project_name, asset_names, context):
+    cache = get_entity_cache()
+    assets_by_name = {}
+    asset_doc = context.get("asset_doc")
+    if asset_doc and asset_doc["name"] in asset_names:
+        assets_by_name[asset_doc["name"]] = asset_doc
+
+    for asset_name in asset_names - set(assets_by_name):
+        asset = cache.get("asset", (project_name, asset_name))
+        if asset is not None:
+            assets_by_name[asset_name] = asset
+
+    missing_names = asset_names - set(assets_by_name)
+    if missing_names:
+        for asset in get_assets(project_name, asset_names=missing_names,
+                                fields=["_id", "name"]):
+            assets_by_name[asset["name"]] = asset
+            cache.set("asset", (project_name, asset["name"]), asset)
+
+    for asset_name in sorted(asset_names):
+        if asset_name not in assets_by_name:
+            raise ApplicationLaunchFailed(f"Couldn't find '{asset_name}' in "
+                                          f"'{project_name}'")
+    return assets_by_name
+
+
+@telemetry.traced()
+def _get_product_ids(project_name, product_names_by_asset_id,
+                     assets_by_name):
+    """Returns (asset_id, product_name) -> product_id"""
+    cache = get_entity_cache()
+    product_ids = {}
+    missing_names_by_asset_ids = collections.defaultdict(list)
+    for asset_id, product_names in product_names_by_asset_id.items():
+        for product_name in product_names:
+            product = cache.get("product",
+                                (project_name, asset_id, product_name))
+            if product is not None:
+                product_ids[(asset_id, product_name)] = product["_id"]
+            else:
+                missing_names_by_asset_ids[asset_id].append(product_name)
+
+    if missing_names_by_asset_ids:
+        for product in get_subsets(
+                project_name,
+                names_by_asset_ids=dict(missing_names_by_asset_ids),
+                fields=["_id", "name", "parent"]):
+            product_ids[(product["parent"], product["name"])] = product["_id"]
+            cache.set("product",
+                      (project_name, product["parent"], product["name"]),
+                      product)
+
+    asset_names_by_id = {asset["_id"]: asset_name
+                         for asset_name, asset in assets_by_name.items()}
+    for asset_id, product_names in product_names_by_asset_id.items():
+        for product_name in sorted(product_names):
+            if (asset_id, product_name) not in product_ids:
+                asset_name = asset_names_by_id[asset_id]
+                raise ApplicationLaunchFailed(
+                    f"Couldn't find '{product_name}' for '{asset_name}'")
+    return product_ids
+
+
+def _parse_version_value(version_val, workfile_path):
+    """Returns '{latest}', '{hero}' or version as integer"""
+    if version_val in ("{latest}", "{hero}"):
+        return version_val
+    try:
+        return int(version_val)
+    except:
+        raise ApplicationLaunchFailed(
+            f"Couldn't convert value '{version_val}' to "
+            f"integer. Please fix it in '{workfile_path}'")
+
+
+@telemetry.traced()
+def _get_version_ids(project_name, version_requests):
+    """Returns (product_id, product_name, version) -> version_id
+
+    Single query is used for each type of version request (latest, hero or
+    explicit version).
+    """
+    cache = get_entity_cache()
+    version_docs = {}
+    latest_product_ids = set()
+    hero_product_ids = set()
+    explicit_versions = collections.defaultdict(set)
+    for product_id, _, version in version_requests:
+        version_doc = cache.get("version", (project_name, product_id, version))
+        if version_doc is not None:
+            version_docs[(product_id, version)] = version_doc
+        elif version == "{latest}":
+            latest_product_ids.add(product_id)
+        elif version == "{hero}":
+            hero_product_ids.add(product_id)
+        else:
+            explicit_versions[product_id].add(version)
+
+    queried_keys = set()
+    if latest_product_ids:
+        last_versions = get_last_versions(project_name,
+                                          list(latest_product_ids),
+                                          fields=["_id", "parent"])
+        for product_id, version_doc in last_versions.items():
+            version_docs[(product_id, "{latest}")] = version_doc
+            queried_keys.add((product_id, "{latest}"))
+
+    if hero_product_ids:
+        for version_doc in get_hero_versions(project_name,
+                                             subset_ids=hero_product_ids,
+                                             fields=["_id", "parent"]):
+            version_docs[(version_doc["parent"], "{hero}")] = version_doc
+            queried_keys.add((version_doc["parent"], "{hero}"))
+
+    if explicit_versions:
+        versions = set()
+        for product_versions in explicit_versions.values():
+            versions.update(product_versions)
+        for version_doc in get_versions(project_name,
+                                        subset_ids=list(explicit_versions),
+                                        versions=versions,
+                                        fields=["_id", "parent", "name"]):
+            product_id = version_doc["parent"]
+            if version_doc["name"] in explicit_versions.get(product_id, []):
+                version_docs[(product_id, version_doc["name"])] = version_doc
+                queried_keys.add((product_id, version_doc["name"]))
+
+    for product_id, version in queried_keys:
+        cache.set("version", (project_name, product_id, version),
+                  version_docs[(product_id, version)])
+
+    version_ids = {}
+    for version_request in version_requests:
+        product_id, product_name, version = version_request
+        version_doc = version_docs.get((product_id, version))
+        if not version_doc:
+            raise ApplicationLaunchFailed(f"Didn't find version "
+                                          f"for product '{product_name}.\n")
+        version_ids[version_request] = version_doc["_id"]
+    return version_ids
+
+
+@telemetry.traced()
+def _get_repres(project_name, repre_requests):
+    """Returns (version_id, ext, product_name) -> representation"""
+    cache = get_entity_cache()
+    repres_by_key = {}
+    names_by_version_ids = collections.defaultdict(set)
+    for version_id, ext, _ in repre_requests:
+        repre = cache.get("representation", (project_name, version_id, ext))
+        if repre is not None:
+            repres_by_key[(version_id, ext)] = repre
+        else:
+            names_by_version_ids[version_id].add(ext)
+
+    if names_by_version_ids:
+        for repre in get_representations(
+                project_name,
+                names_by_version_ids={
+                    version_id: list(names)
+                    for version_id, names in names_by_version_ids.items()
+                }):
+            key = (repre["parent"], repre["name"])
+            if key not in repres_by_key:
+                repres_by_key[key] = repre
+                cache.set("representation", (project_name, *key), repre)
+
+    repres = {}
+    for repre_request in repre_requests:
+        version_id, ext, product_name = repre_request
+        repre = repres_by_key.get((version_id, ext))
+        if not repre:
+            raise ApplicationLaunchFailed(
+                f"Cannot find representations with "
+                f"'{ext}' for product '{product_name}'.\n"
+                f"Cannot import them.")
+        repres[repre_request] = repre
+    return repres
+
+
+def has_frame_pattern(file_path):
+    """Checks if output `file_path` is written per frame."""
+    return bool(FRAME_PATTERN.search(os.path.basename(file_path)))
+
+
+def get_frame_chunks(frame_start, frame_end, chunk_size):
+    """Splits inclusive frame range into list of (start, end) chunks."""
+    chunk_size = max(int(chunk_size), 1)
+    return [
+        (chunk_start, min(chunk_start + chunk_size - 1, frame_end))
+        for chunk_start in range(frame_start, frame_end + 1, chunk_size)
+    ]
+
+
+def get_frame_ranges(frames):
+    """Groups frames into list of inclusive (start, end) continuous ranges."""
+    frame_ranges = []
+    for frame in sorted(set(frames)):
+        if frame_ranges and frame_ranges[-1][1] == frame - 1:
+            frame_ranges[-1] = (frame_ranges[-1][0], frame)
+        else:
+            frame_ranges.append((frame, frame))
+    return frame_ranges
+
+
 def find_variant_key(application_manager, host):
     """Searches for latest installed variant for 'host'
 
@@ -135,20 +838,33 @@ def find_variant_key(application_manager, host):
         Raises:
             (ValueError) if no variant found
     """
+    return _find_executable(application_manager, host)[0]
+
+
+def find_executable_path(application_manager, host):
+    """Returns path to executable of latest installed variant for 'host'
+
+    Resolved executable is cached on disk, see `executables.find_executable`.
+
+        Args:
+            application_manager (ApplicationManager)
+            host (str)
+        Returns
+            (string)
+        Raises:
+            (ValueError) if no variant found
+    """
+    return _find_executable(application_manager, host)[1]
+
+
+@telemetry.traced()
+def _find_executable(application_manager, host):
     app_group = application_manager.app_groups.get(host)
     if not app_group or not app_group.enabled:
         raise ValueError("No application '{}' configured".format(host))
 
-    found_variant_key = None
-    # finds most up-to-date variant if any installed
-    sorted_variants = collections.OrderedDict(
-        sorted(app_group.variants.items()))
-    for variant_key, variant in sorted_variants.items():
-        for executable in variant.executables:
-            if executable.exists():
-                found_variant_key = variant_key
-
-    if not found_variant_key:
+    found = find_executable(app_group)
+    if not found:
         raise ValueError("No executable for '{}' found".format(host))
 
-    return found_variant_key
+    return found
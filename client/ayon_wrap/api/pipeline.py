@@ -1,5 +1,4 @@
 import os
-import json
 
 import pyblish.api
 
@@ -15,6 +14,11 @@ from openpype.host import (
 )
 from ayon_wrap import WRAP_HOST_DIR
 
+from . import telemetry
+from .placeholder_grammar import GRAMMAR_VERSION, GRAMMAR_VERSION_KEY
+from .workfile_io import read_node_metadata
+from .watcher import create_file_watcher
+
 
 PLUGINS_DIR = os.path.join(WRAP_HOST_DIR, "plugins")
 PUBLISH_PATH = os.path.join(PLUGINS_DIR, "publish")
@@ -27,8 +31,22 @@ class WrapHost(HostBase, ILoadHost):
 
     def __init__(self, workfile_path):
         self._workfile_path = workfile_path
+        # containers are read again only if workfile changes
+        self._containers = None
+        self._watcher = None
         super(WrapHost, self).__init__()
 
+    def get_workfile_path(self):
+        return self._workfile_path
+
+    def set_workfile_path(self, workfile_path):
+        """Points host to different workfile, used by companion process."""
+        self._workfile_path = workfile_path
+        self._containers = None
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
     def install(self):
         print("Installing Wrap host...")
 
@@ -39,6 +57,7 @@ class WrapHost(HostBase, ILoadHost):
         register_creator_plugin_path(CREATE_PATH)
         self.log.debug(PUBLISH_PATH)
 
+    @telemetry.traced()
     def get_containers(self):
         """Get list of loaded containers.
 
@@ -46,22 +65,24 @@ class WrapHost(HostBase, ILoadHost):
         path of chosen representation and storing this metadata into the
         workfile.
 
+        Workfile is watched for changes, cached containers are returned
+        until it changes. Only metadata are read, nodes are skipped.
+
         Returns:
             (list of dict with schema similar to "openpype:container-2.0" -
              "nodeId" added to point to node in Wrap)
         """
-        with open(self._workfile_path, "r") as f:
-            content = json.load(f)
-
-            metadata = (content.get("metadata", {})
-                               .get("AYON_NODE_METADATA", []))
-
-        containers = []
-        for item in metadata:
-            if item["id"] == AVALON_CONTAINER_ID:
-                containers.append(item)
-
-        return containers
+        if self._watcher is None:
+            # created before reading so no change is missed
+            self._watcher = create_file_watcher(self._workfile_path)
+            self._containers = None
+        if self._watcher.has_changed() or self._containers is None:
+            self._containers = [
+                item
+                for item in read_node_metadata(self._workfile_path)
+                if item.get("id") == AVALON_CONTAINER_ID
+            ]
+        return [dict(container) for container in self._containers]
 
 
 def containerise(name,
@@ -95,6 +116,7 @@ def containerise(name,
         "loader": str(loader),
         "representation": str(context["representation"]["_id"]),
         "original_value": data["original_value"],
+        GRAMMAR_VERSION_KEY: GRAMMAR_VERSION,
         "nodeId": data["nodeId"],
         "objectName": data["node_name"]
     }
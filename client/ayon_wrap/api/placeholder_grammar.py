@@ -0,0 +1,182 @@
+"""Grammar of load placeholders in file names of Wrap nodes.
+
+Placeholder (grammar version 2):
+    AYON.<asset_name>.<product_name>.<version>.<representation>[.<option>]
+
+    version - '{latest}', '{hero}' or integer
+    representation - name of representation (eg. 'abc')
+    option - 'key=value', supported keys:
+        ext - required extension of representation file, if it differs
+            from representation name
+        task - required task the representation was published from
+
+Dots and backslashes in values are escaped by backslash, eg.
+'AYON.sh010\\.a.modelMain.{latest}.abc.task=modeling'.
+
+Version 1 placeholders ('AYON.asset_name.product_name.version.ext') were
+split by dots without escaping, the last token was used as representation
+name. Containers store grammar version of their 'original_value' (key
+GRAMMAR_VERSION_KEY, missing in containers of version 1), older
+placeholders are parsed by their grammar and upgraded by
+`upgrade_placeholder`.
+
+Parsed placeholders are cached, same placeholder is usually used by many
+nodes and workfiles.
+"""
+import re
+import json
+import functools
+import collections
+
+GRAMMAR_VERSION = 2
+# key of container with grammar version of its 'original_value'
+GRAMMAR_VERSION_KEY = "placeholder_grammar"
+PLACEHOLDER_PREFIX = "AYON"
+PLACEHOLDER_OPTIONS = ("ext", "task")
+# parsed placeholders kept in memory
+PARSE_CACHE_SIZE = 4096
+
+_TOKEN = r"(?:[^.\\]|\\.)+"
+PLACEHOLDER_REGEX = re.compile(
+    rf"{PLACEHOLDER_PREFIX}"
+    rf"\.(?P<asset_name>{_TOKEN})"
+    rf"\.(?P<product_name>{_TOKEN})"
+    rf"\.(?P<version>{_TOKEN})"
+    rf"\.(?P<representation>{_TOKEN})"
+    rf"(?P<options>(?:\.{_TOKEN})*)"
+)
+_OPTION_REGEX = re.compile(rf"\.({_TOKEN})")
+_ESCAPED_REGEX = re.compile(r"\\(.)")
+_ESCAPE_REGEX = re.compile(r"([.\\])")
+# placeholder in file name of node in raw (JSON) workfile content
+_WORKFILE_PLACEHOLDER_REGEX = re.compile(
+    rf'"value"\s*:\s*"({PLACEHOLDER_PREFIX}\.(?:[^"\\]|\\.)*)"')
+
+
+class PlaceholderSyntaxError(ValueError):
+    """Placeholder doesn't match grammar."""
+
+
+class PlaceholderTokens(collections.namedtuple(
+        "PlaceholderTokens",
+        ("asset_name", "product_name", "version", "representation", "ext",
+         "task"))):
+    """Parsed placeholder, 'ext' and 'task' are None if not specified."""
+    __slots__ = ()
+
+    def format(self):
+        """Returns placeholder string, values are escaped."""
+        tokens = [
+            PLACEHOLDER_PREFIX,
+            _escape(self.asset_name),
+            _escape(self.product_name),
+            _escape(str(self.version)),
+            _escape(self.representation)
+        ]
+        for key in PLACEHOLDER_OPTIONS:
+            value = getattr(self, key)
+            if value is not None:
+                tokens.append(f"{key}={_escape(value)}")
+        return ".".join(tokens)
+
+
+def _escape(value):
+    return _ESCAPE_REGEX.sub(r"\\\1", value)
+
+
+def _unescape(value):
+    return _ESCAPED_REGEX.sub(r"\1", value)
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_placeholder(placeholder, grammar_version=GRAMMAR_VERSION):
+    """Parses placeholder to its tokens.
+
+    Args:
+        placeholder (str): eg. 'AYON.{currentAsset}.modelMain.{latest}.abc'
+        grammar_version (int): version of grammar `placeholder` was
+            written in
+    Returns:
+        (PlaceholderTokens)
+    Raises:
+        (PlaceholderSyntaxError) if placeholder doesn't match grammar
+    """
+    if grammar_version == 1:
+        return _parse_placeholder_v1(placeholder)
+    if grammar_version != GRAMMAR_VERSION:
+        raise PlaceholderSyntaxError(
+            f"Unknown grammar version {grammar_version} of placeholder "
+            f"'{placeholder}'.")
+
+    match = PLACEHOLDER_REGEX.fullmatch(placeholder)
+    if not match:
+        raise PlaceholderSyntaxError(
+            f"Placeholder '{placeholder}' doesn't match "
+            f"'{PLACEHOLDER_PREFIX}.asset_name.product_name.version."
+            "representation'. Escape dots in names by backslash.")
+
+    options = dict.fromkeys(PLACEHOLDER_OPTIONS)
+    for option in _OPTION_REGEX.findall(match.group("options")):
+        key, sep, value = option.partition("=")
+        if not sep or key not in options:
+            raise PlaceholderSyntaxError(
+                f"Unknown option '{_unescape(option)}' of placeholder "
+                f"'{placeholder}', expected "
+                f"{', '.join(f'{key}=value' for key in options)}.")
+        options[key] = _unescape(value)
+
+    return PlaceholderTokens(
+        _unescape(match.group("asset_name")),
+        _unescape(match.group("product_name")),
+        _unescape(match.group("version")),
+        _unescape(match.group("representation")),
+        **options
+    )
+
+
+def _parse_placeholder_v1(placeholder):
+    tokens = placeholder.split(".")
+    if len(tokens) != 5 or tokens[0] != PLACEHOLDER_PREFIX:
+        raise PlaceholderSyntaxError(
+            f"Placeholder '{placeholder}' doesn't match "
+            f"'{PLACEHOLDER_PREFIX}.asset_name.product_name.version.ext'.")
+    return PlaceholderTokens(*tokens[1:], ext=None, task=None)
+
+
+def upgrade_placeholder(placeholder, grammar_version):
+    """Returns placeholder written in older grammar in current grammar.
+
+    Placeholder which doesn't match its grammar is returned unchanged, it
+    is reported when it is resolved.
+
+    Args:
+        placeholder (str)
+        grammar_version (int): version of grammar `placeholder` was
+            written in
+    Returns:
+        (str)
+    """
+    if grammar_version == GRAMMAR_VERSION:
+        return placeholder
+    try:
+        return parse_placeholder(placeholder, grammar_version).format()
+    except PlaceholderSyntaxError:
+        return placeholder
+
+
+def find_placeholders(content):
+    """Finds placeholders in file names of nodes in raw workfile content.
+
+    Whole content is scanned by single regex, without parsing JSON.
+    Placeholders are not validated. Placeholders of resolved nodes (stored
+    in containers) are not found.
+
+    Args:
+        content (str): content of workfile
+    Returns:
+        (list[str]) placeholders in order of appearance, with duplicates
+    """
+    return [
+        json.loads(f'"{value}"')
+        for value in _WORKFILE_PLACEHOLDER_REGEX.findall(content)
+    ]
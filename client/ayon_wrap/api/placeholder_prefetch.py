@@ -0,0 +1,138 @@
+"""Prefetch of entities needed by placeholder replacement on launch.
+
+Entities queried by `ReplacePlaceholders` hook are known from the workfile
+and launch context before the hook runs. Prefetch started by early hook
+reads the workfile and resolves its placeholders in background thread, so
+entity cache, Anatomy and parsed workfile are warm (or in flight) when
+placeholders are replaced.
+
+Placeholders still in file names of nodes are never resolved by snapshot,
+they are found by scan of raw workfile content and resolved while the
+workfile is parsed and snapshots of resolved nodes are checked.
+
+Prefetch never fails the launch, errors are logged and the hook resolves
+placeholders (and reports errors) as without prefetch.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from openpype.lib import ApplicationLaunchFailed
+
+from . import telemetry
+from .lib import get_entity_cache, get_load_placeholders, resolve_placeholders
+from .placeholder_grammar import (
+    PlaceholderSyntaxError,
+    find_placeholders,
+    parse_placeholder
+)
+from .placeholder_snapshot import create_snapshots, get_fresh_containers
+from .workfile import WrapWorkfile
+
+log = logging.getLogger(__name__)
+
+# key of launch context data with prefetch future
+PREFETCH_DATA_KEY = "wrap_placeholder_prefetch"
+
+
+def start_prefetch(workfile_path, context, reuse_snapshots=True):
+    """Starts prefetch in background thread.
+
+    Args:
+        workfile_path (str)
+        context (dict): data of launch context, 'project_name',
+            'asset_name' and optionally 'asset_doc'
+        reuse_snapshots (bool): check snapshots of containers, only stale
+            placeholders are prefetched
+    Returns:
+        (concurrent.futures.Future) with result of `prefetch`
+    """
+    executor = ThreadPoolExecutor(max_workers=1,
+                                  thread_name_prefix="WrapPrefetch")
+    parent_span = telemetry.get_current_span()
+    future = executor.submit(prefetch, workfile_path, dict(context),
+                             reuse_snapshots, parent_span)
+    executor.shutdown(wait=False)
+    return future
+
+
+def prefetch(workfile_path, context, reuse_snapshots=True,
+             parent_span=None):
+    """Reads workfile and resolves its placeholders to fill caches.
+
+    Returns:
+        (dict) 'change_tokens' queried for snapshots ((version, product_id)
+            -> token) and 'snapshots' of resolved placeholders, reused by
+            `get_fresh_containers` and `create_snapshots`, None if prefetch
+            failed
+    """
+    with telemetry.span("prefetch_placeholders", parent=parent_span):
+        executor = ThreadPoolExecutor(max_workers=1,
+                                      thread_name_prefix="WrapPrefetch")
+        try:
+            project_name = context["project_name"]
+            entity_cache = get_entity_cache()
+            # versions cached before this launch might be obsolete
+            entity_cache.clear_dynamic_versions()
+            entity_cache.get_anatomy(project_name)
+
+            scanned = _scan_placeholders(workfile_path)
+            scanned_future = executor.submit(
+                _resolve_scanned, scanned, workfile_path, context,
+                telemetry.get_current_span())
+
+            workfile = WrapWorkfile.open(workfile_path, partial=True)
+            load_placeholders = get_load_placeholders(workfile)
+            fresh_containers = {}
+            change_tokens = {}
+            if reuse_snapshots:
+                fresh_containers, change_tokens = get_fresh_containers(
+                    workfile, load_placeholders, context)
+
+            resolved = scanned_future.result()
+            resolved.update(resolve_placeholders(
+                {
+                    placeholder
+                    for node_name, _, placeholder in load_placeholders
+                    if node_name not in fresh_containers
+                    and placeholder not in resolved
+                },
+                workfile_path,
+                context
+            ))
+            snapshots = {}
+            if reuse_snapshots:
+                snapshots = create_snapshots(project_name, resolved)
+            return {"change_tokens": change_tokens, "snapshots": snapshots}
+
+        except ApplicationLaunchFailed as exc:
+            # reported by the hook
+            log.debug(f"Prefetch of placeholders stopped: {exc}")
+        except Exception:
+            log.warning("Prefetch of placeholders failed", exc_info=True)
+        finally:
+            executor.shutdown(wait=False)
+        return None
+
+
+def _scan_placeholders(workfile_path):
+    """Returns valid placeholders in file names of nodes, without parsing.
+
+    Other parameters might contain similar values, only valid placeholders
+    are returned.
+    """
+    with open(workfile_path, "rb") as fp:
+        content = fp.read().decode("utf-8")
+    placeholders = []
+    for placeholder in dict.fromkeys(find_placeholders(content)):
+        try:
+            parse_placeholder(placeholder)
+        except PlaceholderSyntaxError:
+            continue
+        placeholders.append(placeholder)
+    return placeholders
+
+
+def _resolve_scanned(placeholders, workfile_path, context, parent_span):
+    with telemetry.span("prefetch_scanned_placeholders", parent=parent_span,
+                        placeholders=len(placeholders)):
+        return resolve_placeholders(placeholders, workfile_path, context)
@@ -0,0 +1,224 @@
+"""Snapshots of resolved load placeholders stored in containers.
+
+Container of resolved placeholder keeps snapshot of the resolution (key
+'snapshot'), so next launch of the workfile resolves again only placeholders
+whose product changed since.
+
+Snapshot:
+    version - SNAPSHOT_VERSION
+    representation_id, version_id - resolved entities
+    product_id, change_token - product of '{latest}' or '{hero}' placeholder
+        and id of the version it was resolved to, for '{hero}' id of version
+        the hero version was created from (None for explicit version)
+    asset_name - resolved asset, '{currentAsset}' depends on launch context
+    path - resolved path written to node
+    platform - path is valid only on the same platform (roots differ)
+
+Explicit version isn't affected by new publishes, its snapshot is valid
+while node keeps the path. Snapshots of '{latest}' placeholders are checked
+by single query of last versions of all their products, snapshots of
+'{hero}' placeholders by single query of hero versions.
+"""
+import sys
+
+from . import lib
+from .lib import DYNAMIC_VERSIONS
+from .placeholder_grammar import PlaceholderSyntaxError, parse_placeholder
+
+SNAPSHOT_KEY = "snapshot"
+SNAPSHOT_VERSION = 2
+
+
+def get_change_tokens(project_name, product_ids_by_version):
+    """Returns current change tokens of products.
+
+    Uses single query for each type of version.
+
+    Args:
+        project_name (str)
+        product_ids_by_version (dict): '{latest}' or '{hero}' -> product ids
+    Returns:
+        (dict) (version, product_id) -> change token, id of last version
+            for '{latest}', id of version of hero version for '{hero}'
+    """
+    change_tokens = {}
+    latest_product_ids = product_ids_by_version.get("{latest}")
+    if latest_product_ids:
+        last_versions = lib.get_last_versions(project_name,
+                                              list(latest_product_ids),
+                                              fields=["_id", "parent"])
+        for product_id, version_doc in last_versions.items():
+            change_tokens[("{latest}", str(product_id))] = str(
+                version_doc["_id"])
+
+    hero_product_ids = product_ids_by_version.get("{hero}")
+    if hero_product_ids:
+        for version_doc in lib.get_hero_versions(
+                project_name,
+                subset_ids=list(hero_product_ids),
+                fields=["_id", "parent", "version_id"]):
+            change_tokens[("{hero}", str(version_doc["parent"]))] = str(
+                version_doc["version_id"])
+    return change_tokens
+
+
+def create_snapshots(project_name, resolved, prefetched=None):
+    """Returns snapshots of resolved placeholders to store in containers.
+
+    Change token is id of the version the placeholder was resolved to (for
+    '{hero}' the version hero was created from), so products published
+    after the version was resolved are detected on next launch. Versions
+    resolved from '{latest}' and '{hero}' placeholders are queried for their
+    products (one query per version type).
+
+    Args:
+        project_name (str)
+        resolved (dict): placeholder -> (dict, str) representation and path
+            from `resolve_placeholders`
+        prefetched (dict): placeholder -> snapshot created before during
+            the launch, reused if placeholder is resolved to the same path
+    Returns:
+        (dict) placeholder -> snapshot
+    """
+    snapshots = {}
+    if prefetched:
+        for placeholder, (repre, path) in resolved.items():
+            snapshot = prefetched.get(placeholder)
+            if (
+                snapshot
+                and snapshot["representation_id"] == str(repre["_id"])
+                and snapshot["path"] == path
+            ):
+                snapshots[placeholder] = snapshot
+        resolved = {
+            placeholder: value
+            for placeholder, value in resolved.items()
+            if placeholder not in snapshots
+        }
+
+    version_ids_by_type = {version: set() for version in DYNAMIC_VERSIONS}
+    versions_by_placeholder = {}
+    for placeholder, (repre, _) in resolved.items():
+        version = parse_placeholder(placeholder).version
+        versions_by_placeholder[placeholder] = version
+        if version in version_ids_by_type:
+            version_ids_by_type[version].add(str(repre["parent"]))
+
+    # version_id -> (product_id, change_token)
+    products = {}
+    if version_ids_by_type["{latest}"]:
+        for version_doc in lib.get_versions(
+                project_name,
+                version_ids=list(version_ids_by_type["{latest}"]),
+                fields=["_id", "parent"]):
+            version_id = str(version_doc["_id"])
+            products[version_id] = (str(version_doc["parent"]), version_id)
+
+    if version_ids_by_type["{hero}"]:
+        for version_doc in lib.get_hero_versions(
+                project_name,
+                version_ids=list(version_ids_by_type["{hero}"]),
+                fields=["_id", "parent", "version_id"]):
+            products[str(version_doc["_id"])] = (
+                str(version_doc["parent"]), str(version_doc["version_id"]))
+
+    for placeholder, (repre, path) in resolved.items():
+        version_id = str(repre["parent"])
+        product_id = change_token = None
+        if versions_by_placeholder[placeholder] in DYNAMIC_VERSIONS:
+            product_id, change_token = products.get(version_id,
+                                                    (None, None))
+        snapshots[placeholder] = {
+            "version": SNAPSHOT_VERSION,
+            "representation_id": str(repre["_id"]),
+            "version_id": version_id,
+            "product_id": product_id,
+            "change_token": change_token,
+            "asset_name": repre["context"]["asset"],
+            "path": path,
+            "platform": sys.platform
+        }
+    return snapshots
+
+
+def _is_snapshot_valid(container, node, placeholder, context):
+    """Checks if snapshot of container could be used without query."""
+    snapshot = container.get(SNAPSHOT_KEY)
+    if (
+        not snapshot
+        or snapshot.get("version") != SNAPSHOT_VERSION
+        or snapshot["platform"] != sys.platform
+        or snapshot["representation_id"] != container["representation"]
+        or container["original_value"] != placeholder
+        or node["params"]["fileName"]["value"] != snapshot["path"]
+    ):
+        return False
+
+    try:
+        tokens = parse_placeholder(placeholder)
+    except PlaceholderSyntaxError:
+        return False
+    if tokens.version in DYNAMIC_VERSIONS and not snapshot["change_token"]:
+        return False
+    asset_name = lib._get_asset_name(tokens.asset_name, context)
+    return snapshot["asset_name"] == asset_name
+
+
+def get_fresh_containers(workfile, load_placeholders, context,
+                         change_tokens=None):
+    """Returns containers whose snapshot is valid and product unchanged.
+
+    Cached '{latest}' and '{hero}' versions of changed products are removed
+    from entity cache, so their placeholders are resolved to new versions.
+
+    Args:
+        workfile (WrapWorkfile)
+        load_placeholders (list): (node_name, node, placeholder) from
+            `get_load_placeholders`
+        context (dict): 'project_name', 'asset_name' of launch context
+        change_tokens (dict): (version, product_id) -> change token queried
+            before during the launch (eg. by prefetch), only missing are
+            queried
+    Returns:
+        (dict, dict) node_name -> container which doesn't need to be
+            resolved, (version, product_id) -> change token queried for
+            products of all snapshots
+    """
+    candidates = {}
+    for node_name, node, placeholder in load_placeholders:
+        container = workfile.get_container(node["nodeId"])
+        if container and _is_snapshot_valid(container, node, placeholder,
+                                            context):
+            candidates[node_name] = (container,
+                                     parse_placeholder(placeholder).version)
+
+    change_tokens = dict(change_tokens or {})
+    product_ids_by_version = {version: set() for version in DYNAMIC_VERSIONS}
+    for container, version in candidates.values():
+        product_id = container[SNAPSHOT_KEY]["product_id"]
+        if (
+            version in product_ids_by_version
+            and (version, product_id) not in change_tokens
+        ):
+            product_ids_by_version[version].add(product_id)
+    change_tokens.update(get_change_tokens(context["project_name"],
+                                           product_ids_by_version))
+
+    fresh_containers = {}
+    stale_product_ids = set()
+    for node_name, (container, version) in candidates.items():
+        snapshot = container[SNAPSHOT_KEY]
+        change_token = snapshot["change_token"]
+        if (
+            change_token is None
+            or change_tokens.get((version, snapshot["product_id"]))
+            == change_token
+        ):
+            fresh_containers[node_name] = container
+        else:
+            stale_product_ids.add(snapshot["product_id"])
+
+    if stale_product_ids:
+        lib.get_entity_cache().clear_dynamic_versions(
+            context["project_name"], stale_product_ids)
+    return fresh_containers, change_tokens
@@ -0,0 +1,426 @@
+"""Optional tracing of launch and publish hot paths.
+
+Disabled by default, enabled by `AYON_WRAP_TELEMETRY`:
+    jsonl - finished spans and counters are appended to JSON-lines file
+        `AYON_WRAP_TELEMETRY_FILE` (default 'telemetry.jsonl' in cache dir)
+    otlp - sent to OpenTelemetry collector as OTLP/HTTP JSON, endpoint from
+        `AYON_WRAP_TELEMETRY_ENDPOINT` or `OTEL_EXPORTER_OTLP_ENDPOINT`
+        (default 'http://localhost:4318')
+
+Spans measure duration of nested operations (parent is span opened before
+in the same thread). Functions run in thread pools are wrapped by
+`in_current_span`, so their spans are attached to the submitting span
+instead of being exported as separate roots. Counters (queries to
+server, bytes read and written) are accumulated in process and exported as
+deltas when root span ends, together with peak RSS of the process, so each
+launch or publish has its own record.
+
+Setting is read on import. When disabled, `traced` returns decorated
+function unchanged and `span` returns shared no-op object.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import secrets
+import logging
+import threading
+import functools
+import collections
+import urllib.request
+
+log = logging.getLogger(__name__)
+
+TELEMETRY_ENV = "AYON_WRAP_TELEMETRY"
+TELEMETRY_FILE_ENV = "AYON_WRAP_TELEMETRY_FILE"
+TELEMETRY_ENDPOINT_ENV = "AYON_WRAP_TELEMETRY_ENDPOINT"
+SERVICE_NAME = "ayon-wrap"
+# spans sent to collector at once
+OTLP_BATCH_SIZE = 512
+OTLP_TIMEOUT = 2
+
+_exporter = None
+_local = threading.local()
+_counters = collections.Counter()
+_counters_lock = threading.Lock()
+
+
+def is_enabled():
+    return _exporter is not None
+
+
+def get_peak_rss():
+    """Returns peak resident memory of the process in bytes or None."""
+    if sys.platform == "win32":
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def add_counter(name, value=1):
+    """Increments counter, e.g. 'wrap.db.calls'."""
+    if _exporter is None:
+        return
+    with _counters_lock:
+        _counters[name] += value
+
+
+def counted(name, func):
+    """Returns `func` which increments counter `name` on each call."""
+    if _exporter is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        add_counter(name)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+class _NullSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span(object):
+    """Measured operation, use as context manager."""
+    def __init__(self, name, attributes, parent=None):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.trace_id = None
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = None
+        self.start_ns = None
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        stack = _get_span_stack()
+        parent = self.parent or (stack[-1] if stack else None)
+        if parent is not None:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+        else:
+            self.trace_id = secrets.token_hex(16)
+        stack.append(self)
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._started
+        if exc_value is not None:
+            self.error = f"{exc_type.__name__}: {exc_value}"
+        stack = _get_span_stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+
+        counters = None
+        if not stack and self.parent is None:
+            self.attributes["process.peak_rss"] = get_peak_rss()
+            with _counters_lock:
+                counters = dict(_counters)
+                _counters.clear()
+            self.attributes.update(counters)
+        try:
+            _exporter.export(self, counters)
+        except Exception:
+            log.debug("Telemetry export failed", exc_info=True)
+        return False
+
+    def to_dict(self):
+        return {
+            "type": "span",
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "error": self.error,
+            "pid": os.getpid(),
+            "attributes": self.attributes
+        }
+
+
+def _get_span_stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def get_current_span():
+    """Returns innermost open span of current thread or None."""
+    if _exporter is None:
+        return None
+    stack = _get_span_stack()
+    return stack[-1] if stack else None
+
+
+def in_current_span(func):
+    """Returns `func` whose spans are children of current span.
+
+    Use for functions submitted to other threads, span opened in thread
+    without open span is root and takes counters and peak RSS of the
+    process.
+
+    Args:
+        func (callable)
+    Returns:
+        (callable)
+    """
+    parent = get_current_span()
+    if parent is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = _get_span_stack()
+        stack.append(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stack.remove(parent)
+    return wrapper
+
+
+def span(name, parent=None, **attributes):
+    """Returns context manager measuring operation `name`.
+
+    Args:
+        name (str): e.g. 'ReplacePlaceholders.execute'
+        parent (Span): span of other thread, e.g. one which submitted work
+            to thread pool (by default innermost open span of this thread)
+        attributes: json serializable values stored with the span
+    """
+    if _exporter is None:
+        return _NULL_SPAN
+    return Span(name, attributes, parent)
+
+
+def traced(name=None):
+    """Decorator measuring each call of function as span.
+
+    Don't use for `process` of pyblish plugins, pyblish reads arguments of
+    the method.
+
+    Args:
+        name (str): name of span, qualified name of function by default
+    """
+    def decorator(func):
+        if _exporter is None:
+            return func
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class JsonLinesExporter(object):
+    """Appends records to file, one JSON document per line.
+
+    Lines are short enough to be appended atomically, so file could be
+    shared by multiple processes.
+
+    Args:
+        path (str): output file, 'telemetry.jsonl' in cache dir if None
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _get_path(self):
+        if self.path is None:
+            # imported late, executables module uses telemetry
+            from .executables import get_cache_dir
+
+            self.path = os.path.join(get_cache_dir(), "telemetry.jsonl")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)),
+                    exist_ok=True)
+        return self.path
+
+    def export(self, finished_span, counters):
+        records = [finished_span.to_dict()]
+        for name, value in (counters or {}).items():
+            records.append({
+                "type": "counter",
+                "name": name,
+                "value": value,
+                "trace_id": finished_span.trace_id,
+                "time_ns": finished_span.end_ns,
+                "pid": os.getpid()
+            })
+        data = "".join(
+            json.dumps(record, default=str) + "\n" for record in records)
+        with self._lock, open(self._get_path(), "a") as fp:
+            fp.write(data)
+
+    def flush(self):
+        pass
+
+
+def _to_otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _to_otlp_attributes(attributes):
+    return [
+        {"key": key, "value": _to_otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+class OtlpExporter(object):
+    """Sends spans and counters to OpenTelemetry collector (OTLP/HTTP JSON).
+
+    Spans are sent in batches, at latest when root span ends. Counters are
+    sent as delta sums.
+    """
+    def __init__(self, endpoint):
+        self.endpoint = endpoint.rstrip("/")
+        self._lock = threading.Lock()
+        self._spans = []
+        self._resource = {"attributes": _to_otlp_attributes({
+            "service.name": SERVICE_NAME,
+            "process.pid": os.getpid(),
+            "ayon.project": os.getenv("AVALON_PROJECT")
+        })}
+
+    def export(self, finished_span, counters):
+        with self._lock:
+            self._spans.append(self._convert_span(finished_span))
+            if counters is None and len(self._spans) < OTLP_BATCH_SIZE:
+                return
+            spans, self._spans = self._spans, []
+        self._send_spans(spans)
+        if counters:
+            self._send_counters(counters, finished_span)
+
+    def flush(self):
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if spans:
+            self._send_spans(spans)
+
+    def _convert_span(self, finished_span):
+        otlp_span = {
+            "traceId": finished_span.trace_id,
+            "spanId": finished_span.span_id,
+            "name": finished_span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(finished_span.start_ns),
+            "endTimeUnixNano": str(finished_span.end_ns),
+            "attributes": _to_otlp_attributes(finished_span.attributes),
+            "status": {"code": 1}
+        }
+        if finished_span.parent_id:
+            otlp_span["parentSpanId"] = finished_span.parent_id
+        if finished_span.error:
+            otlp_span["status"] = {
+                "code": 2, "message": finished_span.error
+            }
+        return otlp_span
+
+    def _send_spans(self, spans):
+        self._post("/v1/traces", {"resourceSpans": [{
+            "resource": self._resource,
+            "scopeSpans": [{
+                "scope": {"name": "ayon_wrap"},
+                "spans": spans
+            }]
+        }]})
+
+    def _send_counters(self, counters, finished_span):
+        metrics = [
+            {
+                "name": name,
+                "sum": {
+                    "aggregationTemporality": 1,
+                    "isMonotonic": True,
+                    "dataPoints": [{
+                        "startTimeUnixNano": str(finished_span.start_ns),
+                        "timeUnixNano": str(finished_span.end_ns),
+                        "asInt": str(value),
+                        "attributes": _to_otlp_attributes(
+                            {"root_span": finished_span.name})
+                    }]
+                }
+            }
+            for name, value in counters.items()
+        ]
+        self._post("/v1/metrics", {"resourceMetrics": [{
+            "resource": self._resource,
+            "scopeMetrics": [{
+                "scope": {"name": "ayon_wrap"},
+                "metrics": metrics
+            }]
+        }]})
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(
+            self.endpoint + path,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=OTLP_TIMEOUT):
+                pass
+        except Exception as exc:
+            log.debug(f"Cannot send telemetry to {self.endpoint}: {exc}")
+
+
+def _create_exporter():
+    mode = os.getenv(TELEMETRY_ENV)
+    if not mode:
+        return None
+    if mode == "jsonl":
+        return JsonLinesExporter(os.getenv(TELEMETRY_FILE_ENV))
+    if mode == "otlp":
+        endpoint = (
+            os.getenv(TELEMETRY_ENDPOINT_ENV)
+            or os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+            or "http://localhost:4318"
+        )
+        return OtlpExporter(endpoint)
+    log.warning(f"Unknown {TELEMETRY_ENV} value '{mode}', "
+                "telemetry disabled")
+    return None
+
+
+_exporter = _create_exporter()
+if _exporter is not None:
+    atexit.register(_exporter.flush)
@@ -0,0 +1,129 @@
+"""Detection of changes of single file without reading it.
+
+On Linux inotify (through ctypes) watches directory of the file, so atomic
+replacement of the file is reported too. Elsewhere, or if inotify is not
+available, modification time, size and inode of the file are compared on
+each check.
+
+Inotify reports only changes made on this machine. Use
+`AYON_WRAP_WATCHER=poll` for workfiles modified from other machines over
+network storage.
+"""
+import os
+import sys
+import struct
+import logging
+import ctypes
+import ctypes.util
+
+log = logging.getLogger(__name__)
+
+# 'inotify' or 'poll', inotify is used if available by default
+WATCHER_ENV = "AYON_WRAP_WATCHER"
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM
+    | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollWatcher(object):
+    """Compares stat of the file with stat from previous check."""
+    def __init__(self, path):
+        self.path = path
+        self._stat_key = self._get_stat_key()
+
+    def _get_stat_key(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def has_changed(self):
+        """Returns True if file changed since previous check."""
+        stat_key = self._get_stat_key()
+        changed = stat_key != self._stat_key
+        self._stat_key = stat_key
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(object):
+    """Reads queued inotify events of directory of the file.
+
+    Raises:
+        (OSError) if inotify is not available
+    """
+    def __init__(self, path):
+        self.path = path
+        self._name = os.fsencode(os.path.basename(path))
+        self._fd = None
+
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.fsencode(os.path.dirname(os.path.abspath(path)))
+        if libc.inotify_add_watch(fd, directory, _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, "inotify_add_watch failed")
+        self._fd = fd
+
+    def has_changed(self):
+        """Returns True if file changed since previous check."""
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+                if mask & _IN_Q_OVERFLOW or name == self._name:
+                    changed = True
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __del__(self):
+        self.close()
+
+
+def create_file_watcher(path):
+    """Returns best available watcher of `path`.
+
+    Returns:
+        (InotifyWatcher or PollWatcher)
+    """
+    mode = os.getenv(WATCHER_ENV)
+    if sys.platform.startswith("linux") and mode != "poll":
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):
+            log.debug("Inotify not available, polling file", exc_info=True)
+    return PollWatcher(path)
@@ -0,0 +1,376 @@
+"""Shared document model of Wrap workfile.
+
+Same workfile is read by creator, extractors, host and loader. `WrapWorkfile`
+parses it only once and keeps it cached until file on disk changes. Changes
+are collected and written back in single streaming pass only if there are
+any.
+
+Most of the readers need only AYON metadata, timeline and file names of
+nodes, partial workfile contains only these values and skips parsing of
+other node parameters.
+
+Written workfiles keep formatting of Wrap unless compact output is enabled
+(`AYON_WRAP_COMPACT_WORKFILES=1` or `compact` argument of save methods).
+"""
+import os
+import copy
+import shutil
+import threading
+import collections
+
+from openpype.pipeline import AVALON_CONTAINER_ID
+
+from . import json_backend, telemetry
+from .file_io import file_lock
+from .lib import PLACEHOLDER_PREFIX
+from .workfile_io import (
+    WorkfilePatch,
+    patch_workfile,
+    read_workfile_values,
+    NODE_METADATA_PATH,
+    TIMELINE_KEY,
+    ANY_KEY,
+    BYTES_READ_COUNTER
+)
+
+# how many parsed workfiles are kept in memory
+WORKFILE_CACHE_SIZE = 4
+# workfiles are written without whitespace if set to "1"
+COMPACT_WORKFILES_ENV = "AYON_WRAP_COMPACT_WORKFILES"
+# values available in partial workfile
+PARTIAL_WORKFILE_PATHS = (
+    NODE_METADATA_PATH,
+    (TIMELINE_KEY,),
+    ("nodes", ANY_KEY, "nodeId"),
+    ("nodes", ANY_KEY, "nodeType"),
+    ("nodes", ANY_KEY, "params", "fileName"),
+)
+
+
+def _get_stat_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get_file_name(node):
+    file_name_doc = (node or {}).get("params", {}).get("fileName")
+    if not file_name_doc:
+        return None
+    return file_name_doc.get("value")
+
+
+def is_compact_output_enabled():
+    return os.getenv(COMPACT_WORKFILES_ENV) == "1"
+
+
+def _is_placeholder(value):
+    return isinstance(value, str) and value.startswith(PLACEHOLDER_PREFIX)
+
+
+class NodeIndex(object):
+    """Lookup tables over nodes and AYON metadata of parsed workfile.
+
+    Built once per parse, kept up to date by `WrapWorkfile` setters so
+    bulk operations don't need to scan all nodes for each item.
+
+    Args:
+        nodes (dict): node name -> node
+        node_metadata (list): AYON_NODE_METADATA items
+    """
+    def __init__(self, nodes, node_metadata):
+        self.node_names_by_id = {}
+        self.node_names_by_type = collections.defaultdict(list)
+        # names of nodes with load placeholder directly in 'fileName'
+        self.placeholder_node_names = set()
+        for node_name, node in nodes.items():
+            self.node_names_by_id[node.get("nodeId")] = node_name
+            self.node_names_by_type[node.get("nodeType")].append(node_name)
+            if _is_placeholder(_get_file_name(node)):
+                self.placeholder_node_names.add(node_name)
+
+        self.containers_by_node_id = {}
+        self.reindex_metadata(node_metadata)
+
+    def reindex_metadata(self, node_metadata):
+        self.containers_by_node_id = {
+            item["nodeId"]: item
+            for item in node_metadata
+            if (
+                item.get("id") == AVALON_CONTAINER_ID
+                and item.get("nodeId") is not None
+            )
+        }
+
+    def update_file_name(self, node_name, value):
+        if _is_placeholder(value):
+            self.placeholder_node_names.add(node_name)
+        else:
+            self.placeholder_node_names.discard(node_name)
+
+
+class WrapWorkfile(object):
+    """Parsed content of Wrap workfile with indexed access to nodes.
+
+    Use `WrapWorkfile.open` to get instance, it returns cached instance if
+    workfile wasn't changed on disk since last parse (same modification time
+    and size). Cached instance is shared by all callers until it is changed,
+    instance with unsaved changes is never returned by `open`.
+
+    Args:
+        path (str): absolute path to workfile
+        content (dict): parsed content of workfile
+        stat_key (tuple): modification time and size of parsed file
+        partial (bool): `content` contains only PARTIAL_WORKFILE_PATHS
+    """
+    _cache = collections.OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, path, content, stat_key, partial=False):
+        self.path = path
+        self.content = content
+        self.partial = partial
+        self._stat_key = stat_key
+        self._patch = WorkfilePatch()
+
+        self._index = NodeIndex(self.nodes, self._get_node_metadata())
+
+    @classmethod
+    @telemetry.traced("WrapWorkfile.open")
+    def open(cls, path, partial=False):
+        """Returns parsed workfile, parses it only if changed on disk.
+
+        Args:
+            path (str)
+            partial (bool): parse only metadata, timeline and file names of
+                nodes, use for workfiles which are not computed
+        """
+        path = os.path.abspath(path)
+        with cls._cache_lock:
+            stat_key = _get_stat_key(path)
+            workfile = cls._cache.get(path)
+            if (
+                workfile is None
+                or workfile._stat_key != stat_key
+                # changed by other caller which didn't save it (yet)
+                or workfile.is_dirty
+                # full workfile could be used instead of partial
+                or (workfile.partial and not partial)
+            ):
+                if partial:
+                    content = read_workfile_values(path,
+                                                   PARTIAL_WORKFILE_PATHS)
+                else:
+                    with open(path, "rb") as fp:
+                        data = fp.read()
+                    telemetry.add_counter(BYTES_READ_COUNTER, len(data))
+                    content = json_backend.loads(data)
+                workfile = cls(path, content, stat_key, partial)
+            cls._set_cached(workfile)
+            return workfile
+
+    @classmethod
+    def _set_cached(cls, workfile):
+        """Stores `workfile` as most recently used, lock must be held."""
+        cls._cache[workfile.path] = workfile
+        cls._cache.move_to_end(workfile.path)
+        while len(cls._cache) > WORKFILE_CACHE_SIZE:
+            cls._cache.popitem(last=False)
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @property
+    def nodes(self):
+        """Returns node name -> node
+
+        Nodes of partial workfile contain only 'nodeId', 'nodeType' and
+        'fileName' parameter.
+        """
+        return self.content.get("nodes", {})
+
+    @property
+    def is_dirty(self):
+        return bool(self._patch)
+
+    def get_node(self, node_name):
+        return self.nodes.get(node_name)
+
+    def get_node_name(self, node_id):
+        """Returns name of node with `node_id` or None."""
+        return self._index.node_names_by_id.get(node_id)
+
+    def get_node_by_id(self, node_id):
+        return self.nodes.get(self._index.node_names_by_id.get(node_id))
+
+    def get_nodes_by_type(self, node_type):
+        """Returns list of (node_name, node) of `node_type`."""
+        return [
+            (node_name, self.nodes[node_name])
+            for node_name in self._index.node_names_by_type.get(node_type, [])
+        ]
+
+    def get_placeholder_nodes(self):
+        """Returns list of (node_name, node) which might contain placeholder.
+
+        These are nodes with load placeholder directly in 'fileName' or nodes
+        with stored container metadata (resolved placeholder).
+        """
+        node_names = set(self._index.placeholder_node_names)
+        for node_id in self._index.containers_by_node_id:
+            node_name = self._index.node_names_by_id.get(node_id)
+            if node_name is not None:
+                node_names.add(node_name)
+        return [
+            (node_name, node)
+            for node_name, node in self.nodes.items()
+            if node_name in node_names
+        ]
+
+    def get_file_name(self, node_name):
+        """Returns 'fileName' parameter of node or None if not available."""
+        return _get_file_name(self.nodes.get(node_name))
+
+    def set_file_name(self, node_name, value):
+        if self.get_file_name(node_name) == value:
+            return
+        self.nodes[node_name]["params"]["fileName"]["value"] = value
+        self._index.update_file_name(node_name, value)
+        self._patch.set_file_name(node_name, value)
+
+    def get_node_metadata(self):
+        """Returns copy of AYON metadata stored in workfile.
+
+        Use `set_node_metadata` to store modified metadata.
+        """
+        return copy.deepcopy(self._get_node_metadata())
+
+    def _get_node_metadata(self):
+        return (self.content.get("metadata") or {}).get(
+            "AYON_NODE_METADATA", [])
+
+    def set_node_metadata(self, node_metadata):
+        if self._get_node_metadata() == node_metadata:
+            return
+        if not self.content.get("metadata"):
+            self.content["metadata"] = {}
+        node_metadata = copy.deepcopy(node_metadata)
+        self.content["metadata"]["AYON_NODE_METADATA"] = node_metadata
+        self._index.reindex_metadata(node_metadata)
+        self._patch.set_node_metadata(node_metadata)
+
+    def get_containers(self):
+        """Returns copies of loaded containers stored in metadata."""
+        return [
+            item
+            for item in self.get_node_metadata()
+            if item["id"] == AVALON_CONTAINER_ID
+        ]
+
+    def get_container(self, node_id):
+        """Returns copy of container stored for node or None."""
+        container = self._index.containers_by_node_id.get(node_id)
+        return copy.deepcopy(container)
+
+    def set_container(self, container):
+        """Stores container, replaces existing one of the same node."""
+        container = copy.deepcopy(container)
+        node_id = container["nodeId"]
+        node_metadata = self._get_node_metadata()
+        existing = self._index.containers_by_node_id.get(node_id)
+        if existing == container:
+            return
+        if existing is not None:
+            existing.clear()
+            existing.update(container)
+            container = existing
+        else:
+            if not self.content.get("metadata"):
+                self.content["metadata"] = {}
+            self.content["metadata"]["AYON_NODE_METADATA"] = node_metadata
+            node_metadata.append(container)
+        self._index.containers_by_node_id[node_id] = container
+        self._patch.set_node_metadata(node_metadata)
+
+    def remove_container(self, node_id):
+        """Removes container of the node from metadata."""
+        container = self._index.containers_by_node_id.pop(node_id, None)
+        if container is None:
+            return
+        node_metadata = [
+            item
+            for item in self._get_node_metadata()
+            if item is not container
+        ]
+        self.content["metadata"]["AYON_NODE_METADATA"] = node_metadata
+        self._patch.set_node_metadata(node_metadata)
+
+    def set_timeline(self, frame_start, frame_end):
+        timeline = self.content.setdefault("timeline", {})
+        if (
+            timeline.get("min") == frame_start
+            and timeline.get("current") == frame_start
+            and timeline.get("max") == frame_end
+        ):
+            return
+        timeline["min"] = frame_start
+        timeline["current"] = frame_start
+        timeline["max"] = frame_end
+        self._patch.set_timeline(frame_start, frame_end)
+
+    @telemetry.traced()
+    def save(self, compact=None):
+        """Writes changes to workfile if there are any.
+
+        Args:
+            compact (bool): write whole workfile without whitespace, default
+                from `COMPACT_WORKFILES_ENV`
+        Returns:
+            (bool) True if workfile was written
+        Raises:
+            (RuntimeError) if workfile was changed by other process since it
+                was parsed, changes would be based on outdated content
+            (TimeoutError) if workfile is locked by other writer
+        """
+        if not self._patch:
+            return False
+        if compact is None:
+            compact = is_compact_output_enabled()
+        # only this workfile is locked, other workfiles could be opened
+        #   while it is written
+        with file_lock(self.path):
+            if _get_stat_key(self.path) != self._stat_key:
+                raise RuntimeError(
+                    f"Workfile '{self.path}' was changed by other process, "
+                    "open it again and repeat the changes.")
+            patch_workfile(self.path, self._patch, compact=compact)
+            stat_key = _get_stat_key(self.path)
+        with self._cache_lock:
+            self._patch = WorkfilePatch()
+            # content reflects the file, no need to parse it again
+            self._stat_key = stat_key
+            cached = self._cache.get(self.path)
+            if (
+                cached is None
+                or cached._stat_key != stat_key
+                or cached.is_dirty
+            ):
+                self._set_cached(self)
+        return True
+
+    def save_as(self, path, compact=None):
+        """Writes workfile with all changes to different `path`.
+
+        Args:
+            path (str)
+            compact (bool): write workfile without whitespace, default from
+                `COMPACT_WORKFILES_ENV`
+        """
+        if compact is None:
+            compact = is_compact_output_enabled()
+        if self._patch or compact:
+            patch_workfile(self.path, self._patch, output_path=path,
+                           compact=compact)
+        else:
+            shutil.copy(self.path, path)
@@ -0,0 +1,686 @@
+"""Streaming read and rewrite of Wrap workfiles.
+
+Wrap workfiles are JSON documents which might contain embedded geometry
+parameters and reach hundreds of MB. Loading them to Python objects only
+to read or change few values is slow and memory hungry.
+
+`patch_workfile` applies targeted changes (node file names, AYON metadata,
+timeline) in one streaming pass. Only subtrees leading to patched values are
+tokenized, everything else is copied through byte-for-byte in chunks, so
+peak memory doesn't depend on size of the workfile.
+
+With `compact` output insignificant whitespace of copied content is
+dropped too, which makes the workfile smaller without parsing it.
+
+`read_workfile_values` decodes only selected values in the same way, other
+subtrees are skipped without building any objects. Small workfiles are
+parsed whole and pruned instead, which is faster for them.
+
+`hash_workfile` feeds content without whitespace to hash object in the same
+streaming pass, so hash of workfile doesn't depend on its formatting.
+"""
+import os
+import re
+import sys
+import json
+
+from . import json_backend, telemetry
+from .file_io import atomic_write, file_lock
+
+CHUNK_SIZE = 1024 * 1024
+# smaller workfiles are parsed whole by `read_workfile_values`
+STREAMING_READ_MIN_SIZE = 32 * 1024 * 1024
+
+NODE_METADATA_PATH = ("metadata", "AYON_NODE_METADATA")
+TIMELINE_KEY = "timeline"
+# matches any key of object in paths of `read_workfile_values`
+ANY_KEY = "*"
+# counter of read bytes of workfiles
+BYTES_READ_COUNTER = "wrap.io.bytes_read"
+
+_WHITESPACE_RE = re.compile(rb"[ \t\r\n]*")
+# content of string up to closing quote (or end of buffer)
+_STRING_BODY_RE = re.compile(rb'(?:[^"\\]+|\\.)*', re.S)
+_INSIGNIFICANT_WHITESPACE = b" \t\r\n"
+# containers nested up to this level are skipped by single regex match
+_SKIPPED_LEVELS = 4
+# max bytes matched at once, limits cost of retries of containers cut by
+#   end of matched window
+_SKIP_WINDOW = 16 * 1024
+# possessive quantifiers (Python 3.11+) make failed matches cheaper
+_POSSESSIVE = b"+" if sys.version_info >= (3, 11) else b""
+
+
+def _build_non_structural_re(levels):
+    """Matches content which doesn't change nesting of skipped value.
+
+    That is whole strings and arrays or objects nested up to `levels`
+    (like vectors of geometry). Written as unrolled loops to avoid
+    catastrophic backtracking, content not complete in buffer is left for
+    the slower path.
+    """
+    star = b"*" + _POSSESSIVE
+    string = (
+        rb'"[^"\\]' + star + rb'(?:\\.[^"\\]' + star + rb')' + star
+        + rb'"'
+    )
+    non_string = rb'[^"\[\]{}]' + star
+    item = string
+    for _ in range(levels):
+        container = (
+            rb'[\[{]' + non_string
+            + rb'(?:(?:' + item + rb')' + non_string + rb')' + star
+            + rb'[\]}]'
+        )
+        item = string + rb'|' + container
+    return re.compile(
+        non_string + rb'(?:(?:' + item + rb')' + non_string + rb')' + star,
+        re.S
+    )
+
+
+_NON_STRUCTURAL_RE = _build_non_structural_re(_SKIPPED_LEVELS)
+_SCALAR_RE = re.compile(rb"[^,\]}: \t\r\n]*")
+
+_QUOTE = ord('"')
+_COMMA = ord(",")
+_COLON = ord(":")
+_OPEN_OBJECT = ord("{")
+_CLOSE_OBJECT = ord("}")
+_OPEN_ARRAY = ord("[")
+_CLOSE_ARRAY = ord("]")
+
+
+class WorkfilePatch(object):
+    """Collection of values to be changed in workfile.
+
+    Values are addressed by path of object keys from root of the document,
+    e.g. ("timeline", "min"). Arrays are never entered.
+    """
+    def __init__(self):
+        self._values = {}
+
+    def __bool__(self):
+        return bool(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def values(self):
+        """Returns path -> (value, create)"""
+        return dict(self._values)
+
+    def set_value(self, path, value, create=False):
+        """Sets new value on `path`.
+
+        Args:
+            path (tuple[str]): keys from root of the document
+            value (Any): json serializable value
+            create (bool): add the key (and missing parent objects) if it
+                doesn't exist in workfile
+        """
+        path = tuple(path)
+        if not path:
+            raise ValueError("Root of the workfile cannot be replaced.")
+        self._values[path] = (value, create)
+
+    def set_file_name(self, node_name, value):
+        """Sets 'fileName' parameter of node with `node_name`."""
+        self.set_value(("nodes", node_name, "params", "fileName", "value"),
+                       value)
+
+    def set_node_metadata(self, node_metadata):
+        """Replaces AYON_NODE_METADATA, metadata are created if missing."""
+        self.set_value(NODE_METADATA_PATH, node_metadata, create=True)
+
+    def set_timeline(self, frame_start, frame_end):
+        """Sets range of timeline, current frame is set to `frame_start`."""
+        self.set_value((TIMELINE_KEY, "min"), frame_start, create=True)
+        self.set_value((TIMELINE_KEY, "current"), frame_start, create=True)
+        self.set_value((TIMELINE_KEY, "max"), frame_end, create=True)
+
+
+@telemetry.traced()
+def patch_workfile(workfile_path, patch, output_path=None, compact=False):
+    """Applies `patch` to workfile in single streaming pass.
+
+    Result is written to temporary file next to the output which atomically
+    replaces output only when whole document was processed and flushed to
+    disk. Output is locked for other writers meanwhile.
+
+    Args:
+        workfile_path (str): workfile to be read
+        patch (WorkfilePatch): changes to be applied
+        output_path (str): optional path where to write result, workfile is
+            updated in place if not provided
+        compact (bool): drop whitespace of whole document, formatting of
+            source is kept otherwise
+    Returns:
+        (list) paths of `patch` which were not found in the workfile
+    Raises:
+        (ValueError) if workfile is not valid JSON document
+        (TimeoutError) if output is locked by other writer
+    """
+    if output_path is None:
+        output_path = workfile_path
+    with file_lock(output_path), open(workfile_path, "rb") as src:
+        with atomic_write(output_path) as dst:
+            if compact:
+                dst = _CompactWriter(dst)
+            return _WorkfileRewriter(src, dst, patch).rewrite()
+
+
+@telemetry.traced()
+def read_workfile_values(workfile_path, paths):
+    """Decodes only values on `paths` from workfile.
+
+    Args:
+        workfile_path (str)
+        paths (Iterable[tuple[str]]): keys from root of the document, ANY_KEY
+            matches all keys of the object, e.g. ("nodes", ANY_KEY, "nodeId")
+    Returns:
+        (dict) document containing only found values on `paths` (and
+            objects leading to them)
+    Raises:
+        (ValueError) if workfile is not valid JSON document
+    """
+    tree = _PathTree.from_paths(tuple(path) for path in paths)
+    with open(workfile_path, "rb") as src:
+        if os.fstat(src.fileno()).st_size >= STREAMING_READ_MIN_SIZE:
+            return _WorkfileReader(src, tree).read()
+        data = src.read()
+        telemetry.add_counter(BYTES_READ_COUNTER, len(data))
+        content = json_backend.loads(data)
+    if not isinstance(content, dict):
+        return {}
+    return _prune(content, tree)
+
+
+@telemetry.traced()
+def hash_workfile(workfile_path, hasher, ignored_keys=()):
+    """Updates `hasher` by workfile content in single streaming pass.
+
+    Insignificant whitespace is dropped, so formatting of workfile doesn't
+    change the hash.
+
+    Args:
+        workfile_path (str)
+        hasher (hashlib.Hash): updated by content
+        ignored_keys (Iterable[str]): top level keys whose members are not
+            hashed, e.g. timeline
+    Raises:
+        (ValueError) if workfile is not valid JSON document
+    """
+    with open(workfile_path, "rb") as src:
+        _WorkfileHasher(src, hasher, ignored_keys).hash()
+
+
+def _prune(content, tree):
+    members = {}
+    for key, value in content.items():
+        child = tree.get_child(key)
+        if child is None:
+            continue
+        if child.selected:
+            members[key] = value
+        elif child.children and isinstance(value, dict):
+            members[key] = _prune(value, child)
+    return members
+
+
+def read_node_metadata(workfile_path):
+    """Returns AYON_NODE_METADATA of workfile without parsing nodes."""
+    content = read_workfile_values(workfile_path, [NODE_METADATA_PATH])
+    return (content.get("metadata") or {}).get("AYON_NODE_METADATA") or []
+
+
+def _encode_value(value):
+    return json_backend.dumps(value)
+
+
+class _CompactWriter(object):
+    """Writes JSON document to `dst` without insignificant whitespace.
+
+    Document can be written in arbitrary parts, state of string split
+    between parts is kept.
+    """
+    def __init__(self, dst):
+        self._dst = dst
+        self._in_string = False
+        # previous part ended by backslash inside of string
+        self._escaped = False
+
+    def write(self, data):
+        pos = 0
+        end = len(data)
+        while pos < end:
+            if not self._in_string:
+                quote_pos = data.find(b'"', pos)
+                if quote_pos < 0:
+                    quote_pos = end
+                self._dst.write(
+                    data[pos:quote_pos].translate(
+                        None, _INSIGNIFICANT_WHITESPACE))
+                pos = quote_pos
+                if pos < end:
+                    self._in_string = True
+                    self._dst.write(b'"')
+                    pos += 1
+                continue
+
+            start = pos
+            if self._escaped:
+                self._escaped = False
+                pos += 1
+            pos = _STRING_BODY_RE.match(data, pos).end()
+            if pos < end and data[pos] == _QUOTE:
+                self._in_string = False
+                pos += 1
+            elif pos < end:
+                # backslash at the end of the part
+                self._escaped = True
+                pos = end
+            self._dst.write(data[start:pos])
+
+
+class _JsonScanner(object):
+    """Tokenizer of JSON document from `src` read in chunks.
+
+    Buffer `_buf` holds not yet processed part of the source. Everything
+    between `_mark` and `_pos` is already processed and is passed to `_copy`
+    before it is dropped from buffer if `_copying` is enabled.
+    """
+    def __init__(self, src):
+        self._src = src
+        self._buf = b""
+        self._pos = 0
+        self._mark = 0
+        self._eof = False
+        self._copying = False
+
+    def _copy(self, data):
+        pass
+
+    # Buffer handling
+    def _read_more(self):
+        """Reads next chunk, drops already processed part of buffer.
+
+        Returns:
+            (bool) False if end of source was reached
+        """
+        if self._eof:
+            return False
+        if self._copying:
+            self._copy(self._buf[self._mark:self._pos])
+        chunk = self._src.read(CHUNK_SIZE)
+        telemetry.add_counter(BYTES_READ_COUNTER, len(chunk))
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        self._mark = 0
+        if not chunk:
+            self._eof = True
+            return False
+        return True
+
+    def _peek(self):
+        if self._pos >= len(self._buf) and not self._read_more():
+            raise ValueError("Unexpected end of workfile.")
+        return self._buf[self._pos]
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(
+                f"Expected '{chr(char)}' but found "
+                f"'{chr(self._buf[self._pos])}' in workfile.")
+        self._pos += 1
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = _WHITESPACE_RE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._read_more():
+                return
+
+    def _check_end(self):
+        self._skip_whitespace()
+        if self._pos < len(self._buf) or self._read_more():
+            raise ValueError("Unexpected content after end of document.")
+
+    # Skipping of values
+    def _skip_string(self, collect=False):
+        """Skips string, returns its raw content if `collect`."""
+        self._expect(_QUOTE)
+        parts = []
+        while True:
+            start = self._pos
+            self._pos = _STRING_BODY_RE.match(self._buf, self._pos).end()
+            if collect:
+                parts.append(self._buf[start:self._pos])
+            if (
+                self._pos < len(self._buf)
+                and self._buf[self._pos] == _QUOTE
+            ):
+                self._pos += 1
+                return b"".join(parts)
+            # end of buffer reached, possibly in the middle of escape
+            #   sequence which is kept in buffer for next read
+            if not self._read_more():
+                raise ValueError("Unterminated string in workfile.")
+
+    def _skip_key(self):
+        """Skips key of object member including colon, returns the key."""
+        raw_key = self._skip_string(collect=True)
+        if b"\\" in raw_key:
+            key = json_backend.loads(b'"' + raw_key + b'"')
+        else:
+            key = raw_key.decode("utf-8")
+        self._skip_whitespace()
+        self._expect(_COLON)
+        self._skip_whitespace()
+        return key
+
+    def _skip_scalar(self):
+        while True:
+            self._pos = _SCALAR_RE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._read_more():
+                return
+
+    def _skip_value(self):
+        char = self._peek()
+        if char == _QUOTE:
+            self._skip_string()
+            return
+        if char not in (_OPEN_OBJECT, _OPEN_ARRAY):
+            self._skip_scalar()
+            return
+
+        self._pos += 1
+        depth = 1
+        while depth:
+            window_end = min(len(self._buf), self._pos + _SKIP_WINDOW)
+            self._pos = _NON_STRUCTURAL_RE.match(
+                self._buf, self._pos, window_end).end()
+            if self._pos >= len(self._buf):
+                if not self._read_more():
+                    raise ValueError("Unexpected end of workfile.")
+                continue
+            char = self._buf[self._pos]
+            if char == _QUOTE:
+                self._skip_string()
+            elif char in (_OPEN_OBJECT, _OPEN_ARRAY):
+                depth += 1
+                self._pos += 1
+            elif char in (_CLOSE_OBJECT, _CLOSE_ARRAY):
+                depth -= 1
+                self._pos += 1
+            # else end of window in the middle of non structural content
+
+
+class _PathTree(object):
+    """Selected paths as tree of keys, `selected` marks end of path."""
+    def __init__(self):
+        self.selected = False
+        self.children = {}
+
+    @classmethod
+    def from_paths(cls, paths):
+        root = cls()
+        for path in paths:
+            node = root
+            for key in path:
+                node = node.children.setdefault(key, cls())
+            node.selected = True
+        root._merge_any_key()
+        return root
+
+    def _merge_any_key(self):
+        """Explicit keys must match also paths continuing by ANY_KEY."""
+        any_child = self.children.get(ANY_KEY)
+        if any_child is not None:
+            for key, child in self.children.items():
+                if key != ANY_KEY:
+                    child._merge(any_child)
+        for child in self.children.values():
+            child._merge_any_key()
+
+    def _merge(self, other):
+        self.selected = self.selected or other.selected
+        for key, other_child in other.children.items():
+            self.children.setdefault(key, _PathTree())._merge(other_child)
+
+    def get_child(self, key):
+        child = self.children.get(key)
+        if child is None:
+            child = self.children.get(ANY_KEY)
+        return child
+
+
+class _WorkfileReader(_JsonScanner):
+    """Builds document only from values on selected paths."""
+    def __init__(self, src, tree):
+        super(_WorkfileReader, self).__init__(src)
+        self._tree = tree
+        self._parts = []
+
+    def _copy(self, data):
+        self._parts.append(data)
+
+    def read(self):
+        self._skip_whitespace()
+        content = {}
+        if self._peek() == _OPEN_OBJECT:
+            content = self._read_object(self._tree)
+        else:
+            self._skip_value()
+        self._check_end()
+        return content
+
+    def _decode_value(self):
+        self._parts = []
+        self._mark = self._pos
+        self._copying = True
+        self._skip_value()
+        self._copying = False
+        self._parts.append(self._buf[self._mark:self._pos])
+        self._mark = self._pos
+        value = json_backend.loads(b"".join(self._parts))
+        self._parts = []
+        return value
+
+    def _read_object(self, tree):
+        self._expect(_OPEN_OBJECT)
+        members = {}
+        has_members = False
+        while True:
+            self._skip_whitespace()
+            if self._peek() == _CLOSE_OBJECT:
+                self._pos += 1
+                return members
+            if has_members:
+                self._expect(_COMMA)
+                self._skip_whitespace()
+            has_members = True
+
+            key = self._skip_key()
+            child = tree.get_child(key)
+            if child is None:
+                self._skip_value()
+            elif child.selected:
+                members[key] = self._decode_value()
+            elif child.children and self._peek() == _OPEN_OBJECT:
+                members[key] = self._read_object(child)
+            else:
+                self._skip_value()
+
+
+class _WorkfileRewriter(_JsonScanner):
+    """Copies JSON document from `src` to `dst` replacing patched values.
+
+    Processed content is copied to `dst` unless `_copying` is disabled while
+    replaced value is skipped.
+    """
+    def __init__(self, src, dst, patch):
+        super(_WorkfileRewriter, self).__init__(src)
+        self._dst = dst
+        self._copying = True
+
+        self._patch_values = patch.values
+        self._applied = set()
+        self._prefixes = set()
+        for path in self._patch_values:
+            for idx in range(len(path)):
+                self._prefixes.add(path[:idx])
+
+    def rewrite(self):
+        self._skip_whitespace()
+        self._process_value(())
+        # copy trailing content
+        self._check_end()
+        self._flush()
+        return [path for path in self._patch_values
+                if path not in self._applied]
+
+    def _copy(self, data):
+        self._dst.write(data)
+
+    def _flush(self):
+        self._dst.write(self._buf[self._mark:self._pos])
+        self._mark = self._pos
+
+    # Processing of patched subtrees
+    def _process_value(self, path):
+        patched = self._patch_values.get(path)
+        if patched is not None:
+            self._replace_value(path, _encode_value(patched[0]))
+            return
+
+        if path not in self._prefixes:
+            self._skip_value()
+            return
+
+        if self._peek() == _OPEN_OBJECT:
+            self._process_object(path)
+            return
+
+        created = self._get_created_members(path, set())
+        if created:
+            # value is not an object, e.g. 'null', but keys are required
+            self._replace_value(path, _encode_value(created))
+        else:
+            self._skip_value()
+
+    def _replace_value(self, path, encoded):
+        self._flush()
+        self._copying = False
+        self._skip_value()
+        self._copying = True
+        self._dst.write(encoded)
+        self._mark = self._pos
+        self._applied.add(path)
+
+    def _process_object(self, path):
+        self._expect(_OPEN_OBJECT)
+        seen_keys = set()
+        while True:
+            self._skip_whitespace()
+            char = self._peek()
+            if char == _CLOSE_OBJECT:
+                self._insert_members(path, seen_keys)
+                self._pos += 1
+                return
+            if seen_keys:
+                self._expect(_COMMA)
+                self._skip_whitespace()
+
+            key = self._skip_key()
+            seen_keys.add(key)
+            self._process_value(path + (key,))
+
+    def _get_created_members(self, path, seen_keys):
+        """Builds members of object on `path` which should be created."""
+        members = {}
+        for patch_path, (value, create) in self._patch_values.items():
+            if (
+                not create
+                or len(patch_path) <= len(path)
+                or patch_path[:len(path)] != path
+                or patch_path[len(path)] in seen_keys
+            ):
+                continue
+            parent = members
+            for key in patch_path[len(path):-1]:
+                parent = parent.setdefault(key, {})
+            parent[patch_path[-1]] = value
+            self._applied.add(patch_path)
+        return members
+
+    def _insert_members(self, path, seen_keys):
+        members = self._get_created_members(path, seen_keys)
+        if not members:
+            return
+        encoded = b", ".join(
+            _encode_value(key) + b": " + _encode_value(value)
+            for key, value in members.items()
+        )
+        self._flush()
+        if seen_keys:
+            self._dst.write(b", ")
+        self._dst.write(encoded)
+
+
+class _HasherWriter(object):
+    """File-like adapter of hash object."""
+    def __init__(self, hasher):
+        self.write = hasher.update
+
+
+class _WorkfileHasher(_JsonScanner):
+    """Passes compact JSON document to hasher, skips ignored members.
+
+    Each hashed top level member is key followed by its value, members are
+    separated by comma.
+    """
+    def __init__(self, src, hasher, ignored_keys):
+        super(_WorkfileHasher, self).__init__(src)
+        self._dst = _CompactWriter(_HasherWriter(hasher))
+        self._ignored_keys = set(ignored_keys)
+
+    def _copy(self, data):
+        self._dst.write(data)
+
+    def hash(self):
+        self._skip_whitespace()
+        if self._peek() != _OPEN_OBJECT:
+            self._hash_value()
+            self._check_end()
+            return
+
+        self._pos += 1
+        has_members = False
+        while True:
+            self._skip_whitespace()
+            if self._peek() == _CLOSE_OBJECT:
+                self._pos += 1
+                break
+            if has_members:
+                self._expect(_COMMA)
+                self._skip_whitespace()
+            has_members = True
+
+            key = self._skip_key()
+            if key in self._ignored_keys:
+                self._skip_value()
+                continue
+            # always encoded by `json`, hash must not depend on backend
+            self._dst.write(json.dumps(key).encode("utf-8") + b":")
+            self._hash_value()
+            self._dst.write(b",")
+        self._check_end()
+
+    def _hash_value(self):
+        self._mark = self._pos
+        self._copying = True
+        self._skip_value()
+        self._copying = False
+        self._dst.write(self._buf[self._mark:self._pos])
+        self._mark = self._pos
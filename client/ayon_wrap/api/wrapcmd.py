@@ -0,0 +1,213 @@
+"""Supervised run of WrapCmd process.
+
+Output of WrapCmd is streamed line by line into logger while the process
+runs, lines reporting computed frame are turned into timing metrics.
+Process is killed together with its children when it runs longer than
+allowed, stops producing output or is cancelled.
+"""
+import os
+import re
+import sys
+import time
+import signal
+import asyncio
+import logging
+import threading
+import subprocess
+
+log = logging.getLogger(__name__)
+
+# line printed by WrapCmd when frame is being computed
+FRAME_PROGRESS_PATTERN = re.compile(r"\bframe\D{0,3}(-?\d+)", re.IGNORECASE)
+# how often are timeouts and cancellation checked
+POLL_INTERVAL = 0.5
+# seconds between terminate and kill of process tree
+KILL_GRACE_PERIOD = 5
+# longer output lines are dropped
+LINE_LIMIT = 1024 * 1024
+
+
+class WrapCmdResult(object):
+    """Result of supervised WrapCmd run.
+
+    Attributes:
+        exit_code (int): exit code of the process, negative if killed
+        duration (float): wall-clock seconds of the run
+        frame_times (dict): frame -> seconds between its progress line and
+            previous one (or start of the process)
+        stop_reason (str): 'timeout', 'idle_timeout' or 'cancelled' if
+            process was killed, None otherwise
+    """
+    def __init__(self):
+        self.exit_code = None
+        self.duration = 0.0
+        self.frame_times = {}
+        self.stop_reason = None
+
+    @property
+    def success(self):
+        return self.exit_code == 0 and self.stop_reason is None
+
+    def get_metrics(self):
+        frame_times = list(self.frame_times.values())
+        metrics = {
+            "exit_code": self.exit_code,
+            "stop_reason": self.stop_reason,
+            "duration": round(self.duration, 3),
+            "frames": len(frame_times),
+        }
+        if frame_times:
+            metrics["avg_frame_time"] = round(
+                sum(frame_times) / len(frame_times), 3)
+            metrics["max_frame_time"] = round(max(frame_times), 3)
+        return metrics
+
+
+class WrapCmdSupervisor(object):
+    """Runs WrapCmd and watches its output, duration and cancellation.
+
+    Args:
+        logger (logging.Logger): where output of the process is logged
+        timeout (float): max wall-clock seconds of the run, 0 for no limit
+        idle_timeout (float): max seconds without any output, 0 for no limit
+        progress_pattern (re.Pattern): matches output lines reporting frame,
+            first group must be frame number
+    """
+    def __init__(self, logger=None, timeout=0, idle_timeout=0,
+                 progress_pattern=FRAME_PROGRESS_PATTERN):
+        self.log = logger or log
+        self.timeout = timeout or 0
+        self.idle_timeout = idle_timeout or 0
+        self.progress_pattern = progress_pattern
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Kills all running processes of this supervisor.
+
+        Could be called from any thread.
+        """
+        self._cancel_event.set()
+
+    @property
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self, args, cwd=None):
+        """Runs process with `args` and blocks until it finishes.
+
+        Returns:
+            (WrapCmdResult)
+        """
+        return asyncio.run(self.run_async(args, cwd))
+
+    async def run_async(self, args, cwd=None):
+        result = WrapCmdResult()
+        if self.is_cancelled:
+            result.stop_reason = "cancelled"
+            return result
+
+        started = time.monotonic()
+        state = {"last_output": started, "last_frame": started}
+
+        self.log.debug(f"args::{args}")
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=LINE_LIMIT,
+            **_get_process_group_kwargs()
+        )
+        readers = [
+            asyncio.ensure_future(self._read_stream(
+                process.stdout, logging.INFO, result, state)),
+            asyncio.ensure_future(self._read_stream(
+                process.stderr, logging.WARNING, result, state)),
+        ]
+
+        while process.returncode is None:
+            try:
+                await asyncio.wait_for(process.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            if process.returncode is not None:
+                break
+
+            now = time.monotonic()
+            if self._cancel_event.is_set():
+                result.stop_reason = "cancelled"
+            elif self.timeout and now - started > self.timeout:
+                result.stop_reason = "timeout"
+            elif (
+                self.idle_timeout
+                and now - state["last_output"] > self.idle_timeout
+            ):
+                result.stop_reason = "idle_timeout"
+
+            if result.stop_reason:
+                self.log.warning(f"Killing WrapCmd ({process.pid}), "
+                                 f"reason: {result.stop_reason}")
+                await _kill_process_tree(process)
+
+        # orphaned children might keep pipes open
+        _, pending = await asyncio.wait(readers, timeout=KILL_GRACE_PERIOD)
+        for reader in pending:
+            reader.cancel()
+        result.exit_code = process.returncode
+        result.duration = time.monotonic() - started
+        self.log.debug(f"WrapCmd metrics: {result.get_metrics()}")
+        return result
+
+    async def _read_stream(self, stream, level, result, state):
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # line longer than limit was dropped
+                state["last_output"] = time.monotonic()
+                continue
+            if not line:
+                return
+            now = time.monotonic()
+            state["last_output"] = now
+            line = line.decode("utf-8", errors="replace").rstrip()
+            if not line:
+                continue
+            self.log.log(level, line)
+
+            match = self.progress_pattern.search(line)
+            if match:
+                frame = int(match.group(1))
+                if frame not in result.frame_times:
+                    result.frame_times[frame] = now - state["last_frame"]
+                    state["last_frame"] = now
+
+
+def _get_process_group_kwargs():
+    """Starts process in new group so whole tree could be killed."""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+async def _kill_process_tree(process):
+    if sys.platform == "win32":
+        # taskkill handles whole tree with '/T'
+        killer = await asyncio.create_subprocess_exec(
+            "taskkill", "/F", "/T", "/PID", str(process.pid),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        await killer.wait()
+        return
+
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), KILL_GRACE_PERIOD)
+            return
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,51 @@
+import click
+
+
+@click.group("wrap", help="Wrap addon commands.")
+def cli_main():
+    pass
+
+
+@cli_main.command("placeholder-report")
+@click.argument("workfile_path",
+                type=click.Path(exists=True, dir_okay=False))
+@click.option("--project", "project_name", required=True,
+              help="Project of the workfile.")
+@click.option("--asset", "asset_name", required=True,
+              help="Asset used for '{currentAsset}' placeholders.")
+@click.option("--mock", "mock_path",
+              type=click.Path(exists=True, dir_okay=False),
+              help=("JSON file with entities, resolve against it instead "
+                    "of server."))
+@click.option("--latency", type=float, default=0,
+              help="Milliseconds added to each query of --mock database.")
+@click.option("--repeat", type=click.IntRange(min=1), default=1,
+              help="Resolve this many times, median duration is reported.")
+@click.option("--output", "output_path", type=click.Path(dir_okay=False),
+              help="Write report also to JSON file.")
+def placeholder_report(workfile_path, project_name, asset_name, mock_path,
+                       latency, repeat, output_path):
+    """Resolves placeholders of workfile without launching Wrap.
+
+    Prints resolved path, number of queries and duration for each
+    placeholder. Workfile is not modified.
+    """
+    from ayon_wrap.api import json_backend
+    from ayon_wrap.dev.placeholder_report import (
+        create_placeholder_report,
+        format_report
+    )
+
+    database = None
+    if mock_path:
+        from ayon_wrap.dev.local_database import LocalDatabase
+
+        database = LocalDatabase.from_file(mock_path, latency / 1000)
+
+    context = {"project_name": project_name, "asset_name": asset_name}
+    report = create_placeholder_report(workfile_path, context, database,
+                                       repeat)
+    click.echo(format_report(report))
+    if output_path:
+        with open(output_path, "wb") as fp:
+            json_backend.dump(report, fp, indent=2)
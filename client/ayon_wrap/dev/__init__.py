@@ -0,0 +1,5 @@
+"""Development tools of the addon, used by CLI commands and benchmarks.
+
+Modules replace query functions of `ayon_wrap.api.lib`, they are never
+imported on launch or publish.
+"""
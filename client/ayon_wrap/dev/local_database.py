@@ -0,0 +1,186 @@
+"""In-memory stand-in of server for resolution of placeholders.
+
+Implements query functions of `openpype.client` used by `lib` over entities
+loaded from JSON file, so resolution of placeholders could be measured
+without server (e.g. in CI). Optional latency is added to each query to
+simulate round trips to server.
+
+Expected content of the file (documents in format of `openpype.client`):
+    {
+        "assets": [{"_id": str, "name": str, ...}],
+        "subsets": [{"_id": str, "name": str, "parent": asset_id}],
+        "versions": [{"_id": str, "name": int, "parent": subset_id}],
+        "hero_versions": [{"_id": str, "parent": subset_id}],
+        "representations": [{
+            "_id": str, "name": str, "parent": version_id,
+            "data": {"path": str}
+        }]
+    }
+"""
+import copy
+import time
+import contextlib
+
+from ayon_wrap.api import lib, json_backend
+
+# names of functions in `lib` replaced by `LocalDatabase.get_functions`
+QUERY_FUNCTION_NAMES = (
+    "get_assets",
+    "get_asset_by_name",
+    "get_subsets",
+    "get_subset_by_name",
+    "get_versions",
+    "get_hero_versions",
+    "get_last_versions",
+    "get_version_by_name",
+    "get_hero_version_by_subset_id",
+    "get_representations",
+)
+
+
+@contextlib.contextmanager
+def patch_lib_functions(functions):
+    """Temporarily replaces functions of `lib` module.
+
+    Args:
+        functions (dict): name -> replacement, e.g. from
+            `LocalDatabase.get_functions`
+    """
+    originals = {name: getattr(lib, name) for name in functions}
+    try:
+        for name, func in functions.items():
+            setattr(lib, name, func)
+        yield
+    finally:
+        for name, func in originals.items():
+            setattr(lib, name, func)
+
+
+def _matches(value, allowed):
+    return allowed is None or value in allowed
+
+
+class _LocalAnatomy(object):
+    """Anatomy is not needed, paths are stored in representations."""
+    def __init__(self, project_name):
+        self.project_name = project_name
+
+
+def _get_representation_path(representation, anatomy):
+    return representation["data"]["path"]
+
+
+class LocalDatabase(object):
+    """Entities of single project kept in memory.
+
+    Args:
+        entities (dict): entity type -> list of documents
+        latency (float): seconds added to each query
+    """
+    def __init__(self, entities, latency=0):
+        self.latency = latency
+        self._assets = entities.get("assets") or []
+        self._subsets = entities.get("subsets") or []
+        self._versions = entities.get("versions") or []
+        self._hero_versions = entities.get("hero_versions") or []
+        self._representations = entities.get("representations") or []
+
+    @classmethod
+    def from_file(cls, path, latency=0):
+        with open(path, "rb") as fp:
+            return cls(json_backend.load(fp), latency)
+
+    def get_functions(self):
+        """Returns replacements of server dependent functions of `lib`."""
+        functions = {
+            name: getattr(self, name)
+            for name in QUERY_FUNCTION_NAMES
+        }
+        functions["Anatomy"] = _LocalAnatomy
+        functions["get_representation_path_with_anatomy"] = (
+            _get_representation_path)
+        return functions
+
+    def _query(self, docs, **filters):
+        if self.latency:
+            time.sleep(self.latency)
+        return [
+            copy.deepcopy(doc)
+            for doc in docs
+            if all(
+                _matches(doc.get(key), allowed)
+                for key, allowed in filters.items()
+            )
+        ]
+
+    # Query functions with signatures of `openpype.client`
+    def get_assets(self, project_name, asset_ids=None, asset_names=None,
+                   fields=None, **kwargs):
+        return self._query(self._assets, _id=asset_ids, name=asset_names)
+
+    def get_asset_by_name(self, project_name, asset_name, fields=None):
+        assets = self._query(self._assets, name={asset_name})
+        return assets[0] if assets else None
+
+    def get_subsets(self, project_name, subset_ids=None, subset_names=None,
+                    asset_ids=None, names_by_asset_ids=None, fields=None,
+                    **kwargs):
+        subsets = self._query(self._subsets, _id=subset_ids,
+                              name=subset_names, parent=asset_ids)
+        if names_by_asset_ids is None:
+            return subsets
+        return [
+            subset
+            for subset in subsets
+            if subset["name"] in names_by_asset_ids.get(subset["parent"], [])
+        ]
+
+    def get_subset_by_name(self, project_name, subset_name, asset_id,
+                           fields=None):
+        subsets = self._query(self._subsets, name={subset_name},
+                              parent={asset_id})
+        return subsets[0] if subsets else None
+
+    def get_versions(self, project_name, version_ids=None, subset_ids=None,
+                     versions=None, fields=None, **kwargs):
+        return self._query(self._versions, _id=version_ids,
+                           parent=subset_ids, name=versions)
+
+    def get_hero_versions(self, project_name, subset_ids=None,
+                          version_ids=None, fields=None):
+        return self._query(self._hero_versions, _id=version_ids,
+                           parent=subset_ids)
+
+    def get_last_versions(self, project_name, subset_ids, fields=None,
+                          **kwargs):
+        last_versions = {}
+        for version in self._query(self._versions, parent=set(subset_ids)):
+            last_version = last_versions.get(version["parent"])
+            if last_version is None or last_version["name"] < version["name"]:
+                last_versions[version["parent"]] = version
+        return last_versions
+
+    def get_version_by_name(self, project_name, version, subset_id,
+                            fields=None):
+        versions = self._query(self._versions, name={version},
+                               parent={subset_id})
+        return versions[0] if versions else None
+
+    def get_hero_version_by_subset_id(self, project_name, subset_id,
+                                      fields=None):
+        versions = self._query(self._hero_versions, parent={subset_id})
+        return versions[0] if versions else None
+
+    def get_representations(self, project_name, representation_ids=None,
+                            representation_names=None, version_ids=None,
+                            names_by_version_ids=None, fields=None,
+                            **kwargs):
+        repres = self._query(self._representations, _id=representation_ids,
+                             name=representation_names, parent=version_ids)
+        if names_by_version_ids is None:
+            return repres
+        return [
+            repre
+            for repre in repres
+            if repre["name"] in names_by_version_ids.get(repre["parent"], [])
+        ]
@@ -0,0 +1,180 @@
+"""Dry run of placeholder resolution done by `ReplacePlaceholders` hook.
+
+Workfile is only read, resolved paths are reported instead of written.
+Each placeholder is resolved alone with empty entity cache to show its cost,
+then all of them together as the hook does on launch. Queries to server are
+counted by wrapping query functions of `lib`.
+"""
+import time
+import statistics
+
+from openpype.lib import ApplicationLaunchFailed
+
+from ayon_wrap.api import lib
+from ayon_wrap.api.workfile import WrapWorkfile
+
+from .local_database import QUERY_FUNCTION_NAMES, patch_lib_functions
+
+
+class QueryCounter(object):
+    """Counts calls of query functions."""
+    def __init__(self):
+        self.calls = 0
+
+    def wrap(self, func):
+        def wrapper(*args, **kwargs):
+            self.calls += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+
+def _measure(func, counter, repeat):
+    """Runs `func` `repeat` times with empty entity cache.
+
+    Returns:
+        (dict) 'result' of last run, 'error' message if it failed, median
+            'ms' and 'db_calls' of single run
+    """
+    durations = []
+    result = error = None
+    for _ in range(repeat):
+        lib.get_entity_cache().clear()
+        counter.calls = 0
+        started = time.perf_counter()
+        try:
+            result = func()
+        except ApplicationLaunchFailed as exc:
+            error = str(exc).strip()
+        durations.append((time.perf_counter() - started) * 1000)
+    return {
+        "result": result,
+        "error": error,
+        "db_calls": counter.calls,
+        "ms": round(statistics.median(durations), 3)
+    }
+
+
+def create_placeholder_report(workfile_path, context, database=None,
+                              repeat=1):
+    """Resolves placeholders of workfile and measures each of them.
+
+    Args:
+        workfile_path (str)
+        context (dict): 'project_name', 'asset_name' used for
+            '{currentAsset}'
+        database (LocalDatabase): resolve against local stand-in instead of
+            server
+        repeat (int): measure each resolution this many times, median is
+            reported
+    Returns:
+        (dict) json serializable report
+    """
+    functions = database.get_functions() if database else {}
+    counter = QueryCounter()
+    for name in QUERY_FUNCTION_NAMES:
+        functions[name] = counter.wrap(
+            functions.get(name) or getattr(lib, name))
+
+    with patch_lib_functions(functions):
+        def read_workfile():
+            WrapWorkfile.clear_cache()
+            workfile = WrapWorkfile.open(workfile_path, partial=True)
+            return lib.get_load_placeholders(workfile)
+
+        read = _measure(read_workfile, counter, repeat)
+        load_placeholders = read["result"]
+        node_names_by_placeholder = {}
+        for node_name, _, placeholder in load_placeholders:
+            node_names_by_placeholder.setdefault(placeholder, []).append(
+                node_name)
+
+        items = []
+        for placeholder, node_names in node_names_by_placeholder.items():
+            measured = _measure(
+                lambda: lib.resolve_placeholders(
+                    [placeholder], workfile_path, context),
+                counter,
+                repeat
+            )
+            path = None
+            if measured["result"]:
+                path = measured["result"][placeholder][1]
+            items.append({
+                "placeholder": placeholder,
+                "nodes": node_names,
+                "path": path,
+                "error": measured["error"],
+                "db_calls": measured["db_calls"],
+                "ms": measured["ms"]
+            })
+
+        total = _measure(
+            lambda: lib.resolve_placeholders(
+                list(node_names_by_placeholder), workfile_path, context),
+            counter,
+            repeat
+        )
+    lib.get_entity_cache().clear()
+
+    return {
+        "workfile_path": workfile_path,
+        "context": {
+            "project_name": context["project_name"],
+            "asset_name": context["asset_name"]
+        },
+        "database": "local" if database else "server",
+        "repeat": repeat,
+        "read_ms": read["ms"],
+        "placeholders": items,
+        "total": {
+            "error": total["error"],
+            "db_calls": total["db_calls"],
+            "ms": total["ms"]
+        }
+    }
+
+
+def format_report(report):
+    """Returns report as text table."""
+    header = ("Placeholder", "Path", "DB calls", "ms")
+    rows = [
+        (
+            item["placeholder"],
+            item["path"] or f"ERROR: {item['error']}",
+            str(item["db_calls"]),
+            f"{item['ms']:.1f}"
+        )
+        for item in report["placeholders"]
+    ]
+    total = report["total"]
+    rows.append((
+        "All placeholders (as on launch)",
+        f"ERROR: {total['error']}" if total["error"] else "",
+        str(total["db_calls"]),
+        f"{total['ms']:.1f}"
+    ))
+    widths = [
+        max(len(row[idx]) for row in rows + [header])
+        for idx in range(len(header))
+    ]
+
+    def format_row(row):
+        return "  ".join((
+            row[0].ljust(widths[0]),
+            row[1].ljust(widths[1]),
+            row[2].rjust(widths[2]),
+            row[3].rjust(widths[3])
+        )).rstrip()
+
+    lines = [
+        f"Workfile: {report['workfile_path']}",
+        f"Database: {report['database']}, repeat: {report['repeat']}",
+        f"Read workfile: {report['read_ms']:.1f} ms",
+        "",
+        format_row(header),
+        format_row(["-" * width for width in widths])
+    ]
+    lines.extend(format_row(row) for row in rows[:-1])
+    lines.append(format_row(["-" * width for width in widths]))
+    lines.append(format_row(rows[-1]))
+    return "\n".join(lines)
@@ -7,6 +7,8 @@ from openpype.lib.applications import (
     LaunchTypes,
 )
 
+from ayon_wrap.api import companion
+
 WRAP_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 
 
@@ -51,6 +53,26 @@ class PreLaunchHostHook(PreLaunchHook):
             if workfile_path in remainders:
                 remainders.remove(workfile_path)
 
+        wrap_settings = (
+            self.data.get("project_settings", {}).get("wrap", {})
+        )
+        if wrap_settings.get("compact_workfiles"):
+            self.launch_context.env["AYON_WRAP_COMPACT_WORKFILES"] = "1"
+        if wrap_settings.get("fast_start"):
+            self.launch_context.env["AYON_WRAP_FAST_START"] = "1"
+        if wrap_settings.get("companion"):
+            self.launch_context.env["AYON_WRAP_COMPANION"] = "1"
+            if (
+                workfile_path in new_launch_args
+                and companion.request_open(workfile_path,
+                                           self.launch_context.env)
+            ):
+                # companion shows inventory, no need for launch script
+                self.log.debug("Wrap companion running, launching directly")
+                self.launch_context.launch_args.extend(
+                    [executable_path, workfile_path] + remainders)
+                return
+
         # Append as whole list as these areguments should not be separated
         self.launch_context.launch_args.append(new_launch_args)
 
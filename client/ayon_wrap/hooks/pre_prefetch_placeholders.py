@@ -0,0 +1,37 @@
+import os
+
+from openpype.lib.applications import PreLaunchHook, LaunchTypes
+
+from ayon_wrap.api.placeholder_prefetch import (
+    PREFETCH_DATA_KEY,
+    start_prefetch
+)
+
+
+class PrefetchPlaceholders(PreLaunchHook):
+    """Starts prefetch of entities for placeholders of last workfile.
+
+    Runs right after workfile is copied from template, entities are queried
+    in background while other hooks run. `ReplacePlaceholders` waits for
+    the prefetch and resolves placeholders from warm caches.
+    """
+
+    order = 1
+    app_groups = {"wrap"}
+    launch_types = {LaunchTypes.local}
+
+    def execute(self):
+        last_workfile_path = self.data.get("last_workfile_path")
+        if not last_workfile_path or not os.path.exists(last_workfile_path):
+            return
+
+        wrap_settings = self.data.get("project_settings", {}).get("wrap", {})
+        resolution_settings = wrap_settings.get("placeholder_resolution", {})
+        if not resolution_settings.get("prefetch", True):
+            return
+
+        self.data[PREFETCH_DATA_KEY] = start_prefetch(
+            last_workfile_path,
+            self.data,
+            resolution_settings.get("reuse_snapshots", True)
+        )
@@ -1,12 +1,12 @@
 import os
-import shutil
-import json
 
 from openpype.lib.applications import PreLaunchHook, LaunchTypes
 from openpype.pipeline import Anatomy, AVALON_CONTAINER_ID
 from openpype.lib import get_version_from_path
 
 from ayon_wrap import api
+from ayon_wrap.api import placeholder_snapshot, telemetry
+from ayon_wrap.api.placeholder_prefetch import PREFETCH_DATA_KEY
 
 
 class ReplacePlaceholders(PreLaunchHook):
@@ -17,21 +17,20 @@ class ReplacePlaceholders(PreLaunchHook):
     Some read and write nodes might contain text Ayon placeholders describing
     what product, version and representation should be loaded.
 
-    Expected placeholder format is PLACEHOLDER_VALUE_PATTERN.
+    Expected placeholder format is described in `api.placeholder_grammar`.
     Implemented 'placeholder' in 'placeholder':
         - asset_name - {currentAsset} or any asset_name
         - version - {latest} or {hero} or any integer value
         (AYON.{currentAsset}.modelMain.{latest}.abc
          AYON.characterB.modelMain.{hero}.abc
-         AYON.{currentAsset}.modelMaoin.1.abc)
+         AYON.{currentAsset}.modelMaoin.1.abc
+         AYON.{currentAsset}.modelMain.{latest}.abc.task=modeling)
     """
 
     order = 25
     app_groups = {"wrap"}
     launch_types = {LaunchTypes.local}
 
-    PLACEHOLDER_PATTERN = "\"value\": \"^AYON\.\".*$"
-
     def execute(self):
         last_workfile_path = self.data.get("last_workfile_path")
         if not last_workfile_path or not os.path.exists(last_workfile_path):
@@ -41,7 +40,13 @@ class ReplacePlaceholders(PreLaunchHook):
             ))
             return
 
-        self._fill_placeholders(last_workfile_path)
+        try:
+            with telemetry.span("ReplacePlaceholders.execute",
+                                project_name=self.data.get("project_name")):
+                self._fill_placeholders(last_workfile_path)
+        finally:
+            # '{latest}' and '{hero}' versions are valid only for this launch
+            api.get_entity_cache().clear_dynamic_versions()
 
         self.log.info(f"Updating: \"{last_workfile_path}\"")
 
@@ -52,58 +57,126 @@ class ReplacePlaceholders(PreLaunchHook):
             workfile_path (str): real workfile in 'work' area that will be
                 opened, already copied from template
 
-        Searches for PLACEHOLDER_PATTERN, tries to fill it with dynamic values
-        and replaces it.
-        """
-        with open(workfile_path, "r") as f:
-            content = json.load(f)
-
-            orig_metadata = (content.get("metadata", {})
-                                    .get("AYON_NODE_METADATA", {}))
-
-            containers = []
-            stored_containers = {item["nodeId"]: item
-                                 for item in orig_metadata
-                                 if item.get("nodeId") is not None}
-            for node_name, node in content["nodes"].items():
-                load_placeholder = self._get_load_placeholder(
-                    node, stored_containers)
-                if load_placeholder:
-                    containers.append(
-                        self._containerize_load_placeholder(node,
-                                                            node_name,
-                                                            load_placeholder,
-                                                            workfile_path)
-                    )
+        Searches for load placeholders in file names of nodes, tries to fill
+        them with dynamic values and replaces them.
 
-                if node_name.startswith("AYON_"):  #TODO
-                    file_path = node["params"]["fileName"]["value"]
-                    workfile_version = f"v{get_version_from_path(workfile_path)}"  # noqa
+        Containers of previous launch are kept if their snapshot is valid
+        and products weren't published since, see `api.placeholder_snapshot`.
 
-                    file_path = self._update_version_placeholder(
-                        workfile_version, file_path)
-
-                    node["params"]["fileName"]["value"] = file_path
-
-            # keep untouched meta
-            for existing_node_meta in orig_metadata:
-                if existing_node_meta["id"] != AVALON_CONTAINER_ID:
-                    containers.append(existing_node_meta)
+        Waits for prefetch started by `PrefetchPlaceholders`, entities are
+        then taken from entity cache.
+        """
+        prefetched = self._wait_for_prefetch() or {}
+        workfile = api.WrapWorkfile.open(workfile_path, partial=True)
+        orig_metadata = workfile.get_node_metadata()
+
+        containers = []
+        load_placeholders = api.get_load_placeholders(workfile)
+
+        wrap_settings = self.data.get("project_settings", {}).get("wrap", {})
+        resolution_settings = wrap_settings.get("placeholder_resolution", {})
+        reuse_snapshots = resolution_settings.get("reuse_snapshots", True)
+        fresh_containers = {}
+        if reuse_snapshots:
+            fresh_containers, _ = (
+                placeholder_snapshot.get_fresh_containers(
+                    workfile, load_placeholders, self.data,
+                    prefetched.get("change_tokens")))
+            self.log.debug(f"Reusing {len(fresh_containers)} of "
+                           f"{len(load_placeholders)} resolved placeholders")
+
+        resolved = self._resolve_placeholders(
+            [
+                load_placeholder
+                for node_name, _, load_placeholder in load_placeholders
+                if node_name not in fresh_containers
+            ],
+            workfile_path,
+            resolution_settings
+        )
+        snapshots = {}
+        if reuse_snapshots:
+            snapshots = placeholder_snapshot.create_snapshots(
+                self.data["project_name"], resolved,
+                prefetched.get("snapshots"))
+
+        for node_name, node, load_placeholder in load_placeholders:
+            container = fresh_containers.get(node_name)
+            if container is not None:
+                container["namespace"] = workfile_path
+                container["objectName"] = node_name
+                containers.append(container)
+                continue
+
+            container = self._containerize_load_placeholder(
+                node,
+                node_name,
+                load_placeholder,
+                resolved[load_placeholder],
+                workfile_path
+            )
+            if load_placeholder in snapshots:
+                container[placeholder_snapshot.SNAPSHOT_KEY] = (
+                    snapshots[load_placeholder])
+            containers.append(container)
+            workfile.set_file_name(node_name, resolved[load_placeholder][1])
+
+        for node_name, node in workfile.nodes.items():
+            if node_name.startswith("AYON_"):  #TODO
+                file_path = node["params"]["fileName"]["value"]
+                workfile_version = f"v{get_version_from_path(workfile_path)}"  # noqa
+
+                file_path = self._update_version_placeholder(
+                    workfile_version, file_path)
+
+                workfile.set_file_name(node_name, file_path)
+
+        # keep untouched meta
+        for existing_node_meta in orig_metadata:
+            if existing_node_meta["id"] != AVALON_CONTAINER_ID:
+                containers.append(existing_node_meta)
+
+        if not containers and not orig_metadata:
+            return
 
-            if not containers and not orig_metadata:
-                return
+        workfile.set_node_metadata(containers)
+        if not workfile.is_dirty:
+            return
 
-            if not content.get("metadata"):
-                content["metadata"] = {}
-            content["metadata"]["AYON_NODE_METADATA"] = containers
+        # written atomically, original is kept if anything fails
+        workfile.save(compact=wrap_settings.get("compact_workfiles", False))
 
-            backup_path = f"{workfile_path}.bck"
-            shutil.copy(workfile_path, backup_path)
+    def _wait_for_prefetch(self):
+        """Returns result of prefetch (see `api.placeholder_prefetch`)."""
+        prefetch = self.data.pop(PREFETCH_DATA_KEY, None)
+        if prefetch is None:
+            # versions cached before this launch might be obsolete
+            api.get_entity_cache().clear_dynamic_versions()
+            return None
+        with telemetry.span("ReplacePlaceholders.wait_for_prefetch"):
+            return prefetch.result()
 
-            with open(workfile_path, "w") as fp:
-                json.dump(content, fp, indent=4)
+    def _resolve_placeholders(self, placeholders, workfile_path, settings):
+        """Resolves placeholders with bulk queries or in parallel.
 
-            os.unlink(backup_path)
+        Args:
+            placeholders (list[str])
+            workfile_path (str)
+            settings (dict): 'placeholder_resolution' project settings
+        Returns:
+            (dict) placeholder -> (dict, str) representation and its path
+        """
+        if not settings.get("concurrent"):
+            return api.resolve_placeholders(
+                placeholders, workfile_path, self.data)
+        return api.resolve_placeholders_concurrently(
+            placeholders,
+            workfile_path,
+            self.data,
+            max_workers=settings.get("max_workers",
+                                     api.lib.RESOLVE_MAX_WORKERS),
+            max_queries_per_second=settings.get("max_queries_per_second")
+        )
 
     def _update_version_placeholder(self, workfile_version, file_path):
         """Searches for {version} or 'v000' placeholder in output file path"""
@@ -116,44 +189,22 @@ class ReplacePlaceholders(PreLaunchHook):
                                           workfile_version)
         return file_path
 
-    def _get_load_placeholder(self, node, stored_containers):
-        """Checks if node contains placeholder for loaded items.
-
-        It might be directly in file path of the node (for fresh template), or
-        resolved and saved in `stored_containers`.
-        Args:
-            node (dict): dictionary of node from Wrap file
-            stored_containers (dict): id -> container metadata for resolved
-                and saved loaded container.
-        Returns:
-            (str): placeholder in format `AYON.{currentAsset}.renderMain...`
-        """
-        if not node.get("params"):
-            return None
-        file_path_doc = node["params"].get("fileName")
-        if not file_path_doc:
-            return None
-
-        stored_node_meta = stored_containers.get(node["nodeId"])
-        return self._get_placeholder(file_path_doc, stored_node_meta)
-
     def _containerize_load_placeholder(self, node, node_name,
-                                       placeholder, workfile_path):
-        """Resolves string placeholder with actual path to product.
+                                       placeholder, resolved, workfile_path):
+        """Creates container for placeholder resolved to actual product.
 
         Args:
             node (dict): node dictionary from Wrap
             node_name (str):
             placeholder (str): placeholder in format
                 `AYON.{currentAsset}.renderMain...`
+            resolved (tuple): (dict, str) representation and path resolved
+                for `placeholder` by `api.resolve_placeholders`
             workfile_path (str): abs path to workfile to store into metadata
         Returns:
             (dict): AYON container metadata
         """
-        repre, filled_value = api.fill_placeholder(placeholder,
-                                                   workfile_path,
-                                                   self.data)
-        node["params"]["fileName"]["value"] = filled_value
+        repre, filled_value = resolved
         data = {
             "original_value": placeholder,
             "nodeId": node["nodeId"],
@@ -169,14 +220,3 @@ class ReplacePlaceholders(PreLaunchHook):
             context=context,
             data=data
         )
-
-    def _get_placeholder(self, file_info, stored_node_meta):
-        """Gets placeholder from file path of node or stored metadata.
-
-        Node filepath has precedence as it could be changed by artist,
-        metadata might contain obsolete value.
-        """
-        if file_info["value"].startswith("AYON"):
-            return file_info["value"]
-        if stored_node_meta and stored_node_meta["id"] == AVALON_CONTAINER_ID:
-            return stored_node_meta["original_value"]
@@ -1,6 +1,5 @@
 import copy
 import os
-import json
 
 from openpype.lib import (
     FileDef,
@@ -9,6 +8,7 @@ from openpype.pipeline import (
     CreatedInstance,
 )
 from openpype.hosts.traypublisher.api.plugin import TrayPublishCreator
+from ayon_wrap.api import WrapWorkfile
 
 
 class WrapWorkfileCreator(TrayPublishCreator):
@@ -34,15 +34,11 @@ class WrapWorkfileCreator(TrayPublishCreator):
             filepath = os.path.join(file_info["directory"], file_name)
             creator_attributes = {"workfile_path": filepath}
 
-            with open(filepath, "r") as fp:
-                content = json.load(fp)
-
-                for node in content["nodes"].values():
-                    if node["nodeType"] not in self.output_node_types:
-                        continue
-
+            workfile = WrapWorkfile.open(filepath, partial=True)
+            for node_type in self.output_node_types:
+                for node_name, node in workfile.get_nodes_by_type(node_type):
                     creator_attributes["nodeId"] = node["nodeId"]
-                    creator_attributes["output_file_path"] = node["params"]["fileName"]["value"]  #noqa
+                    creator_attributes["output_file_path"] = workfile.get_file_name(node_name)  #noqa
                     instance_data["creator_attributes"] = creator_attributes
 
                     new_instance = CreatedInstance(self.family, subset_name,
@@ -1,12 +1,22 @@
-import json
 import os.path
+import collections
 
 from openpype.pipeline import (
     LoaderPlugin,
-    AVALON_CONTAINER_ID,
     get_current_context
 )
-from ayon_wrap.api import fill_placeholder, get_token_and_values
+from ayon_wrap.api import (
+    WrapWorkfile,
+    resolve_placeholders,
+    parse_placeholder,
+    get_entity_cache,
+    telemetry
+)
+from ayon_wrap.api.placeholder_grammar import (
+    GRAMMAR_VERSION,
+    GRAMMAR_VERSION_KEY
+)
+from ayon_wrap.api.placeholder_snapshot import SNAPSHOT_KEY
 
 
 class FileLoader(LoaderPlugin):
@@ -31,54 +41,77 @@ class FileLoader(LoaderPlugin):
 
     def update(self, container, representation):
         """ Switch asset or change version """
+        self.update_containers([(container, representation)])
+
+    @telemetry.traced("FileLoader.update_containers")
+    def update_containers(self, items):
+        """Switch asset or change version of multiple containers at once.
+
+        Containers are grouped by workfile (stored in 'namespace'),
+        placeholders of each workfile are resolved together with bulk queries
+        and each workfile is written only once (atomically replaced).
+
+        Args:
+            items (list[tuple[dict, dict]]): (container, representation) pairs
+        """
         context = get_current_context()
 
-        nodeId = container["nodeId"]
-        with open(container["namespace"], "r") as fp:
-            content = json.load(fp)
-
-            metadata = (content.get("metadata", {})
-                               .get("AYON_NODE_METADATA", []))
-            final_metadata = []
-            for item in metadata:
-                if item["id"] != AVALON_CONTAINER_ID:
-                    final_metadata.append(item)
-                    continue
-                if item["nodeId"] != nodeId:
-                    final_metadata.append(item)
+        items_by_workfile = collections.defaultdict(list)
+        for container, representation in items:
+            items_by_workfile[container["namespace"]].append(
+                (container, representation))
+
+        for workfile_path, workfile_items in items_by_workfile.items():
+            workfile = WrapWorkfile.open(workfile_path, partial=True)
+            placeholders = [
+                self._update_placeholder_string(container, representation)
+                for container, representation in workfile_items
+            ]
+            resolved = resolve_placeholders(set(placeholders),
+                                            workfile_path,
+                                            context)
+
+            for (container, _), updated in zip(workfile_items, placeholders):
+                nodeId = container["nodeId"]
+                item = workfile.get_container(nodeId)
+                if item is None:
+                    self.log.warning(f"No container for node '{nodeId}' "
+                                     f"found in '{workfile_path}'.")
                     continue
 
-                updated = self._update_placeholder_string(container,
-                                                          representation)
-                repre, filled_value = fill_placeholder(updated,
-                                                       container["namespace"],
-                                                       context)
+                repre, filled_value = resolved[updated]
                 item["representation"] = repre["_id"]
                 item["original_value"] = updated
+                item[GRAMMAR_VERSION_KEY] = GRAMMAR_VERSION
                 item["name"] = os.path.basename(filled_value)
                 item["version"] = repre["context"]["version"]
+                # resolved by loader, next launch resolves it again
+                item.pop(SNAPSHOT_KEY, None)
+                workfile.set_container(item)
 
-                final_metadata.append(item)
-
-                for node in content["nodes"].values():
-                    if node["nodeId"] != nodeId:
-                        continue
-                    node["params"]["fileName"]["value"] = filled_value
+                node_name = workfile.get_node_name(nodeId)
+                if node_name is not None:
+                    workfile.set_file_name(node_name, filled_value)
 
-        self._save_metadata(container["namespace"], content, final_metadata)
+            workfile.save()
+        self.log.debug(f"Entity cache: {get_entity_cache().get_stats()}")
 
     def _update_placeholder_string(self, container, representation):
-        orig_token_values = get_token_and_values(
-            container["original_value"])
-        orig_token_values["version"] = \
-            str(representation["context"]["version"])
-        orig_token_values["asset_name"] = \
-            representation["context"]["asset"]
-        orig_token_values["ext"] = representation["context"]["ext"]
-        orig_token_values["product_name"] = representation["context"]["subset"]
-        updated = ".".join(list(orig_token_values.values()))
+        orig_tokens = parse_placeholder(
+            container["original_value"],
+            container.get(GRAMMAR_VERSION_KEY, 1))
+        repre_context = representation["context"]
+        updated = orig_tokens._replace(
+            asset_name=repre_context["asset"],
+            product_name=repre_context["subset"],
+            version=str(repre_context["version"]),
+            representation=representation["name"],
+            ext=(repre_context["ext"]
+                 if orig_tokens.ext is not None else None)
+        ).format()
         return updated
 
+    @telemetry.traced("FileLoader.remove")
     def remove(self, container):
         """
             Removes element from scene: deletes layer + removes from Headline
@@ -86,34 +119,18 @@ class FileLoader(LoaderPlugin):
             container (dict): container to be removed - used to get layer_id
         """
         nodeId = container["nodeId"]
-        with open(container["namespace"], "r") as fp:
-            content = json.load(fp)
-
-            metadata = (content.get("metadata", {})
-                        .get("AYON_NODE_METADATA", []))
-            final_metadata = []
-            for item in metadata:
-                if item["id"] != AVALON_CONTAINER_ID:
-                    final_metadata.append(item)
-                    continue
-                if item["nodeId"] != nodeId:
-                    final_metadata.append(item)
-                    continue
-
-        final_nodes = {}
-        for node_name, node in content["nodes"].items():
-            if node["nodeId"] == nodeId:
-                node["params"]["fileName"]["value"] = ""
+        workfile = WrapWorkfile.open(container["namespace"], partial=True)
 
-            final_nodes[node_name] = node
-        content["nodes"] = final_nodes
+        workfile.remove_container(nodeId)
+        node_name = workfile.get_node_name(nodeId)
+        if node_name is not None:
+            workfile.set_file_name(node_name, "")
 
-        self._save_metadata(container["namespace"], content, final_metadata)
+        workfile.save()
 
     def switch(self, container, representation):
         self.update(container, representation)
 
-    def _save_metadata(self, workfile_path, content, final_metadata):
-        content["metadata"]["AYON_NODE_METADATA"] = final_metadata
-        with open(workfile_path, "w") as fp:
-            json.dump(content, fp, indent=4)
+    def switch_containers(self, items):
+        """Switch multiple containers, see `update_containers`."""
+        self.update_containers(items)
@@ -1,6 +1,7 @@
 import pyblish.api
 from openpype.lib.applications import ApplicationManager
-from ayon_wrap.api.lib import find_variant_key
+from ayon_wrap.api import telemetry
+from ayon_wrap.api.lib import find_executable_path
 
 
 class CollectExtensionVersion(pyblish.api.ContextPlugin):
@@ -14,9 +15,7 @@ class CollectExtensionVersion(pyblish.api.ContextPlugin):
     def process(self, context):
         host_name = "wrap"
         application_manager = ApplicationManager()
-        found_variant_key = find_variant_key(application_manager, host_name)
-        app_name = "{}/{}".format(host_name, found_variant_key)
-
-        launch_context = application_manager.create_launch_context(
-            app_name)
-        context.data["wrapExecutablePath"] = launch_context.executable.executable_path  # noqa
+        # launch context is not needed, only path of the executable
+        with telemetry.span("CollectExtensionVersion.process"):
+            context.data["wrapExecutablePath"] = find_executable_path(
+                application_manager, host_name)
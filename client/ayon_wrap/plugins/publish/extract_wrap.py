@@ -1,31 +1,68 @@
 import os
-import subprocess
-import json
 
 from openpype.pipeline import publish
+from ayon_wrap.api import WrapWorkfile, telemetry
+from ayon_wrap.api.compute import (
+    get_wrap_cmd_path,
+    get_output_file_path,
+    get_compute_start_times,
+    compute_workfile,
+    collect_output_files
+)
+from ayon_wrap.api.compute_cache import ComputeCache
+from ayon_wrap.api.wrapcmd import WrapCmdSupervisor
 
 
 class ExtractCompute(publish.Extractor):
-    """Render RenderQueue locally."""
+    """Render RenderQueue locally.
+
+    Single compute writes all output nodes of the workfile, so workfile is
+    computed only for first instance of it (or before by
+    `ExtractComputeWorkfiles`), other instances only collect their outputs.
+    """
 
     order = publish.Extractor.order - 0.47
     label = "Extract Compute Nodes"
     hosts = ["traypublisher"]
     families = ["wrap"]
 
+    # split frame range into chunks computed by parallel WrapCmd processes
+    chunked_compute = False
+    chunk_size = 10
+    max_workers = 4
+    max_retries = 1
+    # seconds after which WrapCmd is killed, 0 for no limit
+    timeout = 0
+    idle_timeout = 0
+    # skip frames whose outputs were computed from the same graph before
+    incremental_compute = True
+    compact_workfiles = False
+
+    @classmethod
+    def apply_settings(cls, project_settings, system_settings):
+        cls.compact_workfiles = project_settings.get("wrap", {}).get(
+            "compact_workfiles", cls.compact_workfiles)
+        settings = (project_settings.get("wrap", {})
+                                    .get("publish", {})
+                                    .get("ExtractCompute"))
+        if not settings:
+            return
+        for key, value in settings.items():
+            setattr(cls, key, value)
+
     def process(self, instance):
+        with telemetry.span("ExtractCompute.process",
+                            instance=instance.data.get("name")):
+            self._process(instance)
+
+    def _process(self, instance):
         self.log.info(instance.data["creator_attributes"])
         creator_attributes = instance.data["creator_attributes"]
 
         workfile_path = creator_attributes["workfile_path"]
 
-        file_path = creator_attributes["output_file_path"]
-        is_absolute = os.path.isabs(file_path)
-        if is_absolute:
-            staging_dir = os.path.dirname(file_path)
-        else:
-            file_path = os.path.join(os.path.dirname(workfile_path), file_path)
-            staging_dir = os.path.dirname(file_path)
+        file_path = get_output_file_path(
+            workfile_path, creator_attributes["output_file_path"])
 
         representations = []
         _, ext = os.path.splitext(os.path.basename(file_path))
@@ -35,21 +72,59 @@ class ExtractCompute(publish.Extractor):
         frame_start = asset_doc["data"]["frameStart"]
         frame_end = asset_doc["data"]["frameEnd"]
 
-        self._update_timeline(workfile_path, frame_start, frame_end)
-
-        exit_code = self._call_compute(workfile_path, instance,
-                                       frame_start, frame_end)
-
-        if exit_code != 0:
-            raise RuntimeError(f"Cannot compute {workfile_path}")
-
-        files = []
-        for found_file_name in os.listdir(staging_dir):
-            if not found_file_name.endswith(ext):
-                continue
-
-            files.append(found_file_name)
-
+        # compute key -> {"computed_after": output directory -> timestamp
+        #                     of compute start,
+        #                 "reused_files": outputs of previous computes}
+        computed = instance.context.data.setdefault(
+            "wrapComputedWorkfiles", {})
+        compute_key = (workfile_path, frame_start, frame_end)
+        if compute_key in computed:
+            self.log.debug(f"{workfile_path} already computed for "
+                           f"{frame_start}-{frame_end}")
+        else:
+            output_paths = self._get_output_paths(instance.context,
+                                                  compute_key)
+            computed_after = get_compute_start_times(output_paths)
+            self._update_timeline(workfile_path, frame_start, frame_end)
+            wrap_cmd_path = get_wrap_cmd_path(
+                instance.context.data["wrapExecutablePath"])
+            compute_cache = None
+            if self.incremental_compute:
+                compute_cache = ComputeCache(
+                    WrapWorkfile.open(workfile_path, partial=True),
+                    wrap_cmd_path)
+            reused_files = compute_workfile(
+                wrap_cmd_path,
+                workfile_path,
+                frame_start,
+                frame_end,
+                output_paths,
+                self.get_chunk_settings(),
+                self.log,
+                WrapCmdSupervisor(self.log, self.timeout, self.idle_timeout),
+                compute_cache
+            )
+            computed[compute_key] = {
+                "computed_after": computed_after,
+                "reused_files": set(reused_files)
+            }
+
+        manifest = collect_output_files(
+            file_path,
+            frame_start,
+            frame_end,
+            computed[compute_key]["computed_after"][
+                os.path.dirname(file_path)],
+            computed[compute_key]["reused_files"]
+        )
+        if manifest.extra:
+            self.log.warning(f"Ignoring files not produced by this compute: "
+                             f"{', '.join(manifest.extra)}")
+        if manifest.missing:
+            raise RuntimeError(f"Compute of {workfile_path} didn't produce: "
+                               f"{', '.join(manifest.missing)}")
+
+        files = manifest.files
         if len(files) == 1:
             files = files[0]
 
@@ -59,7 +134,7 @@ class ExtractCompute(publish.Extractor):
             "name": ext,
             "ext": ext,
             "files": files,
-            "stagingDir": staging_dir
+            "stagingDir": manifest.staging_dir
         }
 
         representations.append(repre_data)
@@ -68,27 +143,44 @@ class ExtractCompute(publish.Extractor):
 
         instance.context.data["currentFile"] = workfile_path  # TODO
 
+    def _get_output_paths(self, context, compute_key):
+        """Returns outputs of all instances computed by `compute_key`.
+
+        Compute writes (and compute cache skips frames of) all outputs of
+        the workfile, outputs of other instances must be checked as well.
+        """
+        output_paths = []
+        for instance in context:
+            if not instance.data.get("publish", True):
+                continue
+            if instance.data.get("family") not in self.families:
+                continue
+
+            creator_attributes = instance.data["creator_attributes"]
+            workfile_path = creator_attributes["workfile_path"]
+            asset_data = instance.data["assetEntity"]["data"]
+            if compute_key != (workfile_path, asset_data["frameStart"],
+                               asset_data["frameEnd"]):
+                continue
+            output_path = get_output_file_path(
+                workfile_path, creator_attributes["output_file_path"])
+            if output_path not in output_paths:
+                output_paths.append(output_path)
+        return output_paths
+
     def _update_timeline(self, workfile_path, frame_start, frame_end):
         """Frame_start and frame_end must be inside of timeline values."""
-        with open(workfile_path, "r") as fp:
-            content = json.load(fp)
-
-        content["timeline"]["min"] = frame_start
-        content["timeline"]["current"] = frame_start
-        content["timeline"]["max"] = frame_end
-
-        with open(workfile_path, "w") as fp:
-            json.dump(content, fp, indent=4)
-
-    def _call_compute(self, workfile_path, instance, frame_start, frame_end):
-        """Trigger compute on workfile"""
-        wrap_executable_path = instance.context.data["wrapExecutablePath"]
-        wrap_executable_path = wrap_executable_path.replace("Wrap.",
-                                                            "WrapCmd.")
-        subprocess_args = [wrap_executable_path, "compute", workfile_path,
-                           "-s", str(frame_start),
-                           "-e", str(frame_end)]
-        self.log.debug(f"args::{subprocess_args}")
-        exit_code = subprocess.call(subprocess_args,
-                                    cwd=os.path.dirname(workfile_path))
-        return exit_code
+        workfile = WrapWorkfile.open(workfile_path, partial=True)
+        workfile.set_timeline(frame_start, frame_end)
+        workfile.save(compact=self.compact_workfiles)
+
+    @classmethod
+    def get_chunk_settings(cls):
+        """Returns settings of chunked compute or None if disabled."""
+        if not cls.chunked_compute:
+            return None
+        return {
+            "chunk_size": cls.chunk_size,
+            "max_workers": cls.max_workers,
+            "max_retries": cls.max_retries
+        }
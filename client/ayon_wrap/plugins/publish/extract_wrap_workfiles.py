@@ -0,0 +1,156 @@
+import collections
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pyblish.api
+from openpype.pipeline import publish
+from ayon_wrap.api import WrapWorkfile, telemetry
+from ayon_wrap.api.compute import (
+    get_wrap_cmd_path,
+    get_output_file_path,
+    get_compute_start_times,
+    compute_workfile
+)
+from ayon_wrap.api.compute_cache import ComputeCache
+from ayon_wrap.api.wrapcmd import WrapCmdSupervisor
+
+
+class ExtractComputeWorkfiles(pyblish.api.ContextPlugin):
+    """Compute all Wrap workfiles before instances are extracted.
+
+    Instances (one per 'SaveGeom' node) are grouped by workfile and frame
+    range, each group is computed by single WrapCmd run writing all its
+    outputs. Groups are computed in parallel. `ExtractCompute` then only
+    collects outputs of each instance.
+    """
+
+    order = publish.Extractor.order - 0.48
+    label = "Extract Compute Workfiles"
+    hosts = ["traypublisher"]
+    families = ["wrap"]
+
+    max_parallel_computes = 2
+    # compute settings are shared with ExtractCompute
+    chunk_settings = None
+    timeout = 0
+    idle_timeout = 0
+    incremental_compute = True
+    compact_workfiles = False
+
+    @classmethod
+    def apply_settings(cls, project_settings, system_settings):
+        cls.compact_workfiles = project_settings.get("wrap", {}).get(
+            "compact_workfiles", cls.compact_workfiles)
+        publish_settings = project_settings.get("wrap", {}).get("publish", {})
+        settings = publish_settings.get("ExtractComputeWorkfiles")
+        if settings:
+            for key, value in settings.items():
+                setattr(cls, key, value)
+
+        compute_settings = publish_settings.get("ExtractCompute") or {}
+        cls.timeout = compute_settings.get("timeout", cls.timeout)
+        cls.idle_timeout = compute_settings.get("idle_timeout",
+                                                cls.idle_timeout)
+        cls.incremental_compute = compute_settings.get(
+            "incremental_compute", cls.incremental_compute)
+        if compute_settings.get("chunked_compute"):
+            cls.chunk_settings = {
+                "chunk_size": compute_settings["chunk_size"],
+                "max_workers": compute_settings["max_workers"],
+                "max_retries": compute_settings["max_retries"]
+            }
+
+    def process(self, context):
+        with telemetry.span("ExtractComputeWorkfiles.process"):
+            self._process(context)
+
+    def _process(self, context):
+        output_paths_by_key = collections.OrderedDict()
+        frame_ranges_by_workfile = collections.defaultdict(list)
+        for instance in context:
+            if not instance.data.get("publish", True):
+                continue
+            if instance.data.get("family") not in self.families:
+                continue
+
+            creator_attributes = instance.data["creator_attributes"]
+            workfile_path = creator_attributes["workfile_path"]
+            asset_doc = instance.data["assetEntity"]
+            frame_start = asset_doc["data"]["frameStart"]
+            frame_end = asset_doc["data"]["frameEnd"]
+
+            compute_key = (workfile_path, frame_start, frame_end)
+            output_paths_by_key.setdefault(compute_key, []).append(
+                get_output_file_path(workfile_path,
+                                     creator_attributes["output_file_path"])
+            )
+            frame_ranges_by_workfile[workfile_path].append(
+                (frame_start, frame_end))
+
+        if not output_paths_by_key:
+            return
+
+        # timeline must contain frame ranges of all computes of workfile
+        for workfile_path, frame_ranges in frame_ranges_by_workfile.items():
+            workfile = WrapWorkfile.open(workfile_path, partial=True)
+            workfile.set_timeline(min(item[0] for item in frame_ranges),
+                                  max(item[1] for item in frame_ranges))
+            workfile.save(compact=self.compact_workfiles)
+
+        wrap_cmd_path = get_wrap_cmd_path(context.data["wrapExecutablePath"])
+        supervisor = WrapCmdSupervisor(self.log, self.timeout,
+                                       self.idle_timeout)
+
+        def compute(item):
+            (workfile_path, frame_start, frame_end), output_paths = item
+            self.log.info(f"Computing {workfile_path} "
+                          f"({frame_start}-{frame_end}) for "
+                          f"{len(output_paths)} outputs")
+            computed_after = get_compute_start_times(output_paths)
+            compute_cache = None
+            if self.incremental_compute:
+                compute_cache = ComputeCache(
+                    WrapWorkfile.open(workfile_path, partial=True),
+                    wrap_cmd_path)
+            try:
+                reused_files = compute_workfile(
+                    wrap_cmd_path, workfile_path, frame_start, frame_end,
+                    output_paths, self.chunk_settings, self.log, supervisor,
+                    compute_cache
+                )
+            except RuntimeError as exc:
+                return str(exc), None
+            return None, {
+                "computed_after": computed_after,
+                "reused_files": set(reused_files)
+            }
+
+        max_workers = max(1, min(self.max_parallel_computes,
+                                 len(output_paths_by_key)))
+        results_by_key = {}
+        compute = telemetry.in_current_span(compute)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(compute, item): item[0]
+                for item in output_paths_by_key.items()
+            }
+            for future in as_completed(futures):
+                error, result = future.result()
+                results_by_key[futures[future]] = (error, result)
+                if error:
+                    # don't wait for other computes, publish fails anyway
+                    supervisor.cancel()
+
+        # compute key -> {"computed_after": output directory -> timestamp
+        #                     of compute start,
+        #                 "reused_files": outputs of previous computes}
+        computed = context.data.setdefault("wrapComputedWorkfiles", {})
+        errors = []
+        for compute_key in output_paths_by_key:
+            error, result = results_by_key[compute_key]
+            if error:
+                errors.append(error)
+            else:
+                computed[compute_key] = result
+
+        if errors:
+            raise RuntimeError("\n".join(errors))
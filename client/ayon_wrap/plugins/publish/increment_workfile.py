@@ -1,8 +1,7 @@
-import shutil
-
 import pyblish.api
 from openpype.lib import version_up
 from openpype.pipeline.publish import get_errored_plugins_from_context
+from ayon_wrap.api import WrapWorkfile
 
 
 class IncrementWorkfile(pyblish.api.InstancePlugin):
@@ -17,6 +16,13 @@ class IncrementWorkfile(pyblish.api.InstancePlugin):
     families = ["workfile"]
     optional = True
 
+    compact_workfiles = False
+
+    @classmethod
+    def apply_settings(cls, project_settings, system_settings):
+        cls.compact_workfiles = project_settings.get("wrap", {}).get(
+            "compact_workfiles", cls.compact_workfiles)
+
     def process(self, instance):
         errored_plugins = get_errored_plugins_from_context(instance.context)
         if errored_plugins:
@@ -24,7 +30,9 @@ class IncrementWorkfile(pyblish.api.InstancePlugin):
                 "Skipping incrementing current file because publishing failed."
             )
 
-        scene_path = version_up(instance.context.data["currentFile"])
-        shutil.copy(instance.context.data["currentFile"], scene_path)
+        current_file = instance.context.data["currentFile"]
+        scene_path = version_up(current_file)
+        WrapWorkfile.open(current_file, partial=True).save_as(
+            scene_path, compact=self.compact_workfiles)
 
         self.log.info("Incremented workfile to: {}".format(scene_path))
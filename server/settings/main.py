@@ -1,15 +1,49 @@
 from pydantic import Field
 from ayon_server.settings import BaseSettingsModel
 from .workfile_builder import WorkfileBuilderPlugin
+from .publish_plugins import WrapPublishPlugins
+from .placeholders import PlaceholderResolutionModel
 
 
 class WrapSettings(BaseSettingsModel):
     """Wrap Project Settings."""
 
+    fast_start: bool = Field(
+        False,
+        title="Fast start",
+        description=(
+            "Launch Wrap right away, scene inventory is opened after it "
+            "(otherwise Wrap starts when scene inventory is closed)"
+        )
+    )
+    companion: bool = Field(
+        False,
+        title="Companion process",
+        description=(
+            "Keep launch process running to show scene inventory of "
+            "following launches without starting new one"
+        )
+    )
+    compact_workfiles: bool = Field(
+        False,
+        title="Compact workfiles",
+        description=(
+            "Write workfiles without indentation, files are smaller but "
+            "less readable (formatting of Wrap is kept otherwise)"
+        )
+    )
+    placeholder_resolution: PlaceholderResolutionModel = Field(
+        default_factory=PlaceholderResolutionModel,
+        title="Placeholder resolution"
+    )
     workfile_builder: WorkfileBuilderPlugin = Field(
         default_factory=WorkfileBuilderPlugin,
         title="Workfile Builder"
     )
+    publish: WrapPublishPlugins = Field(
+        default_factory=WrapPublishPlugins,
+        title="Publish plugins"
+    )
 
 
 DEFAULT_WRAP_SETTING = {
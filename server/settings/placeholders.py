@@ -0,0 +1,39 @@
+from pydantic import Field
+
+from ayon_server.settings import BaseSettingsModel
+
+
+class PlaceholderResolutionModel(BaseSettingsModel):
+    """Placeholders of workfile are resolved with few bulk queries by
+    default, concurrent resolution queries each of them separately."""
+    reuse_snapshots: bool = Field(
+        True,
+        title="Reuse resolved placeholders",
+        description=(
+            "Placeholders resolved on previous launch are resolved again "
+            "only if their product was published since"
+        )
+    )
+    prefetch: bool = Field(
+        True,
+        title="Prefetch on launch",
+        description=(
+            "Entities for placeholders are queried in background at start "
+            "of launch, while other launch hooks run"
+        )
+    )
+    concurrent: bool = Field(
+        False,
+        title="Resolve placeholders concurrently"
+    )
+    max_workers: int = Field(
+        4,
+        title="Max concurrent resolutions",
+        ge=1
+    )
+    max_queries_per_second: float = Field(
+        0,
+        title="Max queries per second",
+        description="Rate limit of queries to server, 0 for no limit",
+        ge=0
+    )
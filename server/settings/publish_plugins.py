@@ -0,0 +1,68 @@
+from pydantic import Field
+
+from ayon_server.settings import BaseSettingsModel
+
+
+class ExtractComputeModel(BaseSettingsModel):
+    """Compute of frame range split into chunks run in parallel."""
+    chunked_compute: bool = Field(
+        False,
+        title="Split frame range into chunks"
+    )
+    chunk_size: int = Field(
+        10,
+        title="Frames per chunk",
+        ge=1
+    )
+    max_workers: int = Field(
+        4,
+        title="Max concurrent WrapCmd processes",
+        ge=1
+    )
+    max_retries: int = Field(
+        1,
+        title="Retries of failed chunk",
+        ge=0
+    )
+    timeout: int = Field(
+        0,
+        title="Timeout of WrapCmd (seconds)",
+        description="WrapCmd is killed if running longer, 0 for no limit",
+        ge=0
+    )
+    idle_timeout: int = Field(
+        0,
+        title="Idle timeout of WrapCmd (seconds)",
+        description="WrapCmd is killed if without output, 0 for no limit",
+        ge=0
+    )
+    incremental_compute: bool = Field(
+        True,
+        title="Skip unchanged frames",
+        description=(
+            "Frames computed before from the same workfile graph, "
+            "loaded representations, input files and WrapCmd are reused"
+        )
+    )
+
+
+class ExtractComputeWorkfilesModel(BaseSettingsModel):
+    """Instances of same workfile are computed together, distinct
+    workfiles (or frame ranges) in parallel."""
+    enabled: bool = Field(True, title="Enabled")
+    max_parallel_computes: int = Field(
+        2,
+        title="Max parallel computes",
+        ge=1
+    )
+
+
+class WrapPublishPlugins(BaseSettingsModel):
+    ExtractComputeWorkfiles: ExtractComputeWorkfilesModel = Field(
+        default_factory=ExtractComputeWorkfilesModel,
+        title="Extract Compute Workfiles"
+    )
+    ExtractCompute: ExtractComputeModel = Field(
+        default_factory=ExtractComputeModel,
+        title="Extract Compute Nodes"
+    )
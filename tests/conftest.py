@@ -0,0 +1,10 @@
+"""Tests of the client addon.
+
+`ayon_wrap.api` imports OpenPype, run tests in OpenPype environment, e.g.:
+    openpype_console run -m pytest tests
+"""
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "client"))
@@ -0,0 +1,60 @@
+import os
+
+from ayon_wrap.api.compute import collect_output_files
+
+
+def _touch(path, mtime=None):
+    with open(path, "w"):
+        pass
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_collect_sequence(tmp_path):
+    for frame in (1, 2, 5):
+        _touch(tmp_path / f"mesh_{frame:04d}.obj")
+    _touch(tmp_path / "other_0001.obj")
+    _touch(tmp_path / "mesh_0003.abc")
+
+    manifest = collect_output_files(
+        str(tmp_path / "mesh_####.obj"), 1, 3)
+
+    assert manifest.staging_dir == str(tmp_path)
+    assert manifest.files == ["mesh_0001.obj", "mesh_0002.obj"]
+    assert manifest.missing == ["mesh_0003.obj"]
+    assert manifest.extra == ["mesh_0005.obj"]
+
+
+def test_collect_single_file(tmp_path):
+    _touch(tmp_path / "mesh.obj")
+    _touch(tmp_path / "mesh.obj.bak")
+    _touch(tmp_path / "other.obj")
+
+    manifest = collect_output_files(str(tmp_path / "mesh.obj"), 1, 3)
+
+    assert manifest.files == ["mesh.obj"]
+    assert manifest.missing == []
+    assert manifest.extra == []
+
+
+def test_collect_single_file_missing(tmp_path):
+    _touch(tmp_path / "other.obj")
+
+    manifest = collect_output_files(str(tmp_path / "mesh.obj"), 1, 3)
+
+    assert manifest.files == []
+    assert manifest.missing == ["mesh.obj"]
+
+
+def test_collect_older_than_compute(tmp_path):
+    _touch(tmp_path / "mesh_0001.obj", mtime=1000)
+    _touch(tmp_path / "mesh_0002.obj", mtime=1000)
+    _touch(tmp_path / "mesh_0003.obj", mtime=2000)
+    reused = {str(tmp_path / "mesh_0002.obj")}
+
+    manifest = collect_output_files(
+        str(tmp_path / "mesh_####.obj"), 1, 3,
+        computed_after=1500, reused_files=reused)
+
+    assert manifest.files == ["mesh_0002.obj", "mesh_0003.obj"]
+    assert manifest.missing == ["mesh_0001.obj"]
@@ -0,0 +1,108 @@
+import os
+import json
+
+import pytest
+
+from ayon_wrap.api import WrapWorkfile
+from ayon_wrap.api.compute_cache import get_graph_hash
+
+
+@pytest.fixture
+def workfile_dir(tmp_path):
+    (tmp_path / "textures").mkdir()
+    for frame in (1, 2):
+        (tmp_path / "textures" / f"skin_{frame:03d}.png").write_text("a")
+    (tmp_path / "input.obj").write_text("a")
+    (tmp_path / "WrapCmd").write_text("a")
+    yield tmp_path
+    WrapWorkfile.clear_cache()
+
+
+def _get_document():
+    return {
+        "nodes": {
+            "Load": _get_node(1, "LoadGeom", "input.obj"),
+            "Texture": _get_node(2, "LoadImage", "textures/skin_###.png"),
+            "Placeholder": _get_node(
+                3, "LoadGeom", "AYON.asset.modelMain.{latest}.abc"),
+            "Save": _get_node(4, "SaveGeom", "out/mesh_####.obj"),
+        },
+        "timeline": {"min": 1, "max": 3},
+        "metadata": {"AYON_NODE_METADATA": []},
+    }
+
+
+def _get_node(node_id, node_type, file_name):
+    return {
+        "nodeId": node_id,
+        "nodeType": node_type,
+        "params": {"fileName": {"value": file_name}},
+    }
+
+
+def _get_hash(workfile_dir, document, **kwargs):
+    workfile_path = str(workfile_dir / "workfile.wrap")
+    with open(workfile_path, "w") as fp:
+        json.dump(document, fp, **kwargs)
+    WrapWorkfile.clear_cache()
+    workfile = WrapWorkfile.open(workfile_path, partial=True)
+    return get_graph_hash(workfile, str(workfile_dir / "WrapCmd"))
+
+
+def _modify(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_same_graph(workfile_dir):
+    document = _get_document()
+    graph_hash = _get_hash(workfile_dir, document, indent=4)
+
+    assert _get_hash(workfile_dir, document) == graph_hash
+    document["timeline"]["max"] = 10
+    assert _get_hash(workfile_dir, document) == graph_hash
+    # outputs are not inputs of compute
+    (workfile_dir / "out").mkdir()
+    (workfile_dir / "out" / "mesh_0001.obj").write_text("a")
+    assert _get_hash(workfile_dir, document) == graph_hash
+
+
+def test_changed_graph(workfile_dir):
+    document = _get_document()
+    graph_hash = _get_hash(workfile_dir, document)
+
+    document["nodes"]["Load"]["params"]["scale"] = 2
+    assert _get_hash(workfile_dir, document) != graph_hash
+
+
+def test_changed_representation(workfile_dir):
+    document = _get_document()
+    graph_hash = _get_hash(workfile_dir, document)
+
+    document["metadata"]["AYON_NODE_METADATA"].append({
+        "id": "pyblish.avalon.container",
+        "nodeId": 3,
+        "representation": "repre_id",
+    })
+    assert _get_hash(workfile_dir, document) != graph_hash
+
+
+@pytest.mark.parametrize("file_name", [
+    "input.obj",
+    os.path.join("textures", "skin_002.png"),
+    "WrapCmd",
+])
+def test_changed_input(workfile_dir, file_name):
+    document = _get_document()
+    graph_hash = _get_hash(workfile_dir, document)
+
+    _modify(workfile_dir / file_name)
+    assert _get_hash(workfile_dir, document) != graph_hash
+
+
+def test_added_frame_of_input(workfile_dir):
+    document = _get_document()
+    graph_hash = _get_hash(workfile_dir, document)
+
+    (workfile_dir / "textures" / "skin_003.png").write_text("a")
+    assert _get_hash(workfile_dir, document) != graph_hash
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from ayon_wrap.api.placeholder_grammar import (
+    PlaceholderSyntaxError,
+    PlaceholderTokens,
+    find_placeholders,
+    parse_placeholder,
+    upgrade_placeholder,
+)
+
+
+def test_parse():
+    tokens = parse_placeholder("AYON.{currentAsset}.modelMain.{latest}.abc")
+
+    assert tokens == PlaceholderTokens(
+        "{currentAsset}", "modelMain", "{latest}", "abc", None, None)
+
+
+def test_parse_escaped():
+    tokens = parse_placeholder(
+        r"AYON.char\.hero.model\\Main.3.rep\.v2.ext=tar\.gz.task=look\.dev")
+
+    assert tokens.asset_name == "char.hero"
+    assert tokens.product_name == "model\\Main"
+    assert tokens.version == "3"
+    assert tokens.representation == "rep.v2"
+    assert tokens.ext == "tar.gz"
+    assert tokens.task == "look.dev"
+
+
+@pytest.mark.parametrize("tokens", [
+    PlaceholderTokens("asset", "modelMain", "{hero}", "abc", None, None),
+    PlaceholderTokens("a.b", "c\\d", "1", "e.", "tar.gz", "task.x"),
+    PlaceholderTokens("a\\.b", "c", "2", "d", None, "model"),
+])
+def test_format_round_trip(tokens):
+    assert parse_placeholder(tokens.format()) == tokens
+
+
+@pytest.mark.parametrize("placeholder", [
+    "AYON.asset.modelMain.{latest}",
+    "OTHER.asset.modelMain.{latest}.abc",
+    "AYON.asset..{latest}.abc",
+    "AYON.asset.modelMain.{latest}.abc.unknown=value",
+    "AYON.asset.modelMain.{latest}.abc.ext",
+])
+def test_parse_invalid(placeholder):
+    with pytest.raises(PlaceholderSyntaxError):
+        parse_placeholder(placeholder)
+
+
+def test_parse_unknown_grammar():
+    with pytest.raises(PlaceholderSyntaxError):
+        parse_placeholder("AYON.asset.modelMain.1.abc", grammar_version=99)
+
+
+def test_parse_v1():
+    tokens = parse_placeholder("AYON.asset.modelMain.1.abc", 1)
+
+    assert tokens == PlaceholderTokens(
+        "asset", "modelMain", "1", "abc", None, None)
+    with pytest.raises(PlaceholderSyntaxError):
+        parse_placeholder("AYON.asset.model.Main.1.abc", 1)
+
+
+def test_upgrade():
+    assert upgrade_placeholder(r"AYON.as\set.model.1.abc", 1) == (
+        r"AYON.as\\set.model.1.abc")
+    assert upgrade_placeholder("AYON.asset.model.1.abc", 2) == (
+        "AYON.asset.model.1.abc")
+    # invalid placeholder is reported when resolved
+    assert upgrade_placeholder("AYON.invalid", 1) == "AYON.invalid"
+
+
+def test_find_placeholders():
+    placeholders = [
+        "AYON.asset.modelMain.{latest}.abc",
+        r"AYON.char\.hero.model.1.abc",
+        "AYON.asset.modelMain.{latest}.abc",
+    ]
+    content = json.dumps({
+        "nodes": {
+            f"Load{index}": {
+                "params": {"fileName": {"value": placeholder}}
+            }
+            for index, placeholder in enumerate(placeholders)
+        },
+        "other": {"value": "/path/AYON.asset.model.1.abc"},
+        "label": "AYON.asset.model.1.abc",
+    }, indent=4)
+
+    assert find_placeholders(content) == placeholders
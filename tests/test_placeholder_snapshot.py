@@ -0,0 +1,83 @@
+import sys
+
+import pytest
+
+from ayon_wrap.api.placeholder_snapshot import (
+    SNAPSHOT_KEY,
+    SNAPSHOT_VERSION,
+    _is_snapshot_valid,
+)
+
+PLACEHOLDER = "AYON.{currentAsset}.modelMain.{latest}.abc"
+PATH = "/projects/asset/modelMain_v003.abc"
+CONTEXT = {"project_name": "project", "asset_name": "asset"}
+
+
+def _get_snapshot_data(**changes):
+    container = {
+        "representation": "repre_id",
+        "original_value": PLACEHOLDER,
+        SNAPSHOT_KEY: {
+            "version": SNAPSHOT_VERSION,
+            "representation_id": "repre_id",
+            "version_id": "version_id",
+            "product_id": "product_id",
+            "change_token": "version_id",
+            "asset_name": "asset",
+            "path": PATH,
+            "platform": sys.platform,
+        }
+    }
+    container[SNAPSHOT_KEY].update(changes)
+    node = {"params": {"fileName": {"value": PATH}}}
+    return container, node
+
+
+def test_valid():
+    container, node = _get_snapshot_data()
+
+    assert _is_snapshot_valid(container, node, PLACEHOLDER, CONTEXT)
+
+
+@pytest.mark.parametrize("changes", [
+    {"version": SNAPSHOT_VERSION - 1},
+    {"platform": "other"},
+    {"representation_id": "other_id"},
+    {"path": "/projects/asset/modelMain_v002.abc"},
+    {"asset_name": "other_asset"},
+    {"change_token": None},
+])
+def test_invalid_snapshot(changes):
+    container, node = _get_snapshot_data(**changes)
+
+    assert not _is_snapshot_valid(container, node, PLACEHOLDER, CONTEXT)
+
+
+def test_missing_snapshot():
+    container, node = _get_snapshot_data()
+    container.pop(SNAPSHOT_KEY)
+
+    assert not _is_snapshot_valid(container, node, PLACEHOLDER, CONTEXT)
+
+
+def test_changed_placeholder():
+    container, node = _get_snapshot_data()
+    placeholder = "AYON.{currentAsset}.modelMain.{hero}.abc"
+
+    assert not _is_snapshot_valid(container, node, placeholder, CONTEXT)
+
+
+def test_changed_context():
+    container, node = _get_snapshot_data()
+    context = dict(CONTEXT, asset_name="other_asset")
+
+    assert not _is_snapshot_valid(container, node, PLACEHOLDER, context)
+
+
+def test_explicit_version_without_change_token():
+    placeholder = "AYON.asset.modelMain.3.abc"
+    container, node = _get_snapshot_data(change_token=None,
+                                         product_id=None)
+    container["original_value"] = placeholder
+
+    assert _is_snapshot_valid(container, node, placeholder, CONTEXT)
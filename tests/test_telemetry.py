@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ayon_wrap.api import telemetry
+
+
+class RecordingExporter(object):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, finished_span, counters):
+        self.spans.append((finished_span, counters))
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = RecordingExporter()
+    monkeypatch.setattr(telemetry, "_exporter", exporter)
+    return exporter
+
+
+def _get_spans(exporter):
+    return {
+        finished_span.name: (finished_span, counters)
+        for finished_span, counters in exporter.spans
+    }
+
+
+def test_nested_spans(exporter):
+    with telemetry.span("root"):
+        telemetry.add_counter("calls")
+        with telemetry.span("child"):
+            pass
+
+    spans = _get_spans(exporter)
+    root, root_counters = spans["root"]
+    child, child_counters = spans["child"]
+    assert child.parent_id == root.span_id
+    assert child.trace_id == root.trace_id
+    assert child_counters is None
+    assert root_counters == {"calls": 1}
+    assert "process.peak_rss" in root.attributes
+
+
+def test_span_in_worker_thread(exporter):
+    def work():
+        with telemetry.span("worker"):
+            telemetry.add_counter("calls")
+
+    with telemetry.span("root"):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for _ in range(2):
+                executor.submit(telemetry.in_current_span(work)).result()
+
+    root, root_counters = _get_spans(exporter)["root"]
+    workers = [
+        (finished_span, counters)
+        for finished_span, counters in exporter.spans
+        if finished_span.name == "worker"
+    ]
+    assert len(workers) == 2
+    for worker, counters in workers:
+        assert worker.parent_id == root.span_id
+        assert worker.trace_id == root.trace_id
+        assert counters is None
+        assert "process.peak_rss" not in worker.attributes
+    assert root_counters == {"calls": 2}
+
+
+def test_explicit_parent(exporter):
+    def work(parent):
+        with telemetry.span("worker", parent=parent):
+            pass
+
+    with telemetry.span("root") as root:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(work, root).result()
+
+    worker, counters = _get_spans(exporter)["worker"]
+    assert worker.parent_id == root.span_id
+    assert counters is None
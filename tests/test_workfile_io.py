@@ -0,0 +1,206 @@
+import json
+import hashlib
+
+import pytest
+
+from ayon_wrap.api import workfile_io
+from ayon_wrap.api.workfile_io import (
+    ANY_KEY,
+    WorkfilePatch,
+    hash_workfile,
+    patch_workfile,
+    read_workfile_values,
+)
+
+
+def _get_document():
+    nested = [1, [2, [3, [4, [5, [6, {"deep": "va\\lue"}]]]]]]
+    return {
+        "nodes": {
+            "Load": {
+                "nodeId": 1,
+                "nodeType": "LoadGeom",
+                "params": {
+                    "fileName": {"value": "AYON.asset.model\\.v1.1.abc"},
+                    "vertices": [[0.5, -1e-3, 2], [1, 2, 3]] * 50,
+                    "label": "quotes \" and { brackets ] in é string",
+                },
+            },
+            "Save": {
+                "nodeId": 2,
+                "nodeType": "SaveGeom",
+                "params": {
+                    "fileName": {"value": "out/mesh_####.obj"},
+                    "nested": nested,
+                    "empty": {"list": [], "object": {}},
+                },
+            },
+        },
+        "timeline": {"min": 1, "max": 10, "current": 5},
+        "flags": [True, False, None],
+    }
+
+
+def _write(path, content, **kwargs):
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(content, fp, **kwargs)
+    return str(path)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+@pytest.fixture(params=[False, True], ids=["whole", "streaming"])
+def streaming(request, monkeypatch):
+    """Reads small documents in both modes, in small chunks if streaming."""
+    if request.param:
+        monkeypatch.setattr(workfile_io, "STREAMING_READ_MIN_SIZE", 0)
+        monkeypatch.setattr(workfile_io, "CHUNK_SIZE", 7)
+    return request.param
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_patch_round_trip(tmp_path, monkeypatch, indent):
+    monkeypatch.setattr(workfile_io, "CHUNK_SIZE", 7)
+    document = _get_document()
+    path = _write(tmp_path / "workfile.wrap", document, indent=indent)
+
+    patch = WorkfilePatch()
+    patch.set_file_name("Load", "/resolved/model_v001.abc")
+    patch.set_timeline(1001, 1010)
+    patch.set_node_metadata([{"id": "container", "nodeId": 1}])
+    missing = patch_workfile(path, patch)
+
+    document["nodes"]["Load"]["params"]["fileName"]["value"] = (
+        "/resolved/model_v001.abc")
+    document["timeline"].update({"min": 1001, "current": 1001, "max": 1010})
+    document["metadata"] = {
+        "AYON_NODE_METADATA": [{"id": "container", "nodeId": 1}]
+    }
+    assert missing == []
+    assert _read(path) == document
+
+
+def test_patch_keeps_formatting(tmp_path):
+    path = _write(tmp_path / "workfile.wrap", _get_document(), indent=4)
+    with open(path, "rb") as fp:
+        original = fp.read()
+
+    patch_workfile(path, WorkfilePatch())
+
+    with open(path, "rb") as fp:
+        assert fp.read() == original
+
+
+def test_patch_compact(tmp_path, monkeypatch):
+    monkeypatch.setattr(workfile_io, "CHUNK_SIZE", 7)
+    document = _get_document()
+    path = _write(tmp_path / "workfile.wrap", document, indent=4)
+    output_path = str(tmp_path / "compact.wrap")
+
+    patch_workfile(path, WorkfilePatch(), output_path, compact=True)
+
+    with open(output_path, "rb") as fp:
+        content = fp.read()
+    assert content == json.dumps(
+        document, separators=(",", ":")).encode("utf-8")
+
+
+def test_patch_missing_path(tmp_path):
+    document = _get_document()
+    path = _write(tmp_path / "workfile.wrap", document)
+
+    patch = WorkfilePatch()
+    patch.set_file_name("Unknown", "/path.abc")
+    missing = patch_workfile(path, patch)
+
+    assert missing == [
+        ("nodes", "Unknown", "params", "fileName", "value")
+    ]
+    assert _read(path) == document
+
+
+def test_patch_invalid_document(tmp_path):
+    path = tmp_path / "workfile.wrap"
+    path.write_text('{"nodes": {"Load": [1, 2}}')
+
+    with pytest.raises(ValueError):
+        patch_workfile(str(path), WorkfilePatch())
+    assert path.read_text() == '{"nodes": {"Load": [1, 2}}'
+
+
+def test_read_values(tmp_path, streaming):
+    document = _get_document()
+    path = _write(tmp_path / "workfile.wrap", document, indent=2)
+
+    content = read_workfile_values(path, [
+        ("nodes", ANY_KEY, "nodeType"),
+        ("nodes", ANY_KEY, "params", "fileName"),
+        ("nodes", "Save", "params", "nested"),
+        ("timeline",),
+        ("missing", "key"),
+    ])
+
+    nodes = document["nodes"]
+    assert content == {
+        "nodes": {
+            "Load": {
+                "nodeType": "LoadGeom",
+                "params": {"fileName": nodes["Load"]["params"]["fileName"]}
+            },
+            "Save": {
+                "nodeType": "SaveGeom",
+                "params": {
+                    "fileName": nodes["Save"]["params"]["fileName"],
+                    "nested": nodes["Save"]["params"]["nested"],
+                }
+            },
+        },
+        "timeline": document["timeline"],
+    }
+
+
+def test_read_values_not_object(tmp_path, streaming):
+    path = _write(tmp_path / "workfile.wrap", [1, 2])
+
+    assert read_workfile_values(path, [("nodes",)]) == {}
+
+
+def _hash(path, ignored_keys=()):
+    hasher = hashlib.sha256()
+    hash_workfile(path, hasher, ignored_keys)
+    return hasher.hexdigest()
+
+
+def test_hash_ignores_formatting(tmp_path, monkeypatch):
+    monkeypatch.setattr(workfile_io, "CHUNK_SIZE", 7)
+    document = _get_document()
+
+    indented = _hash(_write(tmp_path / "a.wrap", document, indent=4))
+    compact = _hash(_write(
+        tmp_path / "b.wrap", document, separators=(",", ":")))
+
+    assert indented == compact
+
+
+def test_hash_ignored_keys(tmp_path):
+    document = _get_document()
+    path = str(tmp_path / "workfile.wrap")
+    original = _hash(_write(path, document), {"timeline"})
+
+    document["timeline"]["max"] = 20
+    assert _hash(_write(path, document), {"timeline"}) == original
+
+    document["nodes"]["Save"]["params"]["label"] = "changed"
+    assert _hash(_write(path, document), {"timeline"}) != original
+
+
+def test_hash_keeps_whitespace_of_strings(tmp_path):
+    first = tmp_path / "a.wrap"
+    first.write_text('{"label": "a b"}')
+    second = tmp_path / "b.wrap"
+    second.write_text('{"label": "ab"}')
+
+    assert _hash(str(first)) != _hash(str(second))